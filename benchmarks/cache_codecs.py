@@ -0,0 +1,97 @@
+"""
+Benchmark the cache compression codecs on cache-like payloads.
+
+For every available codec and level, writes and reads a payload through the pickle cache
+backend and reports the compression ratio and the write/read throughput (in MB/s of the
+uncompressed pickle). Point --cache-dir at the filesystem holding your `.runs` directory
+(e.g. NFS) to include its I/O costs in the numbers.
+
+Usage:
+    python benchmarks/cache_codecs.py [--payload text|numeric] [--size-mb 64] [--cache-dir DIR]
+"""
+
+import argparse
+import pickle
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Benchmark the checkout this script belongs to, also when run as `python benchmarks/cache_codecs.py`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from urartu.common.cache import PickleCacheBackend
+from urartu.common.cache_codecs import get_cache_codec
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "zstd": [1, 3, 9, 19],
+    "lz4": [0, 3, 9],
+}
+
+
+def make_payload(kind: str, size_mb: float) -> dict:
+    """Build cache payload outputs of roughly size_mb megabytes."""
+    rng = random.Random(0)
+    target = int(size_mb * 1024**2)
+    if kind == "numeric":
+        count = target // 8
+        return {"values": [rng.random() for _ in range(count)]}
+
+    # Generated samples: prompts and completions drawn from a limited vocabulary
+    vocabulary = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(5000)]
+    samples, size = [], 0
+    while size < target:
+        prompt = " ".join(rng.choices(vocabulary, k=rng.randint(10, 40)))
+        completion = " ".join(rng.choices(vocabulary, k=rng.randint(50, 200)))
+        samples.append({"prompt": prompt, "completion": completion, "score": rng.random()})
+        size += len(prompt) + len(completion)
+    return {"samples": samples}
+
+
+def bench(backend: PickleCacheBackend, payload: dict, raw_size: int, repeats: int):
+    write_times, read_times = [], []
+    for i in range(repeats):
+        start = time.perf_counter()
+        backend.save(f"bench_{i}", payload)
+        write_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        backend.load(f"bench_{i}")
+        read_times.append(time.perf_counter() - start)
+    stored_size = backend.entry_size("bench_0")
+    for i in range(repeats):
+        backend.delete(f"bench_{i}")
+    mb = raw_size / 1024**2
+    return raw_size / stored_size, mb / min(write_times), mb / min(read_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payload", choices=["text", "numeric"], default="text")
+    parser.add_argument("--size-mb", type=float, default=64)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--cache-dir", type=Path, default=None, help="Directory to write to (default: a temp dir)")
+    args = parser.parse_args()
+
+    payload = {"outputs": make_payload(args.payload, args.size_mb), "timestamp": time.time()}
+    raw_size = len(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    print(f"Payload: {args.payload}, {raw_size / 1024**2:.1f} MB pickled\n")
+    print(f"{'codec':<8} {'level':>5} {'ratio':>7} {'write MB/s':>11} {'read MB/s':>10}")
+
+    with tempfile.TemporaryDirectory(dir=args.cache_dir) as cache_dir:
+        configurations = [(None, None)] + [(name, level) for name, levels in LEVELS.items() for level in levels]
+        for name, level in configurations:
+            try:
+                codec = get_cache_codec(name, level)
+            except ImportError as e:
+                print(f"{name:<8} {'':>5} skipped ({e})")
+                continue
+            backend = PickleCacheBackend(Path(cache_dir), codec)
+            ratio, write_speed, read_speed = bench(backend, payload, raw_size, args.repeats)
+            print(f"{name or 'none':<8} {'' if level is None else level:>5} {ratio:>7.2f} {write_speed:>11.1f} {read_speed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark the import time of urartu and the start-up of its CLI.
+
+Runs `python -X importtime` on a few entry points in fresh interpreters and reports the
+wall time, the cumulative import time of urartu and the slowest imported packages. It also
+checks that none of the heavy dependencies (torch, aim, submitit, transformers, evaluate,
+transformer_lens) is imported on paths that do not need them; `--check` turns such an import
+into a non-zero exit code, e.g. for CI. With `--history FILE` every run appends its results,
+with the commit and date, to a JSONL file so start-up time can be tracked over time.
+
+Usage:
+    python benchmarks/startup.py [--repeats 5] [--top 10] [--history startup.jsonl] [--check]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+# The checkout benchmarked: the interpreters are started there, so `import urartu` finds it
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ["torch", "aim", "submitit", "transformers", "evaluate", "transformer_lens"]
+
+# Entry points that must start without importing any of HEAVY_MODULES
+ENTRY_POINTS = {
+    "import urartu": "import urartu",
+    "urartu --help": "import sys; sys.argv = ['urartu', '--help']; import urartu; urartu.main()",
+    "import urartu.common.action": "import urartu.common.action",
+    "import urartu.common.pipeline": "import urartu.common.pipeline",
+}
+
+
+def run_importtime(code: str) -> Tuple[float, Dict[str, int], Set[str]]:
+    """
+    Run code in a fresh interpreter.
+
+    Returns:
+        The wall time in seconds, the cumulative import time (us) of every imported module and
+        the names of the modules imported by the code itself rather than by another module
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=REPO_ROOT,
+    )
+    wall = time.perf_counter() - start
+
+    cumulative, top_level = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue
+        cumulative[name.strip()] = int(cumulative_us)
+        # Nested imports are indented below the module importing them
+        if not name[1:].startswith(" "):
+            top_level.add(name.strip())
+    return wall, cumulative, top_level
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=REPO_ROOT,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per entry point, the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest top-level packages to list")
+    parser.add_argument("--history", type=Path, help="JSONL file to append the results to")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if a heavy dependency is imported")
+    args = parser.parse_args()
+
+    results: List[Dict] = []
+    leaked = False
+    print(f"{'entry point':<32} {'wall ms':>9} {'urartu ms':>10}  heavy imports")
+    for label, code in ENTRY_POINTS.items():
+        walls, import_times = [], []
+        for _ in range(args.repeats):
+            wall, cumulative, top_level = run_importtime(code)
+            walls.append(wall)
+            import_times.append(sum(cumulative[name] for name in top_level if name.split(".")[0] == "urartu"))
+        heavy = [module for module in HEAVY_MODULES if module in cumulative]
+        leaked = leaked or bool(heavy)
+        wall_ms = statistics.median(walls) * 1000
+        urartu_ms = statistics.median(import_times) / 1000
+        print(f"{label:<32} {wall_ms:>9.1f} {urartu_ms:>10.1f}  {', '.join(heavy) or '-'}")
+
+        # Slowest top-level packages of the last run
+        packages = {name: us for name, us in cumulative.items() if "." not in name and name != "urartu"}
+        slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        results.append({
+            "entry_point": label,
+            "wall_ms": wall_ms,
+            "urartu_import_ms": urartu_ms,
+            "heavy_imports": heavy,
+            "slowest": {name: us / 1000 for name, us in slowest},
+        })
+
+    print(f"\nSlowest packages imported by '{results[-1]['entry_point']}':")
+    for name, ms in results[-1]["slowest"].items():
+        print(f"  {name:<30} {ms:>9.1f} ms")
+
+    if args.history:
+        record = {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "results": results,
+        }
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nAppended results to {args.history}")
+
+    if args.check and leaked:
+        sys.exit("Heavy dependencies imported at start-up: see the table above")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,10 +17,10 @@ class Generate(Action):
 
         for idx, sample in tqdm(enumerate(dataset.dataset)):
             prompt = sample[self.task_cfg.dataset.get("input_key")]
-            self.aim_run.track(Text(prompt), name="input")
+            self.tracker.track(Text(prompt), name="input")
 
             output = model.generate(prompt)
-            self.aim_run.track(Text(output), name="output")
+            self.tracker.track(Text(output), name="output")
 
 
 def main(cfg: DictConfig, aim_run: Run):
@@ -83,7 +83,7 @@ class RunCircuit(Action):
         train_dl = dataloaders['train']
         eval_dl = dataloaders['test']
         dls = Namespace(train=train_dl, eval=eval_dl)
-        model = NewModel.from_pretrained(circuit_cfg, tokenizer, dls)
+        model = self.register_intervention(NewModel.from_pretrained(circuit_cfg, tokenizer, dls))
         model.prepare_origin_output(model.dls.eval)
         result = model.evaluate()
         print('Result after model evaluate:')
@@ -0,0 +1,39 @@
+import sys
+
+import pytest
+from omegaconf import OmegaConf
+
+
+@pytest.fixture
+def make_cfg(tmp_path):
+    """Build the config of a standalone action run under tmp_path/.runs."""
+
+    def make(action_name="test_action", **action_config):
+        return OmegaConf.create(
+            {
+                "action_name": action_name,
+                "run_dir": str(tmp_path / ".runs" / action_name / "run"),
+                "action_config": action_config,
+            }
+        )
+
+    return make
+
+
+@pytest.fixture
+def make_project(tmp_path, monkeypatch):
+    """Build a project under tmp_path with the given modules in its `actions` package, and work in it."""
+
+    def make(**actions):
+        actions_dir = tmp_path / "actions"
+        actions_dir.mkdir(exist_ok=True)
+        (actions_dir / "__init__.py").touch()
+        for name, source in actions.items():
+            (actions_dir / f"{name}.py").write_text(source)
+        return tmp_path
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for module in [module for module in sys.modules if module == "actions" or module.startswith("actions.")]:
+        monkeypatch.delitem(sys.modules, module)
+    return make
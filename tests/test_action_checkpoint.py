@@ -0,0 +1,94 @@
+import pytest
+
+from urartu.common.action import Action, checkpoint_active_actions
+
+
+class Preempted(Exception):
+    pass
+
+
+class Counter:
+    """Intervention counting steps, with the checkpointing interface of Intervention."""
+
+    def __init__(self):
+        self.step = 0
+        self.steps_run = []
+        self.checkpoint_hook = None
+
+    def checkpoint_state(self):
+        return {"step": self.step} if self.step else {}
+
+    def load_checkpoint_state(self, state):
+        self.step = state["step"]
+
+    def intervene(self, steps, preempt_at=None):
+        while self.step < steps:
+            if self.step == preempt_at:
+                # What submitit does when the job is preempted
+                checkpoint_active_actions()
+                raise Preempted()
+            self.step += 1
+            self.steps_run.append(self.step)
+            self.checkpoint_hook()
+
+
+class CountingAction(Action):
+    preempt_at = None
+
+    def run(self):
+        self.counter = self.register_intervention(Counter())
+        self.counter.intervene(5, preempt_at=self.preempt_at)
+
+    def get_outputs(self):
+        return {"step": self.counter.step}
+
+
+def test_register_intervention_points_checkpoint_hook_at_maybe_checkpoint(make_cfg):
+    action = CountingAction(make_cfg(cache_enabled=False), None)
+    counter = action.register_intervention(Counter())
+
+    assert counter.checkpoint_hook == action.maybe_checkpoint
+    assert action.state_dict() == {}
+    counter.step = 2
+    assert action.state_dict() == {"interventions": {"Counter": {"step": 2}}}
+
+
+def test_preempted_action_resumes_its_intervention(make_cfg, monkeypatch):
+    cfg = make_cfg(cache_enabled=False, checkpoint_interval_minutes=0)
+    monkeypatch.setattr(CountingAction, "preempt_at", 3)
+    first = CountingAction(cfg, None)
+    with pytest.raises(Preempted):
+        first.run_with_cache()
+    assert first.checkpoint_path.exists()
+
+    monkeypatch.setattr(CountingAction, "preempt_at", None)
+    second = CountingAction(cfg, None)
+    second.run_with_cache()
+
+    assert second.counter.steps_run == [4, 5]
+    assert second.get_outputs() == {"step": 5}
+    assert not second.checkpoint_path.exists()
+
+
+def test_periodic_checkpoints_go_through_the_hook(make_cfg):
+    action = CountingAction(make_cfg(cache_enabled=False, checkpoint_interval_minutes=1), None)
+    counter = action.register_intervention(Counter())
+    # Longer ago than the interval
+    action._last_checkpoint -= 120
+    counter.intervene(1)
+
+    assert action.checkpoint_path.exists()
+    resumed = CountingAction(make_cfg(cache_enabled=False, checkpoint_interval_minutes=1), None)
+    assert resumed.restore_checkpoint()
+    assert resumed.register_intervention(Counter()).step == 1
+
+
+def test_checkpoint_of_another_config_is_ignored(make_cfg, monkeypatch):
+    monkeypatch.setattr(CountingAction, "preempt_at", 3)
+    with pytest.raises(Preempted):
+        CountingAction(make_cfg(cache_enabled=False, seed=1), None).run_with_cache()
+
+    monkeypatch.setattr(CountingAction, "preempt_at", None)
+    other = CountingAction(make_cfg(cache_enabled=False, seed=2), None)
+    other.run_with_cache()
+    assert other.counter.steps_run == [1, 2, 3, 4, 5]
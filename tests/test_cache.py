@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from urartu.common.cache import ContentAddressedCacheBackend
+
+
+@pytest.fixture
+def arrow_dataset(tmp_path):
+    """A dataset memory-mapped from Arrow files on disk, as datasets loads them."""
+    datasets = pytest.importorskip("datasets")
+    datasets.Dataset.from_dict({"text": ["a", "b", "c"], "label": [0, 1, 0]}).save_to_disk(str(tmp_path / "source"))
+    return datasets.load_from_disk(str(tmp_path / "source"))
+
+
+def dataset_node(backend, cache_key):
+    with open(backend._manifest_path(cache_key)) as f:
+        return json.load(f)["outputs"]["dataset"]
+
+
+def test_unmodified_datasets_are_stored_by_reference(tmp_path, arrow_dataset):
+    backend = ContentAddressedCacheBackend(tmp_path / "cache")
+    backend.save("a_1", {"outputs": {"dataset": arrow_dataset}})
+
+    assert dataset_node(backend, "a_1")[backend.BLOB_MARKER] == "dataset_files"
+    assert backend.load("a_1")["outputs"]["dataset"].to_dict() == arrow_dataset.to_dict()
+
+
+@pytest.mark.parametrize("transform", [
+    lambda dataset: dataset.rename_column("text", "prompt"),
+    lambda dataset: dataset.remove_columns("label"),
+    lambda dataset: dataset.select_columns(["label"]),
+    lambda dataset: dataset.cast_column("label", "float64"),
+])
+def test_transformed_datasets_are_saved_as_they_are(tmp_path, arrow_dataset, transform):
+    backend = ContentAddressedCacheBackend(tmp_path / "cache")
+    dataset = transform(arrow_dataset)
+    backend.save("a_1", {"outputs": {"dataset": dataset}})
+
+    assert dataset_node(backend, "a_1")[backend.BLOB_MARKER] == "dataset_dir"
+    loaded = backend.load("a_1")["outputs"]["dataset"]
+    assert loaded.column_names == dataset.column_names
+    assert loaded.features == dataset.features
+    assert loaded.to_dict() == dataset.to_dict()
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from urartu.common.action import Action
+from urartu.common.cache import atomic_write
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+WORKER = """
+import os, sys, time
+from omegaconf import OmegaConf
+from urartu.common.action import Action
+
+runs_log = sys.argv[1]
+
+
+class SlowAction(Action):
+    def run(self):
+        with open(runs_log, "a") as f:
+            f.write(f"{os.getpid()}\\n")
+        time.sleep(0.5)
+
+    def get_outputs(self):
+        return {"answer": 42}
+
+
+cfg = OmegaConf.create({"action_name": "slow", "run_dir": sys.argv[2], "action_config": {"size": 3}})
+action = SlowAction(cfg, None)
+action.run_with_cache()
+assert dict(action._cached_outputs) == {"answer": 42}
+"""
+
+
+class SlowAction(Action):
+    runs = []
+
+    def run(self):
+        SlowAction.runs.append(threading.current_thread().name)
+        time.sleep(0.2)
+
+    def get_outputs(self):
+        return {"answer": 42, "runs": len(SlowAction.runs)}
+
+
+def test_threads_computing_the_same_key_run_the_action_once(make_cfg, monkeypatch):
+    monkeypatch.setattr(SlowAction, "runs", [])
+    outputs = {}
+
+    def compute(index):
+        action = SlowAction(make_cfg("slow", size=3), None)
+        action.run_with_cache()
+        outputs[index] = dict(action._cached_outputs)
+
+    threads = [threading.Thread(target=compute, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(SlowAction.runs) == 1
+    assert list(outputs.values()) == [{"answer": 42, "runs": 1}] * 4
+
+
+def test_async_writes_hold_the_key_until_the_entry_is_saved(make_cfg, monkeypatch):
+    monkeypatch.setattr(SlowAction, "runs", [])
+    first = SlowAction(make_cfg("slow", size=3, cache_async_write=True), None)
+    first.run_with_cache()
+    second = SlowAction(make_cfg("slow", size=3), None)
+    second.run_with_cache()
+
+    assert len(SlowAction.runs) == 1
+    assert dict(second._cached_outputs) == {"answer": 42, "runs": 1}
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="cache locks need fcntl")
+def test_processes_sharing_the_cache_compute_each_key_once(tmp_path):
+    runs_log = tmp_path / "runs.log"
+    run_dir = tmp_path / ".runs" / "slow" / "run"
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    workers = [
+        subprocess.Popen([sys.executable, "-c", WORKER, str(runs_log), str(run_dir)], env=env)
+        for _ in range(3)
+    ]
+
+    assert [worker.wait(timeout=120) for worker in workers] == [0, 0, 0]
+    assert len(runs_log.read_text().splitlines()) == 1
+
+
+def test_atomic_write_keeps_the_previous_file_when_writing_fails(tmp_path):
+    path = tmp_path / "entry.pkl"
+    path.write_bytes(b"complete")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write(b"partial")
+            raise RuntimeError("disk full")
+
+    assert path.read_bytes() == b"complete"
+    assert os.listdir(tmp_path) == ["entry.pkl"]
@@ -0,0 +1,69 @@
+import enum
+import hashlib
+import json
+from pathlib import Path
+
+from urartu.common.action import Action, action_cache_key
+from urartu.utils.hash import canonical_json
+
+
+class KeyedAction(Action):
+    def run(self):
+        pass
+
+
+class Split(enum.Enum):
+    TRAIN = "train"
+
+
+def json_dumps_key(action_name, config):
+    """The cache key as built before the config was canonicalized once per run."""
+    key_string = json.dumps({"action_name": action_name, "config": config}, sort_keys=True)
+    return f"{action_name}_{hashlib.sha256(key_string.encode()).hexdigest()[:16]}"
+
+
+def test_canonical_json_matches_json_dumps_on_plain_data():
+    config = {"b": [1, 2.5, None, True], "a": {"z": "é", "y": {}}, "c": "text"}
+    assert canonical_json(config) == json.dumps(config, sort_keys=True)
+
+
+def test_canonical_json_encodes_values_independently_of_order():
+    first = canonical_json({"tags": {"b", "a", "c"}, "path": Path("data") / "x", "split": Split.TRAIN})
+    second = canonical_json({"split": Split.TRAIN, "path": Path("data/x"), "tags": {"c", "a", "b"}})
+    assert first == second
+    assert json.loads(first) == {"path": "data/x", "split": "Split.TRAIN", "tags": ["a", "b", "c"]}
+
+
+def test_action_cache_key_is_unchanged_by_canonicalization():
+    config = {"model": "gpt2", "batch_size": 8, "nested": {"b": [1, 2], "a": None}}
+    assert action_cache_key("generate", canonical_json(config)) == json_dumps_key("generate", config)
+
+
+def test_action_key_is_stable_across_instances_and_key_order(make_cfg):
+    cfg = make_cfg("generate", model="gpt2", batch_size=8, nested={"b": [1, 2], "a": None})
+    reordered = make_cfg("generate", nested={"a": None, "b": [1, 2]}, batch_size=8, model="gpt2")
+
+    key = KeyedAction(cfg, None)._generate_cache_key()
+    assert KeyedAction(cfg, None)._generate_cache_key() == key
+    assert KeyedAction(reordered, None)._generate_cache_key() == key
+    assert key == json_dumps_key("generate", {"model": "gpt2", "batch_size": 8, "nested": {"b": [1, 2], "a": None}})
+
+
+def test_action_key_ignores_settings_that_do_not_change_outputs(make_cfg):
+    key = KeyedAction(make_cfg("generate", model="gpt2"), None)._generate_cache_key()
+    ignored = make_cfg("generate", model="gpt2", device="auto", debug=True, depends_on={"x": "y"})
+
+    assert KeyedAction(ignored, None)._generate_cache_key() == key
+    assert KeyedAction(make_cfg("generate", model="gpt2-xl"), None)._generate_cache_key() != key
+
+
+def test_config_changes_between_runs_change_the_key(make_cfg):
+    action = KeyedAction(make_cfg("generate", model="gpt2"), None)
+    action.run_with_cache()
+    first_key = action._cache_key
+
+    action.action_config.model = "gpt2-xl"
+    action.run_with_cache()
+
+    assert action._cache_key != first_key
+    assert action._cache_key == json_dumps_key("generate", {"model": "gpt2-xl"})
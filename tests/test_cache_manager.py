@@ -0,0 +1,143 @@
+import os
+import time
+
+import pytest
+
+from urartu.common.cache import ContentAddressedCacheBackend, PickleCacheBackend
+from urartu.common.cache_manager import CacheManager
+
+
+def save_entry(manager, backend, cache_key, outputs, last_access):
+    backend.save(cache_key, {"outputs": outputs, "action_name": cache_key.rsplit("_", 1)[0]})
+    manager.record_save(cache_key, cache_key.rsplit("_", 1)[0], backend)
+    manager.index.touch(cache_key, last_access)
+
+
+@pytest.fixture
+def no_grace(monkeypatch):
+    """Treat files of any age as orphans."""
+    monkeypatch.setattr(CacheManager, "ORPHAN_GRACE_SECONDS", -60)
+
+
+def test_evicts_least_recently_used_entries_first(tmp_path):
+    manager = CacheManager(tmp_path)
+    backend = PickleCacheBackend(tmp_path)
+    for index, cache_key in enumerate(["a_1", "b_1", "c_1", "d_1"]):
+        save_entry(manager, backend, cache_key, {"data": "x" * 1000}, last_access=100 + index)
+    # Reading "a" makes it the most recently used
+    manager.record_access("a_1", "a", backend)
+    entry_size = manager.index.get("b_1").size_bytes
+
+    evicted = manager.evict(2 * entry_size + 1, protect={"b_1"})
+
+    assert [entry.cache_key for entry in evicted] == ["c_1", "d_1"]
+    assert {entry.cache_key for entry in manager.index.entries()} == {"a_1", "b_1"}
+    assert not backend.exists("c_1") and not backend.exists("d_1")
+    assert backend.exists("a_1") and backend.exists("b_1")
+
+
+def test_saving_over_budget_evicts_older_entries_but_not_the_new_one(tmp_path):
+    backend = PickleCacheBackend(tmp_path)
+    sizing = CacheManager(tmp_path / "sizing")
+    save_entry(sizing, PickleCacheBackend(tmp_path / "sizing"), "a_1", {"data": "x" * 1000}, last_access=1)
+    entry_size = sizing.index.get("a_1").size_bytes
+
+    manager = CacheManager(tmp_path, max_bytes=2 * entry_size)
+    save_entry(manager, backend, "a_1", {"data": "x" * 1000}, last_access=1)
+    save_entry(manager, backend, "b_1", {"data": "y" * 1000}, last_access=2)
+    save_entry(manager, backend, "c_1", {"data": "z" * 1000}, last_access=3)
+
+    assert [entry.cache_key for entry in manager.index.entries()] == ["b_1", "c_1"]
+    assert manager.index.total_size() <= manager.max_bytes
+
+
+def test_gc_removes_expired_entries_and_rebuilds_the_index(tmp_path):
+    backend = PickleCacheBackend(tmp_path)
+    manager = CacheManager(tmp_path)
+    save_entry(manager, backend, "old_1", {"data": 1}, last_access=time.time())
+    save_entry(manager, backend, "new_1", {"data": 2}, last_access=time.time())
+    # Written before the index existed
+    backend.save("unindexed_1", {"outputs": {"data": 3}})
+    two_days_ago = time.time() - 48 * 3600
+    old_entry = manager.index.get("old_1")
+    old_entry.created = two_days_ago
+    manager.index.record(old_entry)
+
+    report = manager.gc(max_age_hours=24)
+
+    assert report["removed_entries"] == 1
+    assert {entry.cache_key for entry in manager.index.entries()} == {"new_1", "unindexed_1"}
+    assert not backend.exists("old_1")
+
+
+def test_evicting_content_addressed_entries_removes_their_unshared_blobs(tmp_path, no_grace):
+    backend = ContentAddressedCacheBackend(tmp_path)
+    manager = CacheManager(tmp_path)
+    shared = b"shared" * 100
+    save_entry(manager, backend, "a_1", {"shared": shared, "own": b"a" * 100}, last_access=1)
+    save_entry(manager, backend, "b_1", {"shared": shared, "own": b"b" * 100}, last_access=2)
+    a_blobs = set(backend.referenced_blobs("a_1"))
+    b_blobs = set(backend.referenced_blobs("b_1"))
+    assert len(a_blobs & b_blobs) == 1
+
+    manager.evict(manager.index.get("b_1").size_bytes)
+
+    assert not backend.exists("a_1")
+    assert all(blob.exists() for blob in b_blobs)
+    assert not any(blob.exists() for blob in a_blobs - b_blobs)
+    assert backend.load("b_1")["outputs"]["shared"] == shared
+
+
+def test_recent_unreferenced_blobs_are_kept(tmp_path):
+    backend = ContentAddressedCacheBackend(tmp_path)
+    manager = CacheManager(tmp_path)
+    backend.save("a_1", {"outputs": {"own": b"a" * 100}})
+    blobs = backend.referenced_blobs("a_1")
+    # The blobs of an entry whose manifest is not written yet
+    backend._manifest_path("a_1").unlink()
+
+    assert manager.remove_orphan_blobs() == 0
+    assert all(blob.exists() for blob in blobs)
+
+
+def test_remove_orphans_keeps_complete_entries_and_held_locks(tmp_path, no_grace):
+    backend = PickleCacheBackend(tmp_path)
+    manager = CacheManager(tmp_path)
+    save_entry(manager, backend, "kept_1", {"data": 1}, last_access=1)
+    manager.metadata_path("kept_1").write_text("action_name: kept\n")
+    manager.metadata_path("gone_1").write_text("action_name: gone\n")
+    (tmp_path / ".kept_1.pkl.1234.tmp").write_bytes(b"partial")
+    lock_dir = tmp_path / CacheManager.LOCK_DIRNAME
+    lock_dir.mkdir()
+    (lock_dir / "gone_1.lock").touch()
+    (lock_dir / "kept_1.lock").touch()
+
+    with manager.lock("busy_1"):
+        dry_run = manager.remove_orphans(dry_run=True)
+        assert (tmp_path / ".kept_1.pkl.1234.tmp").exists()
+        report = manager.remove_orphans()
+
+    assert dry_run == report
+    assert report["removed_files"] == 3
+    assert sorted(os.listdir(lock_dir)) == ["busy_1.lock", "kept_1.lock"]
+    assert not manager.metadata_path("gone_1").exists()
+    assert manager.metadata_path("kept_1").exists()
+    assert backend.exists("kept_1")
+
+
+def test_blobs_reused_by_an_entry_being_written_are_kept(tmp_path):
+    backend = ContentAddressedCacheBackend(tmp_path)
+    manager = CacheManager(tmp_path)
+    save_entry(manager, backend, "old_1", {"data": b"x" * 100}, last_access=1)
+    (blob,) = backend.referenced_blobs("old_1")
+    manager.evict(0)
+    assert blob.exists()
+    # Orphaned for longer than the grace period
+    two_hours_ago = time.time() - 2 * 3600
+    os.utime(blob, (two_hours_ago, two_hours_ago))
+
+    # A new entry reuses the blob; another job collects orphans before its manifest is written
+    node = backend._encode_output(b"x" * 100)
+    assert manager.remove_orphan_blobs() == 0
+    assert blob.exists()
+    assert node["blob"] == str(blob.relative_to(backend.blob_dir))
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformer_lens")
+
+from urartu.common.action import Action
+from urartu.intervention.circuit_discovery.circuit_discovery import CircuitTransformer
+
+VOCAB_SIZE = 4
+
+
+class Preempted(Exception):
+    pass
+
+
+class TinyPruner(CircuitTransformer):
+    """CircuitTransformer pruning a single weight mask over a fixed random "model"."""
+
+    def __init__(self, batches, preempt_after=None):
+        torch.nn.Module.__init__(self)
+        weight_hparams = SimpleNamespace(
+            lr=0.1,
+            train_epochs=2,
+            lambda_sparse_init=0.5,
+            max_times_lambda_sparse=1.0,
+            min_times_lambda_sparse=1.0,
+            n_epoch_warmup_lambda_sparse=0,
+            n_epoch_cooldown_lambda_sparse=0,
+            lambda_complete_init=0.0,
+        )
+        self.cfg = SimpleNamespace(weight=weight_hparams, device="cpu", evaluate_every=1000)
+        generator = torch.Generator().manual_seed(0)
+        self.base_logits = torch.randn(VOCAB_SIZE, VOCAB_SIZE, generator=generator)
+        self.mask_logits_dict_weight = {"mask": torch.nn.Parameter(torch.zeros(VOCAB_SIZE))}
+        self.mask_logits_dict_edge = {}
+        self.dls = SimpleNamespace(train=batches)
+        self.checkpoint_hook = None
+        self._prune_progress = None
+        self._resume_progress = None
+        self._optimizer = None
+        self._completed_prune_modes = []
+        self.preempt_after = preempt_after
+        self.batches_seen = []
+
+    def forward(self, input_ids):
+        if self.preempt_after is not None and len(self.batches_seen) == self.preempt_after:
+            raise Preempted()
+        self.batches_seen.append(int(input_ids[0, 0]))
+        return (self.base_logits[input_ids] * torch.sigmoid(self.mask_logits_dict_weight["mask"]),)
+
+    def turn_on_weight_masks(self, deterministic=False, reverse=False):
+        pass
+
+    def turn_off_weight_masks(self):
+        pass
+
+    def turn_off_edge_masks(self):
+        pass
+
+    def weight_sparseness_loss(self):
+        return torch.sigmoid(self.mask_logits_dict_weight["mask"]).mean()
+
+
+def make_batches():
+    batches = []
+    for index in range(3):
+        input_ids = torch.tensor([[index, 1], [index, 2]])
+        batches.append({
+            "input_ids": input_ids,
+            "seq_lens": torch.tensor([2, 2]),
+            "target good": torch.tensor([0, 3]),
+            "target bad": torch.tensor([1, 2]),
+        })
+    return batches
+
+
+class PruneAction(Action):
+    preempt_after = None
+
+    def run(self):
+        self.pruner = self.register_intervention(TinyPruner(make_batches(), self.preempt_after))
+        self.pruner.run_prune("w")
+
+
+def test_interrupted_run_prune_resumes_where_it_stopped(make_cfg, monkeypatch):
+    # Every training step is checkpointed
+    cfg = make_cfg(cache_enabled=False, checkpoint_interval_minutes=1e-9)
+
+    reference = PruneAction(cfg, None)
+    reference.run_with_cache()
+    reference_mask = reference.pruner.mask_logits_dict_weight["mask"].detach().clone()
+    assert reference.pruner.batches_seen == [0, 1, 2, 0, 1, 2]
+
+    # Preempted in the second epoch, after four training steps
+    monkeypatch.setattr(PruneAction, "preempt_after", 4)
+    interrupted = PruneAction(cfg, None)
+    with pytest.raises(Preempted):
+        interrupted.run_with_cache()
+    assert interrupted.checkpoint_path.exists()
+
+    monkeypatch.setattr(PruneAction, "preempt_after", None)
+    resumed = PruneAction(cfg, None)
+    resumed.run_with_cache()
+
+    assert resumed.pruner.batches_seen == [1, 2]
+    assert resumed.pruner._completed_prune_modes == ["w"]
+    assert torch.allclose(resumed.pruner.mask_logits_dict_weight["mask"], reference_mask)
+    assert not resumed.checkpoint_path.exists()
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from urartu import CleanCommand
+
+
+def make_run(path, run_hash=None):
+    path.mkdir(parents=True)
+    (path / "output.txt").write_text("x" * 100)
+    if run_hash:
+        (path / f"{run_hash}.yaml").write_text("{}")
+    return path
+
+
+@pytest.fixture
+def runs_dir(tmp_path):
+    runs = tmp_path / ".runs"
+    make_run(runs / "generate" / "2024-01-01_10-00-00", "kept")
+    make_run(runs / "generate" / "2024-01-02_10-00-00", "deleted")
+    make_run(runs / "generate" / "debug" / "2024-01-03_10-00-00")
+    make_run(runs / "generate" / "nested" / "2024-01-04_10-00-00")
+    make_run(runs / "sweep" / "2024-01-05_10-00-00_multirun" / "0", "kept")
+    make_run(runs / "sweep" / "2024-01-05_10-00-00_multirun" / "1")
+    make_run(runs / "sweep" / "2024-01-06_10-00-00_multirun" / "0")
+    make_run(runs / "pipeline_cache" / "2024-01-07_10-00-00")
+    return runs
+
+
+def clean(runs_dir, **options):
+    command = CleanCommand(aim_repo_path="unused", runs_dir=str(runs_dir), workers="4", **options)
+    with ThreadPoolExecutor(max_workers=command.workers) as pool:
+        command._process_action_directories(runs_dir, {"kept"}, pool)
+
+
+def remaining_runs(runs_dir):
+    return sorted(str(path.parent.relative_to(runs_dir)) for path in runs_dir.rglob("output.txt"))
+
+
+def test_clean_deletes_runs_without_an_aim_run(runs_dir):
+    clean(runs_dir)
+
+    assert remaining_runs(runs_dir) == [
+        "generate/2024-01-01_10-00-00",
+        "pipeline_cache/2024-01-07_10-00-00",
+        "sweep/2024-01-05_10-00-00_multirun/0",
+    ]
+
+
+def test_dry_run_reports_the_reclaimable_bytes_and_deletes_nothing(runs_dir, caplog):
+    before = remaining_runs(runs_dir)
+    with caplog.at_level("INFO"):
+        clean(runs_dir, dry_run="true")
+
+    assert remaining_runs(runs_dir) == before
+    assert "Would delete directory" in caplog.text
+    assert "Would reclaim" in caplog.text
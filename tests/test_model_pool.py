@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from urartu.common.model_pool import ModelPool, model_key
+
+
+class Weights:
+    """Stand-in for a model tensor, sized in bytes."""
+
+    def __init__(self, size_bytes):
+        self.size_bytes = size_bytes
+
+    def numel(self):
+        return self.size_bytes
+
+    def element_size(self):
+        return 1
+
+
+class FakeModel:
+    def __init__(self, name, size_bytes=100):
+        self.name = name
+        self.weights = [Weights(size_bytes)]
+
+    def parameters(self):
+        return self.weights
+
+
+def test_keys_tell_loaders_options_and_revisions_apart():
+    causal = model_key("gpt2", "float16", None, "cuda", "ModelForCausalLM._load_model", trust_remote_code=None)
+    pipeline = model_key("gpt2", "float16", None, "cuda", "ModelPipeline._load_clm_model")
+
+    assert causal != pipeline
+    assert causal != model_key("gpt2", "float16", None, "cuda", "ModelForCausalLM._load_model",
+                               trust_remote_code=True)
+    assert pipeline != model_key("gpt2", "float16", "v2", "cuda", "ModelPipeline._load_clm_model")
+    assert model_key("gpt2", None) != model_key("gpt2", "None")
+    assert model_key("gpt2", loader="load", b=1, a=2) == model_key("gpt2", loader="load", a=2, b=1)
+
+
+def test_concurrent_acquirers_share_a_single_load():
+    pool = ModelPool()
+    loads = []
+    key = model_key("gpt2", loader="load")
+
+    def loader():
+        loads.append(threading.current_thread().name)
+        return FakeModel("gpt2")
+
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(pool.acquire(key, loader))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert len({id(model) for model in models}) == 1
+    for _ in range(3):
+        pool.release(key)
+    assert len(pool) == 1
+    pool.release(key)
+    assert len(pool) == 0
+
+
+def test_idle_models_are_kept_within_the_budget_while_resident():
+    pool = ModelPool()
+    small, large, other = (model_key(name, loader="load") for name in ("small", "large", "other"))
+    with pool.keep_resident(max_bytes=250):
+        pool.acquire(small, lambda: FakeModel("small", 100))
+        pool.release(small)
+        pool.acquire(large, lambda: FakeModel("large", 100))
+        pool.release(large)
+        assert len(pool) == 2
+
+        # Loading a third model evicts the least recently used idle one
+        pool.acquire(other, lambda: FakeModel("other", 100))
+        assert len(pool) == 2
+        assert pool.acquire(large, lambda: FakeModel("reloaded")).name == "large"
+        pool.release(large)
+        pool.release(other)
+
+        pool.trim({"other"})
+        assert len(pool) == 1
+    assert len(pool) == 0
+
+
+def test_acquiring_while_a_loaded_model_is_stored_does_not_load_it_again():
+    pool = ModelPool()
+    key = model_key("gpt2", loader="load")
+    sizing, proceed = threading.Event(), threading.Event()
+    loads = []
+
+    class SlowToSize(FakeModel):
+        def parameters(self):
+            sizing.set()
+            proceed.wait(timeout=10)
+            return super().parameters()
+
+    def loader():
+        loads.append(1)
+        return SlowToSize("gpt2")
+
+    models = []
+    first = threading.Thread(target=lambda: models.append(pool.acquire(key, loader)))
+    first.start()
+    assert sizing.wait(timeout=10)
+    second = threading.Thread(target=lambda: models.append(pool.acquire(key, loader)))
+    second.start()
+    second.join(timeout=0.2)
+    proceed.set()
+    first.join()
+    second.join()
+
+    assert len(loads) == 1
+    assert models[0] is models[1]
+    pool.release(key)
+    assert len(pool) == 1
+    pool.release(key)
+    assert len(pool) == 0
+
+
+def test_a_failed_load_can_be_retried():
+    pool = ModelPool()
+    key = model_key("gpt2", loader="load")
+
+    def broken():
+        raise OSError("checkpoint not found")
+
+    with pytest.raises(OSError):
+        pool.acquire(key, broken)
+    assert pool.acquire(key, lambda: FakeModel("gpt2")).name == "gpt2"
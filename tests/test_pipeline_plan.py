@@ -0,0 +1,137 @@
+import json
+import logging
+import sys
+
+import pytest
+from omegaconf import OmegaConf
+
+from urartu.common.pipeline import Pipeline
+
+ACTIONS = {
+    "plain": '''
+from urartu.common.action import Action
+
+
+class Plain(Action):
+    def run(self):
+        self.outputs = {"value": self.action_config.value}
+
+    def get_outputs(self):
+        return self.outputs
+''',
+    "versioned": '''
+from urartu.common.action import Action
+
+
+class Versioned(Action):
+    def get_action_version(self):
+        return "v2"
+
+    def run(self):
+        self.outputs = {"value": self.action_config.value}
+
+    def get_outputs(self):
+        return self.outputs
+''',
+    "consumer": '''
+from urartu.common.action import Action
+
+
+class Consumer(Action):
+    def run(self):
+        self.outputs = {"value": self.action_config.value + 1}
+
+    def get_outputs(self):
+        return self.outputs
+''',
+}
+
+
+@pytest.fixture
+def project(make_project):
+    return make_project(**ACTIONS)
+
+
+def make_pipeline(project, actions, run_name="run", **cfg):
+    return Pipeline(OmegaConf.create({
+        "action_config": "pipe",
+        "run_dir": str(project / ".runs" / "pipe" / run_name),
+        "pipeline_config": {"actions": actions},
+        **cfg,
+    }), None)
+
+
+def statuses(pipeline):
+    return {entry.name: entry.status for entry in pipeline.plan()}
+
+
+def test_plan_matches_what_a_run_caches(project):
+    actions = [
+        {"action_name": "plain", "value": 1, "cache_code_fingerprint": True},
+        {"action_name": "consumer", "value": "{{actions.plain.value}}"},
+    ]
+    before = make_pipeline(project, actions).plan()
+    assert [entry.status for entry in before] == ["run", "run"]
+    assert before[1].reason == "depends on plain"
+
+    pipeline = make_pipeline(project, actions)
+    pipeline.run()
+    after = make_pipeline(project, actions).plan()
+
+    assert [entry.status for entry in after] == ["cached", "cached"]
+    assert after[0].cache_key == before[0].cache_key == pipeline.action_outputs["plain"].metadata["cache_key"]
+    assert after[1].cache_key == pipeline.action_outputs["consumer"].metadata["cache_key"]
+
+
+def test_changed_config_replans_the_action_and_its_dependents(project):
+    make_pipeline(project, [
+        {"action_name": "plain", "value": 1},
+        {"action_name": "consumer", "value": "{{actions.plain.value}}"},
+    ]).run()
+
+    changed = make_pipeline(project, [
+        {"action_name": "plain", "value": 2},
+        {"action_name": "consumer", "value": "{{actions.plain.value}}"},
+    ])
+    assert statuses(changed) == {"plain": "run", "consumer": "run"}
+
+
+def test_overridden_code_versions_are_unknown_until_imported(project):
+    pipeline = make_pipeline(project, [
+        {"action_name": "versioned", "value": 1},
+        {"action_name": "consumer", "value": "{{actions.versioned.value}}"},
+    ])
+    planned = pipeline.plan()
+
+    assert [entry.status for entry in planned] == ["unknown", "unknown"]
+    assert planned[1].reason == "depends on versioned"
+    assert "actions.versioned" not in sys.modules
+
+
+def test_plan_option_writes_the_plan_without_running(project):
+    pipeline = make_pipeline(project, [{"action_name": "plain", "value": 1}], plan=True)
+    pipeline.run()
+
+    with open(project / ".runs" / "pipe" / "run" / "plan.json") as f:
+        plan = json.load(f)
+    assert [(entry["name"], entry["status"]) for entry in plan] == [("plain", "run")]
+    assert pipeline.action_outputs == {}
+
+
+def test_config_merge_details_are_only_logged_for_cache_debugging(project, caplog):
+    actions = [
+        {"action_name": "plain", "value": 1},
+        {"action_name": "consumer", "value": 0, "depends_on": {"plain": {"value": "value"}}},
+    ]
+    make_pipeline(project, actions).run()
+
+    with caplog.at_level(logging.INFO):
+        make_pipeline(project, actions).plan()
+    assert "Config merge" not in caplog.text
+    assert "Injected" not in caplog.text
+
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG, logger="urartu.debug_cache"):
+        make_pipeline(project, actions).plan()
+    assert "Config merge for 'consumer'" in caplog.text
+    assert "Injected plain.value → value = 1" in caplog.text
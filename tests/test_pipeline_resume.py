@@ -0,0 +1,141 @@
+import json
+
+import pytest
+from omegaconf import OmegaConf
+
+from urartu.common.pipeline import Pipeline
+from urartu.common.pipeline_checkpoint import PipelineCheckpoint
+
+ACTIONS = {
+    "producer": '''
+from pathlib import Path
+from urartu.common.action import Action
+
+
+class Producer(Action):
+    def run(self):
+        with open(Path.cwd() / "runs.log", "a") as f:
+            f.write("producer\\n")
+        self.outputs = {"prompts": [f"p{i}" for i in range(self.action_config.n)]}
+
+    def get_outputs(self):
+        return self.outputs
+''',
+    "counter": '''
+from pathlib import Path
+from urartu.common.action import Action
+
+
+class Counter(Action):
+    def run(self):
+        with open(Path.cwd() / "runs.log", "a") as f:
+            f.write("counter\\n")
+        self.outputs = {"count": len(self.action_config.prompts)}
+
+    def get_outputs(self):
+        return self.outputs
+''',
+    "flaky": '''
+import os
+from pathlib import Path
+from urartu.common.action import Action
+
+
+class Flaky(Action):
+    def run(self):
+        with open(Path.cwd() / "runs.log", "a") as f:
+            f.write("flaky\\n")
+        if os.environ.get("URARTU_TEST_FAIL"):
+            raise RuntimeError("flaky failed")
+        self.outputs = {"total": self.action_config.count * 10}
+
+    def get_outputs(self):
+        return self.outputs
+''',
+}
+
+
+@pytest.fixture
+def project(make_project):
+    return make_project(**ACTIONS)
+
+
+def make_pipeline(project, run_name, resume=False, n=3):
+    cfg = OmegaConf.create({
+        "action_config": "pipe",
+        "run_dir": str(project / ".runs" / "pipe" / run_name),
+        "resume": resume,
+        "pipeline_config": {
+            "actions": [
+                {"action_name": "producer", "n": n},
+                {"action_name": "counter", "cache_enabled": False, "prompts": "{{actions.producer.prompts}}"},
+                {"action_name": "flaky", "count": "{{actions.counter.count}}"},
+            ],
+        },
+    })
+    return Pipeline(cfg, None)
+
+
+def runs(project):
+    log = project / "runs.log"
+    return log.read_text().split() if log.exists() else []
+
+
+def test_resume_continues_from_the_failed_action(project, monkeypatch):
+    monkeypatch.setenv("URARTU_TEST_FAIL", "1")
+    with pytest.raises(RuntimeError, match="flaky failed"):
+        make_pipeline(project, "first").run()
+    manifest = PipelineCheckpoint.load(project / ".runs" / "pipe" / "first").manifest
+    assert manifest["status"] == "failed"
+    assert manifest["failed_action"] == "flaky"
+    assert manifest["actions"]["producer"]["outputs"]["location"] == "cache"
+    assert manifest["actions"]["counter"]["outputs"]["location"] == "checkpoint"
+
+    monkeypatch.delenv("URARTU_TEST_FAIL")
+    pipeline = make_pipeline(project, "second", resume=True)
+    pipeline.run()
+
+    assert runs(project) == ["producer", "counter", "flaky", "flaky"]
+    assert pipeline.action_outputs["flaky"].outputs == {"total": 30}
+    with open(project / ".runs" / "pipe" / "second" / PipelineCheckpoint.MANIFEST_NAME) as f:
+        resumed = json.load(f)
+    assert resumed["status"] == "completed"
+    assert resumed["resumed_from"] == str((project / ".runs" / "pipe" / "first").resolve())
+    assert set(resumed["actions"]) == {"producer", "counter", "flaky"}
+
+
+def test_resumed_run_is_not_resumed_again(project, monkeypatch):
+    monkeypatch.setenv("URARTU_TEST_FAIL", "1")
+    with pytest.raises(RuntimeError):
+        make_pipeline(project, "first").run()
+    with pytest.raises(RuntimeError):
+        make_pipeline(project, "second", resume=True).run()
+
+    # The latest failure is resumed, and it restores what the first run completed
+    assert PipelineCheckpoint.find_resumable(project / ".runs" / "pipe" / "third").parent.name == "second"
+    monkeypatch.delenv("URARTU_TEST_FAIL")
+    make_pipeline(project, "third", resume=True).run()
+    assert runs(project) == ["producer", "counter", "flaky", "flaky", "flaky"]
+    assert PipelineCheckpoint.find_resumable(project / ".runs" / "pipe" / "fourth") is None
+
+
+def test_actions_whose_config_changed_run_again_on_resume(project, monkeypatch):
+    monkeypatch.setenv("URARTU_TEST_FAIL", "1")
+    with pytest.raises(RuntimeError):
+        make_pipeline(project, "first").run()
+
+    monkeypatch.delenv("URARTU_TEST_FAIL")
+    pipeline = make_pipeline(project, "second", resume=True, n=4)
+    pipeline.run()
+
+    # The changed producer invalidates the counter depending on it
+    assert runs(project) == ["producer", "counter", "flaky", "producer", "counter", "flaky"]
+    assert pipeline.action_outputs["flaky"].outputs == {"total": 40}
+
+
+def test_resume_without_an_unfinished_run_starts_from_scratch(project):
+    make_pipeline(project, "first").run()
+    make_pipeline(project, "second", resume=True).run()
+
+    # The producer is a cache hit, the uncached counter runs again
+    assert runs(project) == ["producer", "counter", "flaky", "counter"]
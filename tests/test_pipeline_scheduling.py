@@ -0,0 +1,101 @@
+import pytest
+from omegaconf import OmegaConf
+
+from urartu.common.pipeline import Pipeline, PipelineAction
+
+ACTIONS = {
+    "step": '''
+import threading
+from urartu.common.action import Action
+
+ORDER = []
+# Actions with `meet: true` wait here for each other, which only works if they run concurrently
+BARRIER = threading.Barrier(2, timeout=10)
+
+
+class Step(Action):
+    def run(self):
+        if self.action_config.get("meet", False):
+            BARRIER.wait()
+        if self.action_config.get("fail", False):
+            raise RuntimeError(f"{self.action_config.label} failed")
+        ORDER.append(self.action_config.label)
+        self.outputs = {"label": self.action_config.label, "inputs": list(self.action_config.get("inputs", []))}
+
+    def get_outputs(self):
+        return self.outputs
+''',
+}
+
+
+@pytest.fixture
+def project(make_project):
+    return make_project(**ACTIONS)
+
+
+def make_pipeline(project, actions, **pipeline_config):
+    cfg = OmegaConf.create({
+        "action_config": "pipe",
+        "run_dir": str(project / ".runs" / "pipe" / "run"),
+        "pipeline_config": pipeline_config,
+    })
+    pipeline = Pipeline(cfg, None)
+    # Several actions of the same module, which the `actions` list of a pipeline config cannot name apart
+    pipeline._initialized = True
+    for action in actions:
+        pipeline.add_action(PipelineAction(action["label"], "step", {"cache_enabled": False, **action}))
+    return pipeline
+
+
+def order():
+    from actions.step import ORDER
+
+    return ORDER
+
+
+def test_actions_run_after_the_actions_they_reference(project):
+    pipeline = make_pipeline(project, [
+        {"label": "c", "inputs": ["{{actions.a.label}}", "{{actions.b.label}}"]},
+        {"label": "b", "inputs": ["{{actions.a.label}}"]},
+        {"label": "a"},
+    ])
+    pipeline.run()
+
+    assert order() == ["a", "b", "c"]
+    assert pipeline.action_outputs["c"].outputs["inputs"] == ["a", "b"]
+    assert list(pipeline.action_outputs) == ["c", "b", "a"]
+
+
+def test_depends_on_orders_actions_without_references(project):
+    pipeline = make_pipeline(project, [
+        {"label": "late", "depends_on": {"early": {}}},
+        {"label": "early"},
+    ])
+    pipeline.run()
+
+    assert order() == ["early", "late"]
+
+
+def test_independent_actions_run_concurrently(project):
+    pipeline = make_pipeline(project, [
+        {"label": "left", "meet": True},
+        {"label": "right", "meet": True},
+        {"label": "join", "inputs": ["{{actions.left.label}}", "{{actions.right.label}}"]},
+    ], max_parallel_actions=2)
+    pipeline.run()
+
+    assert sorted(order()[:2]) == ["left", "right"]
+    assert order()[2] == "join"
+
+
+def test_a_failed_action_stops_its_dependents(project):
+    pipeline = make_pipeline(project, [
+        {"label": "broken", "fail": True},
+        {"label": "downstream", "inputs": ["{{actions.broken.label}}"]},
+        {"label": "unrelated"},
+    ])
+    with pytest.raises(RuntimeError, match="broken failed"):
+        pipeline.run()
+
+    assert order() == []
+    assert "downstream" not in pipeline.action_outputs
@@ -0,0 +1,61 @@
+import io
+import logging
+import sys
+
+from urartu.utils.tee import LogFileWriter, TeeStream, restore_output, tee_output
+
+
+def test_output_reaches_the_log_in_order_on_close(tmp_path):
+    writer = LogFileWriter(tmp_path / "run.log", flush_interval=60)
+    stdout = TeeStream(io.StringIO(), writer, "stdout")
+    stderr = TeeStream(io.StringIO(), writer, "stderr")
+    for line in range(3):
+        stdout.write(f"out {line}\n")
+        stderr.write(f"err {line}\n")
+    stdout.flush()
+    # Left to the flusher thread
+    assert (tmp_path / "run.log").read_text() == ""
+
+    writer.close()
+    assert (tmp_path / "run.log").read_text().splitlines() == [
+        "out 0", "err 0", "out 1", "err 1", "out 2", "err 2",
+    ]
+    assert stdout.terminal.getvalue() == "out 0\nout 1\nout 2\n"
+
+
+def test_a_full_buffer_is_written_right_away(tmp_path):
+    writer = LogFileWriter(tmp_path / "run.log", flush_interval=60, max_buffer_bytes=10)
+    writer.write("short\n")
+    assert (tmp_path / "run.log").read_text() == ""
+    writer.write("long enough\n")
+    assert (tmp_path / "run.log").read_text() == "short\nlong enough\n"
+    writer.close()
+
+
+def test_progress_redraws_are_thinned_but_the_last_one_is_kept(tmp_path):
+    writer = LogFileWriter(tmp_path / "run.log", flush_interval=60, progress_interval=60)
+    for percent in range(0, 101, 10):
+        writer.write(f"\r{percent}%", source="stderr")
+    writer.write("\n", source="stderr")
+    writer.write("\rother stream", source="stdout")
+    writer.close()
+
+    assert (tmp_path / "run.log").read_bytes() == b"\r0%\r100%\n\rother stream"
+
+
+def test_tee_output_switches_log_files(tmp_path):
+    stdout, stderr = sys.stdout, sys.stderr
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers, root_logger.level
+    try:
+        tee_output(tmp_path / "first.log")
+        print("first")
+        tee_output(tmp_path / "second.log")
+        print("second")
+    finally:
+        restore_output()
+        root_logger.handlers, root_logger.level = handlers, level
+
+    assert (sys.stdout, sys.stderr) == (stdout, stderr)
+    assert (tmp_path / "first.log").read_text() == "first\n"
+    assert (tmp_path / "second.log").read_text() == "second\n"
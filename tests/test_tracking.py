@@ -0,0 +1,171 @@
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from urartu.utils.tracking import (AsyncTracker, LocalTracker, flush_async_tracking, get_tracking_writer,
+                                   read_local_tracking)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+class RecordingRun:
+    """Stand-in for an Aim run keeping what it is given."""
+
+    def __init__(self):
+        self.items = {}
+        self.tracked = []
+        self.threads = set()
+
+    def track(self, value, name=None, step=None, epoch=None, context=None):
+        self.tracked.append((name, value, context))
+        self.threads.add(threading.current_thread().name)
+
+    def set(self, key, value, strict=True):
+        self.items[key] = value
+
+    def __setitem__(self, key, value):
+        self.items[key] = value
+
+    def __getitem__(self, key):
+        return self.items[key]
+
+    def fail(self):
+        raise RuntimeError("repository locked")
+
+
+def test_calls_are_applied_in_order_by_the_writer_thread():
+    run = RecordingRun()
+    tracker = AsyncTracker(run)
+    for step in range(500):
+        tracker.track(step, name="loss")
+    tracker["done"] = True
+
+    # Reading waits for the pending calls
+    assert tracker["done"] is True
+    assert [value for _, value, _ in run.tracked] == list(range(500))
+    assert run.threads == {"urartu-tracking-writer"}
+
+
+def test_containers_are_copied_when_queued():
+    run = RecordingRun()
+    tracker = AsyncTracker(run)
+    outputs = {"files": ["a.json"]}
+    context = {"subset": "train"}
+    tracker["outputs"] = outputs
+    tracker.set("params", outputs)
+    tracker.track(1.0, name="loss", context=context)
+    outputs["files"].append("b.json")
+    context["subset"] = "test"
+    flush_async_tracking()
+
+    assert run.items == {"outputs": {"files": ["a.json"]}, "params": {"files": ["a.json"]}}
+    assert run.tracked == [("loss", 1.0, {"subset": "train"})]
+
+
+def test_failed_calls_are_reported_at_flush(caplog):
+    run = RecordingRun()
+    tracker = AsyncTracker(run)
+    flush_async_tracking()
+    failed_before = get_tracking_writer().failed
+    get_tracking_writer().submit(run, "fail", (), {})
+    get_tracking_writer().submit(run, "fail", (), {})
+    tracker.track(1.0, name="loss")
+
+    with caplog.at_level(logging.WARNING, logger="urartu.utils.tracking"):
+        assert flush_async_tracking() == 2
+    assert "2 background tracking call(s) failed" in caplog.text
+    assert "RuntimeError: repository locked" in caplog.text
+    assert get_tracking_writer().failed == failed_before + 2
+    # Calls after a failure are still applied, and failures are reported once
+    assert run.tracked == [("loss", 1.0, None)]
+    assert flush_async_tracking() == 0
+
+
+def test_writes_without_a_run_are_dropped():
+    tracker = AsyncTracker(None)
+    tracker.track(1.0, name="loss")
+    tracker["key"] = "value"
+    assert flush_async_tracking() == 0
+
+
+def run_python(code, wait=True):
+    """Run code in a fresh interpreter importing urartu from this checkout."""
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    process = subprocess.Popen([sys.executable, "-c", code], env=env)
+    if wait:
+        process.wait(timeout=60)
+    return process
+
+
+def test_local_tracker_reopens_the_same_run(tmp_path):
+    tracker = LocalTracker(tmp_path, experiment="sweep")
+    tracker["cfg"] = {"lr": 0.1}
+    tracker.track(1.0, name="loss")
+    tracker.track(0.5, name="loss")
+    tracker.track(0.9, name="acc", context={"subset": "val"})
+    tracker.close()
+
+    reopened = LocalTracker(tmp_path)
+    reopened.track(0.25, name="loss")
+    reopened.close()
+
+    assert reopened.hash == tracker.hash
+    assert reopened["cfg"] == {"lr": 0.1}
+    steps = [record["step"] for record in read_local_tracking(tracker.path)
+             if record["type"] == "track" and record["name"] == "loss"]
+    assert steps == [0, 1, 2]
+
+
+def test_local_tracker_records_survive_a_killed_process(tmp_path):
+    run_python(
+        "import os, signal\n"
+        "from urartu.utils.tracking import LocalTracker\n"
+        f"tracker = LocalTracker({str(tmp_path)!r})\n"
+        "for step in range(100):\n"
+        "    tracker.track(float(step), name='loss')\n"
+        "os.kill(os.getpid(), signal.SIGKILL)\n"
+    )
+
+    records = read_local_tracking(tmp_path / LocalTracker.FILENAME)
+    assert [record["value"] for record in records if record["type"] == "track"] == [float(i) for i in range(100)]
+
+
+def test_local_tracker_is_opened_once_per_process(tmp_path):
+    tracker = LocalTracker(tmp_path)
+    with pytest.raises(RuntimeError, match="already open"):
+        LocalTracker(tmp_path)
+    tracker.close()
+    LocalTracker(tmp_path).close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="file locks need fcntl")
+def test_second_process_waits_for_the_first_tracker_to_close(tmp_path):
+    tracker = LocalTracker(tmp_path)
+    child = run_python(
+        "from urartu.utils.tracking import LocalTracker\n"
+        f"tracker = LocalTracker({str(tmp_path)!r})\n"
+        "tracker.track(2.0, name='loss')\n"
+        "tracker.close()\n",
+        wait=False,
+    )
+    time.sleep(1)
+    assert child.poll() is None
+    tracker.track(1.0, name="loss")
+    tracker.close()
+    assert child.wait(timeout=60) == 0
+
+    records = [record for record in read_local_tracking(tracker.path) if record["type"] == "track"]
+    assert [(record["value"], record["step"]) for record in records] == [(1.0, 0), (2.0, 1)]
+
+
+def test_tracking_import_without_aim_repo_path_prints_the_usage(tmp_path, capsys):
+    from urartu import TrackingCommand
+
+    TrackingCommand(runs_dir=str(tmp_path)).execute()
+    assert "urartu tracking import aim_repo_path=PATH" in capsys.readouterr().out
@@ -4,21 +4,14 @@ import re
 import shutil
 import sys
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 
-from aim import Repo, Run
-from hydra.core.hydra_config import HydraConfig
-from hydra.core.plugins import Plugins
-from omegaconf import OmegaConf
+from omegaconf import DictConfig, OmegaConf
 
-from urartu.utils.hydra_plugin import UrartuPlugin
-from urartu.utils.launcher import launch, launch_on_slurm
-
-Plugins.instance().register(UrartuPlugin)
-
-import hydra
-from omegaconf import DictConfig
+# Heavy dependencies (hydra, aim, submitit and, through the actions, torch and transformers)
+# are imported on the code paths that need them, so `urartu --help` and the commands start fast.
 
 
 class Command(ABC):
@@ -36,12 +29,61 @@ class Command(ABC):
         pass
 
 
+USAGE = """Usage: urartu action_config=ACTION_NAME [other_params]
+
+Required arguments:
+  action_config=ACTION_NAME    Name of the action to run (must exist in actions/ directory)
+
+Optional arguments:
+  debug=true                  Run in debug mode
+  slurm.use_slurm=true       Run on SLURM cluster
+  aim.use_aim=true           Use Aim for experiment tracking
+  tracker=local              Track in a JSONL file in the run directory instead (default without Aim)
+  --plan                      Only report which pipeline actions are cached and which would run
+  --resume                    Resume the latest failed run of a pipeline from the action that failed
+
+Example:
+  urartu action_config=generate aim=aim slurm=slurm
+
+Commands:
+  urartu clean aim_repo_path=PATH runs_dir=PATH [dry_run=true] [purge_cache=true] [workers=N]
+                              Remove run directories without a matching Aim run
+  urartu cache gc [runs_dir=.runs] [max_size_gb=N] [max_age_hours=N] [dry_run=true]
+                              Evict least-recently-used pipeline cache entries
+  urartu tracking import aim_repo_path=PATH [runs_dir=.runs]
+                              Import runs tracked locally into an Aim repository
+"""
+
+
 class CleanCommand(Command):
-    """Command to clean up runs that are not present in the Aim repository."""
+    """
+    Command to clean up runs that are not present in the Aim repository.
+
+    Run directories are found by a parallel walk of the runs directory (os.scandir on a thread
+    pool) that does not descend into the run directories themselves, matched against the set of
+    Aim run hashes and deleted in parallel. With `dry_run=true` nothing is deleted and the bytes
+    that would be reclaimed are reported instead; with `purge_cache=true` orphaned files of the
+    shared pipeline cache are removed as well (see CacheManager.remove_orphans).
+    """
 
-    def __init__(self, aim_repo_path: str, runs_dir: str):
+    DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}")
+    MULTIRUN_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}_multirun$")
+    # Directories of the runs directory that do not belong to an action
+    SKIPPED_DIRECTORIES = {"pipeline_cache"}
+
+    def __init__(
+        self,
+        aim_repo_path: str,
+        runs_dir: str,
+        dry_run: str = "false",
+        purge_cache: str = "false",
+        workers: Optional[str] = None,
+    ):
         self.aim_repo_path = aim_repo_path
         self.runs_dir = runs_dir
+        self.dry_run = dry_run.lower() in ("true", "1", "yes")
+        self.purge_cache = purge_cache.lower() in ("true", "1", "yes")
+        self.workers = int(workers) if workers is not None else min(32, (os.cpu_count() or 1) * 4)
 
     @staticmethod
     def get_command_name() -> str:
@@ -55,9 +97,11 @@ class CleanCommand(Command):
             handlers=[logging.StreamHandler()],
         )
 
-        # Get run hashes from Aim repo
+        from aim import Repo
+
+        # Get run hashes from Aim repo; a set makes each lookup O(1) with 100k+ runs
         repo = Repo(self.aim_repo_path)
-        run_hashes = repo.list_all_runs()
+        run_hashes = set(repo.list_all_runs())
         logging.info(f"Total number of runs found: {len(run_hashes)}")
 
         run_dir = Path(self.runs_dir)
@@ -65,107 +109,263 @@ class CleanCommand(Command):
             logging.warning(f"Run directory {run_dir} does not exist")
             return
 
-        self._process_action_directories(run_dir, run_hashes)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="urartu-clean") as pool:
+            self._process_action_directories(run_dir, run_hashes, pool)
 
-    def _process_action_directories(self, run_dir: Path, run_hashes: List[str]) -> None:
+        if self.purge_cache:
+            self._purge_cache(run_dir / "pipeline_cache")
+
+    def _process_action_directories(self, run_dir: Path, run_hashes: Set[str], pool: ThreadPoolExecutor) -> None:
         """Process each action directory."""
-        for action_dir in run_dir.iterdir():
-            if not action_dir.is_dir():
+        for action_dir in sorted(run_dir.iterdir()):
+            if not action_dir.is_dir() or action_dir.name in self.SKIPPED_DIRECTORIES:
                 continue
 
             logging.info(f"Processing action directory: {action_dir.name}")
-            self._handle_debug_directory(action_dir)
-            self._clean_run_directories(action_dir, run_hashes)
+            dirs_to_delete = []
+            debug_dir = action_dir / "debug"
+            if debug_dir.exists():
+                dirs_to_delete.append(debug_dir)
+            dirs_to_delete.extend(self._clean_run_directories(action_dir, run_hashes, pool))
+            self._delete_marked_directories(action_dir.name, dirs_to_delete, pool)
+
+    def _clean_run_directories(self, action_dir: Path, run_hashes: Set[str], pool: ThreadPoolExecutor) -> List[Path]:
+        """Walk an action directory in parallel and collect the run directories without valid hashes."""
+        dirs_to_delete = []
+        pending = {pool.submit(self._scan_directory, action_dir, run_hashes, True)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                marked, subdirs = future.result()
+                dirs_to_delete.extend(marked)
+                pending.update(pool.submit(self._scan_directory, subdir, run_hashes, False) for subdir in subdirs)
+        return sorted(dirs_to_delete)
+
+    def _scan_directory(self, dir_path: Path, run_hashes: Set[str], is_action_dir: bool) -> Tuple[List[Path], List[Path]]:
+        """
+        Classify the subdirectories of a directory.
+
+        Returns:
+            The run directories to delete and the subdirectories that still need to be walked;
+            run directories themselves are never walked further
+        """
+        marked, subdirs = [], []
+        for entry in self._subdirectories(dir_path):
+            if is_action_dir and entry.name == "debug":
+                continue
+            path = Path(entry.path)
+            if "_multirun" in entry.name:
+                if self.MULTIRUN_PATTERN.match(entry.name):
+                    marked.extend(self._handle_multirun_directory(path, run_hashes))
+            elif self.DATE_PATTERN.match(entry.name):
+                if not self._has_valid_hash(path, run_hashes):
+                    marked.append(path)
+                    logging.info(f"Directory {path} has no matching run hash yaml file")
+            else:
+                subdirs.append(path)
+        return marked, subdirs
+
+    def _handle_multirun_directory(self, dir_path: Path, run_hashes: Set[str]) -> List[Path]:
+        """Handle multirun directory checking."""
+        all_num_dirs = [Path(entry.path) for entry in self._subdirectories(dir_path) if entry.name.isdigit()]
+        invalid_num_dirs = [num_dir for num_dir in all_num_dirs if not self._has_valid_hash(num_dir, run_hashes)]
 
-    def _handle_debug_directory(self, action_dir: Path) -> None:
-        """Delete debug directory if it exists."""
-        debug_dir = action_dir / "debug"
-        if debug_dir.exists():
-            try:
-                shutil.rmtree(debug_dir)
-                logging.info(f"Deleted debug directory: {debug_dir}")
-            except Exception as e:
-                logging.error(f"Failed to delete debug directory: {str(e)}")
+        if all_num_dirs and len(all_num_dirs) == len(invalid_num_dirs):
+            logging.info(f"Multirun directory {dir_path} has no valid runs, marking for deletion")
+            return [dir_path]
+        if invalid_num_dirs:
+            logging.info(f"Found {len(invalid_num_dirs)} invalid runs in multirun directory {dir_path}")
+        return invalid_num_dirs
 
-    def _clean_run_directories(self, action_dir: Path, run_hashes: List[str]) -> None:
-        """Clean run directories that don't have valid hashes."""
-        dirs_to_delete = []
-        date_pattern = r"\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}"
+    @staticmethod
+    def _subdirectories(dir_path: Path) -> List[os.DirEntry]:
+        try:
+            with os.scandir(dir_path) as entries:
+                return [entry for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except OSError as e:
+            logging.error(f"Failed to list directory {dir_path}: {str(e)}")
+            return []
 
-        for dir_path in action_dir.glob("**/"):
-            if "_multirun" in str(dir_path):
-                self._handle_multirun_directory(
-                    dir_path, date_pattern, run_hashes, dirs_to_delete
+    @staticmethod
+    def _has_valid_hash(dir_path: Path, run_hashes: Set[str]) -> bool:
+        """Check if directory contains a yaml file with a valid hash."""
+        try:
+            with os.scandir(dir_path) as entries:
+                return any(
+                    entry.name.endswith(".yaml") and entry.name[: -len(".yaml")] in run_hashes
+                    for entry in entries
                 )
-            elif re.match(date_pattern, dir_path.name):
-                self._handle_regular_directory(dir_path, run_hashes, dirs_to_delete)
+        except OSError:
+            return False
 
-        self._delete_marked_directories(action_dir.name, dirs_to_delete)
+    @staticmethod
+    def _directory_size(dir_path: Path) -> int:
+        """Total size in bytes of the files below a directory."""
+        size, stack = 0, [dir_path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            size += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+        return size
 
-    def _handle_multirun_directory(
-        self,
-        dir_path: Path,
-        date_pattern: str,
-        run_hashes: List[str],
-        dirs_to_delete: List[Path],
-    ) -> None:
-        """Handle multirun directory checking."""
-        if re.match(date_pattern + "_multirun$", dir_path.name):
-            all_num_dirs = []
-            invalid_num_dirs = []
-
-            for num_dir in dir_path.iterdir():
-                if num_dir.is_dir() and num_dir.name.isdigit():
-                    all_num_dirs.append(num_dir)
-                    if not self._has_valid_hash(num_dir, run_hashes):
-                        invalid_num_dirs.append(num_dir)
-
-            if all_num_dirs and len(all_num_dirs) == len(invalid_num_dirs):
-                dirs_to_delete.append(dir_path)
-                logging.info(
-                    f"Multirun directory {dir_path} has no valid runs, marking for deletion"
-                )
-            elif invalid_num_dirs:
-                dirs_to_delete.extend(invalid_num_dirs)
-                logging.info(
-                    f"Found {len(invalid_num_dirs)} invalid runs in multirun directory {dir_path}"
-                )
+    @staticmethod
+    def _delete_directory(dir_path: Path) -> Optional[str]:
+        """Delete a directory, returning the error message if it fails."""
+        try:
+            shutil.rmtree(dir_path)
+        except Exception as e:
+            return str(e)
+        return None
 
-    def _handle_regular_directory(
-        self, dir_path: Path, run_hashes: List[str], dirs_to_delete: List[Path]
-    ) -> None:
-        """Handle regular directory checking."""
-        if not self._has_valid_hash(dir_path, run_hashes):
-            dirs_to_delete.append(dir_path)
-            logging.info(f"Directory {dir_path} has no matching run hash yaml file")
+    def _delete_marked_directories(self, action_name: str, dirs_to_delete: List[Path], pool: ThreadPoolExecutor) -> None:
+        """Delete all marked directories in parallel, or report their size with dry_run."""
+        if not dirs_to_delete:
+            logging.info(f"No directories to delete in action {action_name}")
+            return
 
-    def _has_valid_hash(self, dir_path: Path, run_hashes: List[str]) -> bool:
-        """Check if directory contains a yaml file with a valid hash."""
-        yaml_files = list(dir_path.glob("*.yaml"))
-        return any(yaml_file.stem in run_hashes for yaml_file in yaml_files)
-
-    def _delete_marked_directories(
-        self, action_name: str, dirs_to_delete: List[Path]
-    ) -> None:
-        """Delete all marked directories."""
-        if dirs_to_delete:
-            logging.info(
-                f"Found {len(dirs_to_delete)} directories to delete in action {action_name}"
-            )
+        logging.info(f"Found {len(dirs_to_delete)} directories to delete in action {action_name}")
+        if self.dry_run:
+            reclaimable = sum(pool.map(self._directory_size, dirs_to_delete))
             for dir_path in dirs_to_delete:
-                try:
-                    shutil.rmtree(dir_path)
-                    logging.info(f"Deleted directory: {dir_path}")
-                except Exception as e:
-                    logging.error(f"Failed to delete directory {dir_path}: {str(e)}")
-        else:
-            logging.info(f"No directories to delete in action {action_name}")
+                logging.info(f"Would delete directory: {dir_path}")
+            logging.info(f"Would reclaim {reclaimable / 1024**3:.2f} GB in action {action_name}")
+            return
+
+        failed = 0
+        for dir_path, error in zip(dirs_to_delete, pool.map(self._delete_directory, dirs_to_delete)):
+            if error is None:
+                logging.info(f"Deleted directory: {dir_path}")
+            else:
+                failed += 1
+                logging.error(f"Failed to delete directory {dir_path}: {error}")
+        logging.info(f"Deleted {len(dirs_to_delete) - failed} directories in action {action_name}")
+
+    def _purge_cache(self, cache_dir: Path) -> None:
+        """Remove orphaned files of the shared pipeline cache."""
+        if not cache_dir.exists():
+            logging.info(f"No pipeline cache in {cache_dir}")
+            return
+
+        from urartu.common.cache_manager import CacheManager
+
+        report = CacheManager(cache_dir).remove_orphans(dry_run=self.dry_run)
+        verb = "Would remove" if self.dry_run else "Removed"
+        logging.info(
+            f"{verb} {report['removed_files']} orphaned cache files, "
+            f"freeing {report['freed_bytes'] / 1024**3:.2f} GB in {cache_dir}"
+        )
+
+
+class CacheCommand(Command):
+    """Command to manage the shared pipeline cache (e.g. `urartu cache gc`)."""
+
+    def __init__(
+        self,
+        subcommand: str = "gc",
+        runs_dir: str = ".runs",
+        max_size_gb: Optional[str] = None,
+        max_age_hours: Optional[str] = None,
+        dry_run: str = "false",
+    ):
+        self.subcommand = subcommand
+        self.cache_dir = Path(runs_dir) / "pipeline_cache"
+        self.max_size_gb = float(max_size_gb) if max_size_gb is not None else None
+        self.max_age_hours = float(max_age_hours) if max_age_hours is not None else None
+        self.dry_run = dry_run.lower() in ("true", "1", "yes")
+
+    @staticmethod
+    def get_command_name() -> str:
+        return "cache"
+
+    def execute(self) -> None:
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+            handlers=[logging.StreamHandler()],
+        )
+
+        if self.subcommand != "gc":
+            logging.error(f"Unknown cache subcommand '{self.subcommand}'. Available: gc")
+            return
+        if not self.cache_dir.exists():
+            logging.warning(f"Cache directory {self.cache_dir} does not exist")
+            return
+
+        from urartu.common.cache_manager import CacheManager
+
+        manager = CacheManager(self.cache_dir)
+        report = manager.gc(
+            max_bytes=int(self.max_size_gb * 1024**3) if self.max_size_gb is not None else None,
+            max_age_hours=self.max_age_hours,
+            dry_run=self.dry_run,
+        )
+        verb = "Would remove" if self.dry_run else "Removed"
+        logging.info(
+            f"{verb} {report['removed_entries']} cache entries, "
+            f"freeing {report['freed_bytes'] / 1024**3:.2f} GB in {self.cache_dir}"
+        )
+        logging.info(f"Cache size: {manager.index.total_size() / 1024**3:.2f} GB")
+
+
+class TrackingCommand(Command):
+    """Command to import runs tracked by the local tracker into Aim (`urartu tracking import`)."""
+
+    def __init__(self, aim_repo_path: Optional[str] = None, subcommand: str = "import", runs_dir: str = ".runs"):
+        self.subcommand = subcommand
+        self.aim_repo_path = aim_repo_path
+        self.runs_dir = Path(runs_dir)
+
+    @staticmethod
+    def get_command_name() -> str:
+        return "tracking"
+
+    def execute(self) -> None:
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+            handlers=[logging.StreamHandler()],
+        )
+
+        if self.subcommand != "import":
+            logging.error(f"Unknown tracking subcommand '{self.subcommand}'. Available: import")
+            return
+        if not self.aim_repo_path:
+            logging.error("Missing aim_repo_path=PATH, the Aim repository to import the runs into")
+            print(USAGE)
+            return
+        if not self.runs_dir.exists():
+            logging.warning(f"Run directory {self.runs_dir} does not exist")
+            return
+
+        from urartu.utils.tracking import LocalTracker, import_into_aim
+
+        imported = 0
+        for path in sorted(self.runs_dir.rglob(LocalTracker.FILENAME)):
+            try:
+                run_hash = import_into_aim(path.parent, self.aim_repo_path)
+            except Exception as e:
+                logging.error(f"Failed to import {path}: {str(e)}")
+                continue
+            if run_hash is not None:
+                imported += 1
+                logging.info(f"Imported {path.parent} as Aim run {run_hash}")
+        logging.info(f"Imported {imported} runs into {self.aim_repo_path}")
 
 
 class CommandRegistry:
     """Registry for all available commands."""
 
-    _commands = {CleanCommand.get_command_name(): CleanCommand}
+    _commands = {
+        CleanCommand.get_command_name(): CleanCommand,
+        CacheCommand.get_command_name(): CacheCommand,
+        TrackingCommand.get_command_name(): TrackingCommand,
+    }
 
     @classmethod
     def get_command(cls, command_name: str, **kwargs) -> Optional[Command]:
@@ -180,6 +380,11 @@ class CommandRegistry:
         """Register a new command."""
         cls._commands[command_class.get_command_name()] = command_class
 
+    @classmethod
+    def get_command_names(cls) -> List[str]:
+        """Get the names of all registered commands."""
+        return list(cls._commands)
+
 
 def parse_command_args(args: List[str]) -> dict:
     """Parse command arguments in the format key=value.
@@ -202,28 +407,63 @@ def parse_command_args(args: List[str]) -> dict:
 def main():
     """Main entry point for the package."""
     if len(sys.argv) == 1 or (len(sys.argv) == 2 and sys.argv[1] in ["--help", "-h"]):
-        print("""Usage: urartu action_config=ACTION_NAME [other_params]
+        print(USAGE)
+        return
 
-Required arguments:
-  action_config=ACTION_NAME    Name of the action to run (must exist in actions/ directory)
+    if sys.argv[1] in CommandRegistry.get_command_names():
+        args = sys.argv[2:]
+        kwargs = parse_command_args(args)
+        positional = [arg for arg in args if "=" not in arg]
+        if positional:
+            kwargs["subcommand"] = positional[0]
+        command = CommandRegistry.get_command(sys.argv[1], **kwargs)
+        command.execute()
+        return
 
-Optional arguments:
-  debug=true                  Run in debug mode
-  slurm.use_slurm=true       Run on SLURM cluster
-  aim.use_aim=true           Use Aim for experiment tracking
+    # Dry run: `--plan` is shorthand for the `plan=true` override read by Pipeline.run
+    if "--plan" in sys.argv:
+        sys.argv.remove("--plan")
+        sys.argv.append("++plan=true")
 
-Example:
-  urartu action_config=generate aim=aim slurm=slurm
-""")
-        return
+    # `--resume` is shorthand for the `resume=true` override read by Pipeline.run
+    if "--resume" in sys.argv:
+        sys.argv.remove("--resume")
+        sys.argv.append("++resume=true")
 
     # If we get here, proceed with normal Hydra execution
     _hydra_main()
 
 
-@hydra.main(version_base=None, config_path="config", config_name="main")
-def _hydra_main(cfg: DictConfig) -> None:
+def _setup_run_logging(log_file: Path) -> None:
+    """Send logging and everything written to stdout / stderr to log_file as well."""
+    from urartu.utils.tee import tee_output
+
+    tee_output(log_file)
+
+
+def _hydra_main() -> None:
+    """Run an experiment through Hydra, registering the Urartu config search path first."""
+    import hydra
+    from hydra.core.plugins import Plugins
+
+    from urartu.utils.hydra_plugin import UrartuPlugin
+    from urartu.utils.launcher import finish_multirun
+
+    Plugins.instance().register(UrartuPlugin)
+    try:
+        hydra.main(version_base=None, config_path="config", config_name="main")(_run_experiment)()
+    finally:
+        # Sweep points of a multirun may still be queued for SLURM or running in worker processes
+        finish_multirun()
+
+
+def _run_experiment(cfg: DictConfig) -> None:
     """Hydra main function for running experiments."""
+    from hydra.core.hydra_config import HydraConfig
+
+    from urartu.utils.launcher import launch, launch_in_local_pool, launch_on_slurm, queue_on_slurm
+    from urartu.utils.local_launcher import LocalJobPool
+
     hydra_cfg = HydraConfig.get()
     cfg = OmegaConf.create(OmegaConf.to_container(cfg, resolve=True, enum_to_str=True))
 
@@ -272,63 +512,32 @@ def _hydra_main(cfg: DictConfig) -> None:
             run_dir = Path(*parts)
         os.makedirs(run_dir, exist_ok=True)
 
-    aim_run = None
-    if cfg.aim.use_aim:
-        # Get experiment name from action config (with fallback for backward compatibility)
-        experiment_name = getattr(cfg.get('action', {}), 'experiment_name', cfg.action_config)
-        
-        aim_run = Run(
-            repo=cfg.aim.repo,
-            experiment=experiment_name,
-            log_system_params=cfg.aim.log_system_params,
-        )
-        aim_run.set("cfg", cfg, strict=False)
-        if cfg.debug:
-            aim_run.add_tag("debug")
-        cfg.aim.hash = aim_run.hash
+    # Get experiment name from action config (with fallback for backward compatibility)
+    experiment_name = getattr(cfg.get('action', {}), 'experiment_name', cfg.action_config)
+
+    from urartu.utils.tracking import AimTracker, AsyncTracker, create_tracker
 
-    if cfg.aim.use_aim:
+    # The run is tracked in Aim or, without Aim, in a local JSONL file in the run directory
+    aim_run = create_tracker(cfg, run_dir, experiment=experiment_name)
+    use_aim = isinstance(aim_run, AimTracker)
+    # Written by the background writer, like everything the actions track in the run
+    tracker = AsyncTracker(aim_run)
+    tracker.set("cfg", cfg, strict=False)
+    if cfg.debug:
+        tracker.add_tag("debug")
+    if use_aim:
+        cfg.aim.hash = aim_run.hash
         log_file = run_dir.joinpath(f"{aim_run.hash}.log")
     else:
         log_file = run_dir.joinpath("output.log")
 
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    file_handler = logging.FileHandler(log_file)
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    file_handler.setFormatter(formatter)
-    stream_handler.setFormatter(formatter)
-    root_logger.handlers = [file_handler, stream_handler]
-
-    class TeeHandler:
-        def __init__(self, filename, stream):
-            self.terminal = stream
-            self.log = open(filename, "a")
-
-        def write(self, message):
-            self.terminal.write(message)
-            self.log.write(message)
-            self.flush()
-
-        def flush(self):
-            self.terminal.flush()
-            self.log.flush()
-
-        def fileno(self):
-            return self.terminal.fileno()
-
-        def isatty(self):
-            return self.terminal.isatty()
-
-        def close(self):
-            self.log.close()
-
-    sys.stdout = TeeHandler(log_file, sys.stdout)
-    sys.stderr = TeeHandler(log_file, sys.stderr)
+    # Local sweep points running in worker processes capture their own output
+    parallel_local = is_multirun and not cfg.slurm.use_slurm and LocalJobPool.enabled(cfg.get("local"))
+    if not parallel_local:
+        _setup_run_logging(log_file)
 
     cfg.run_dir = str(run_dir)
-    if cfg.aim.use_aim:
+    if use_aim:
         with open(run_dir.joinpath(f"{aim_run.hash}.yaml"), "w") as f:
             OmegaConf.save(config=cfg, f=f)
     else:
@@ -345,12 +554,21 @@ def _hydra_main(cfg: DictConfig) -> None:
                 )
 
             try:
-                launch_on_slurm(
-                    module=cwd,
-                    action_name=cfg.action_config,
-                    cfg=cfg,
-                    aim_run=aim_run,
-                )
+                if is_multirun and cfg.slurm.get("job_array", True):
+                    # Submitted with the other sweep points as one job array once Hydra is done
+                    queue_on_slurm(
+                        module=cwd,
+                        action_name=cfg.action_config,
+                        cfg=cfg,
+                        aim_run=aim_run,
+                    )
+                else:
+                    launch_on_slurm(
+                        module=cwd,
+                        action_name=cfg.action_config,
+                        cfg=cfg,
+                        aim_run=aim_run,
+                    )
             except submitit.core.utils.FailedJobError as e:
                 logging.error(f"Slurm job failed: {e}")
                 raise
@@ -365,6 +583,14 @@ def _hydra_main(cfg: DictConfig) -> None:
                 else:
                     logging.error(f"Runtime error during SLURM job execution: {e}")
                 raise
+        elif parallel_local:
+            launch_in_local_pool(
+                module=cwd,
+                action_name=cfg.action_config,
+                cfg=cfg,
+                aim_run=aim_run,
+                log_file=log_file,
+            )
         else:
             try:
                 launch(
@@ -386,6 +612,9 @@ def _hydra_main(cfg: DictConfig) -> None:
         raise
     finally:
         if aim_run:
+            from urartu.utils.tracking import flush_async_tracking
+
+            flush_async_tracking()
             aim_run.close()
 
 
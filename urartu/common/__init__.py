@@ -1,21 +1,42 @@
-from .action import Action, ActionDataset
-from .dataset import Dataset
-from .device import Device
-from .metric import Metric
-from .model import Model
-from .pipeline import Pipeline, PipelineAction, ActionOutput, CacheEntry, DataResolver, ActionOutputResolver
-
-__all__ = [
-    "Action",
-    "ActionDataset", 
-    "Dataset",
-    "Device",
-    "Metric",
-    "Model",
-    "Pipeline",
-    "PipelineAction",
-    "ActionOutput",
-    "CacheEntry",
-    "DataResolver",
-    "ActionOutputResolver"
-]
+import importlib
+from typing import TYPE_CHECKING
+
+# Public names and the submodules defining them. They are imported on first access (PEP 562),
+# so importing a light submodule such as urartu.common.cache_manager does not pull in torch,
+# transformers or evaluate through the model, dataset and metric modules.
+_EXPORTS = {
+    "Action": ".action",
+    "ActionDataset": ".action",
+    "Dataset": ".dataset",
+    "Device": ".device",
+    "Metric": ".metric",
+    "Model": ".model",
+    "Pipeline": ".pipeline",
+    "PipelineAction": ".pipeline",
+    "ActionOutput": ".pipeline",
+    "DataResolver": ".pipeline",
+    "ActionOutputResolver": ".pipeline",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .action import Action, ActionDataset
+    from .dataset import Dataset
+    from .device import Device
+    from .metric import Metric
+    from .model import Model
+    from .pipeline import Pipeline, PipelineAction, ActionOutput, DataResolver, ActionOutputResolver
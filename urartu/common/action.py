@@ -1,22 +1,36 @@
-from aim import Run
 from omegaconf import DictConfig
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
 from abc import ABC, abstractmethod
+from contextlib import ExitStack
 from pathlib import Path
 import hashlib
+import inspect
 import json
-import pickle
 import time
 import logging
 import gc
+import pickle
 import sys
+import weakref
 import yaml
 from datetime import datetime
 
+from .cache import atomic_write, get_cache_backend
+from .cache_codecs import get_cache_codec
+from .cache_manager import CacheManager, get_async_cache_writer
 from .device import Device
-from urartu.utils.hash import dict_to_8char_hash
+from urartu.utils.code_fingerprint import source_fingerprint
+from urartu.utils.hash import canonical_json, dict_to_8char_hash
+from urartu.utils.profiling import profile_phase
+from urartu.utils.tracking import AsyncTracker
+
+if TYPE_CHECKING:
+    from aim import Run
 
 logger = logging.getLogger(__name__)
+# Details of cache key generation and lookup, logged at DEBUG level with lazy formatting, so they
+# cost nothing unless enabled (by `cache_debug: true` or by setting the level of this logger)
+cache_debug_logger = logging.getLogger("urartu.debug_cache")
 
 
 # Keys in the action configuration that do NOT influence the produced outputs
@@ -28,6 +42,13 @@ CACHE_IGNORE_KEYS = {
     "force_rerun", 
     "cache_max_age_hours",
     "cache_max_age",
+    "cache_backend",
+    "cache_max_size_gb",
+    "cache_debug",
+    "cache_async_write",
+    "cache_compression",
+    "cache_compression_level",
+    "cache_code_fingerprint",
     
     # Memory management settings (don't affect outputs)
     "memory_management",
@@ -35,6 +56,9 @@ CACHE_IGNORE_KEYS = {
     "force_cpu_offload", 
     "aggressive_gc",
     
+    # Checkpointing of interrupted runs (see Action.save_checkpoint)
+    "checkpoint_interval_minutes",
+    
     # Pipeline-level settings that get merged but don't affect action outputs
     "experiment_name",
     "debug",
@@ -53,6 +77,73 @@ CACHE_IGNORE_KEYS = {
 }
 
 
+# Default minutes between periodic checkpoints taken by Action.maybe_checkpoint
+DEFAULT_CHECKPOINT_INTERVAL_MINUTES = 30
+
+# Actions alive in this process, checkpointed when a SLURM job is preempted
+_active_actions: "weakref.WeakSet[Action]" = weakref.WeakSet()
+
+
+def checkpoint_active_actions() -> int:
+    """
+    Save a checkpoint of every live action that supports it (see Action.state_dict).
+
+    Called by ResumableSlurmJob.checkpoint when the job is preempted or times out.
+
+    Returns:
+        The number of actions checkpointed
+    """
+    saved = 0
+    for action in list(_active_actions):
+        try:
+            saved += action.save_checkpoint()
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint action {action.__class__.__name__}: {e}")
+    return saved
+
+
+def filter_cache_config(cfg_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the keys that do not influence the outputs (CACHE_IGNORE_KEYS) from a resolved action config."""
+    return {k: v for k, v in cfg_dict.items() if k not in CACHE_IGNORE_KEYS}
+
+
+def action_cache_key(action_name: str, canonical_config: str, code_version: Optional[str] = None) -> str:
+    """
+    Build the cache key of an action from its name, code version and canonical config.
+    
+    The hashed string is the canonical JSON of {'action_name', 'code', 'config'} (without 'code'
+    when there is no code version), assembled around the already serialized config.
+    
+    Args:
+        action_name: Name of the action
+        canonical_config: canonical_json() of the filtered action config
+        code_version: Version of the action's code, if it takes part in the key
+    
+    Returns:
+        The cache key, `<action_name>_<16 hex chars>`
+    """
+    code_factor = f'"code": {json.dumps(code_version)}, ' if code_version else ''
+    key_string = f'{{"action_name": {json.dumps(action_name)}, {code_factor}"config": {canonical_config}}}'
+    return f"{action_name}_{hashlib.sha256(key_string.encode()).hexdigest()[:16]}"
+
+
+def action_code_version(source_file: Path) -> str:
+    """
+    Version of the code of an action defined in source_file, as used with `cache_code_fingerprint`.
+    
+    Action.get_action_version applies it to the module defining the action class, and
+    Pipeline.plan to the module of an action located without importing it, so both derive
+    the same cache key.
+    
+    Args:
+        source_file: Source file of the module defining the action class
+    
+    Returns:
+        The fingerprint of the module and of the local modules it imports
+    """
+    return source_fingerprint(source_file)
+
+
 class Action(ABC):
     """
     A class to manage and configure actions based on a configuration and an Aim run session.
@@ -64,10 +155,12 @@ class Action(ABC):
     Attributes:
         cfg (DictConfig): The full configuration object, typically containing all settings.
         action_config (DictConfig): Configuration specific to the action.
-        aim_run (Run): An Aim run instance for tracking and logging the execution of the action.
+        aim_run (Tracker): The run tracking the execution of the action, in Aim or in a local JSONL
+            file (see urartu.utils.tracking), or None.
+        tracker (AsyncTracker): Facade over aim_run applying writes on a background thread.
     """
 
-    def __init__(self, cfg: DictConfig, aim_run: Run):
+    def __init__(self, cfg: DictConfig, aim_run: "Run"):
         """
         Initializes the Action object with the necessary configuration and Aim session.
 
@@ -94,6 +187,8 @@ class Action(ABC):
             self.action_config = action_attr
         
         self.aim_run = aim_run
+        # Queues writes to the run for a background thread; use it instead of aim_run in loops
+        self.tracker = AsyncTracker(aim_run)
         # Handle both regular dict and OmegaConf DictConfig
         has_device_config = (isinstance(self.action_config, dict) or 
                            (hasattr(self.action_config, 'get') and hasattr(self.action_config, 'keys')))
@@ -105,11 +200,34 @@ class Action(ABC):
             self.cache_enabled = self.action_config.get('cache_enabled', True)
             self.force_rerun = self.action_config.get('force_rerun', False) 
             self.cache_max_age = self.action_config.get('cache_max_age_hours', None)
+            cache_backend_name = self.action_config.get('cache_backend', 'pickle')
+            cache_max_size_gb = self.action_config.get('cache_max_size_gb', None)
+            cache_compression = self.action_config.get('cache_compression', None)
+            cache_compression_level = self.action_config.get('cache_compression_level', None)
+            # Emit diagnostics comparing the cache key with existing entries of the action
+            self.cache_debug = self.action_config.get('cache_debug', False)
+            if self.cache_debug:
+                cache_debug_logger.setLevel(logging.DEBUG)
+            # Write cache entries on a background thread instead of blocking the next action
+            self.cache_async_write = self.action_config.get('cache_async_write', False)
+            # Include a fingerprint of the action's source code (and local imports) in the cache key
+            self.cache_code_fingerprint = self.action_config.get('cache_code_fingerprint', False)
+            self.checkpoint_interval_minutes = self.action_config.get(
+                'checkpoint_interval_minutes', DEFAULT_CHECKPOINT_INTERVAL_MINUTES
+            )
         else:
             # Fallback defaults when action_config is not a dict-like object
             self.cache_enabled = True
             self.force_rerun = False
             self.cache_max_age = None
+            cache_backend_name = 'pickle'
+            cache_max_size_gb = None
+            cache_compression = None
+            cache_compression_level = None
+            self.cache_debug = False
+            self.cache_async_write = False
+            self.cache_code_fingerprint = False
+            self.checkpoint_interval_minutes = DEFAULT_CHECKPOINT_INTERVAL_MINUTES
             
         if self.cache_max_age is not None:
             self.cache_max_age = self.cache_max_age * 3600  # Convert to seconds
@@ -142,8 +260,156 @@ class Action(ABC):
         # Use shared pipeline_cache directory for cross-pipeline cache sharing
         # This allows actions to share cache entries across different pipelines
         self.cache_dir = runs_dir / 'pipeline_cache'
+        # Codec compressing new entries; entries are read with whichever codec wrote them
+        self.cache_codec = get_cache_codec(cache_compression, cache_compression_level)
+        self.cache_backend = get_cache_backend(cache_backend_name, self.cache_dir, self.cache_codec)
+        # Byte budget of the shared cache, enforced by evicting least-recently-used entries after saves
+        self.cache_manager = CacheManager(
+            self.cache_dir,
+            max_bytes=int(cache_max_size_gb * 1024**3) if cache_max_size_gb is not None else None,
+        )
         self._cached_outputs = None
         self._cache_key = None
+        # Serialized config memoized by _get_serializable_config / _get_canonical_config
+        self._serializable_config = None
+        self._canonical_config = None
+        self._last_checkpoint = time.time()
+        # Interventions checkpointed with the action, and restored states waiting for them
+        self._interventions: Dict[str, Any] = {}
+        self._restored_intervention_states: Dict[str, Dict[str, Any]] = {}
+        _active_actions.add(self)
+    
+    def register_intervention(self, intervention: Any, name: Optional[str] = None) -> Any:
+        """
+        Checkpoint the progress of an intervention (see Intervention.checkpoint_state) with this action.
+        
+        The intervention's state becomes part of state_dict, its checkpoint_hook (if it has
+        one) is set to maybe_checkpoint, and the state restored from the checkpoint of an
+        interrupted run is loaded into it, so its next intervene() call continues from there.
+        
+        Args:
+            intervention (Any): The intervention, typically created in run().
+            name (Optional[str]): Name of its state in the checkpoint, unique within the action;
+                the class name of the intervention by default.
+        
+        Returns:
+            Any: The intervention.
+        """
+        name = name or intervention.__class__.__name__
+        self._interventions[name] = intervention
+        if hasattr(intervention, 'checkpoint_hook'):
+            intervention.checkpoint_hook = self.maybe_checkpoint
+        state = self._restored_intervention_states.pop(name, None)
+        if state:
+            intervention.load_checkpoint_state(state)
+        return intervention
+    
+    def state_dict(self) -> Dict[str, Any]:
+        """
+        Return the state needed to continue an interrupted run of this action.
+        
+        By default this is the progress of the registered interventions (see
+        register_intervention). Subclasses running for a long time override this together
+        with load_state_dict, e.g. adding model weights, optimizer state and the position in
+        the data to super().state_dict(). An empty state means the action cannot resume and
+        is not checkpointed.
+        
+        Returns:
+            Dict[str, Any]: A picklable dictionary of the action's progress.
+        """
+        states = {name: intervention.checkpoint_state() for name, intervention in self._interventions.items()}
+        states = {name: state for name, state in states.items() if state}
+        return {"interventions": states} if states else {}
+    
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        """
+        Restore the state returned by state_dict in an earlier, interrupted run.
+        
+        Called by restore_checkpoint before run(), so the action typically keeps the state
+        and applies it once its model and data are set up. The states of interventions are
+        loaded into them when they are registered; overrides call super().load_state_dict.
+        
+        Args:
+            state (Dict[str, Any]): The state saved by the interrupted run.
+        """
+        self._restored_intervention_states = dict(state.get("interventions", {}))
+        for name, intervention in self._interventions.items():
+            restored = self._restored_intervention_states.pop(name, None)
+            if restored:
+                intervention.load_checkpoint_state(restored)
+    
+    @property
+    def checkpoint_path(self) -> Path:
+        """File in the run directory holding the checkpoint of this action."""
+        return Path(self.cfg.get('run_dir', '.')) / f"action_checkpoint_{self.__class__.__name__}.pkl"
+    
+    def save_checkpoint(self) -> bool:
+        """
+        Save the action's state_dict to its checkpoint file, replacing the previous one.
+        
+        Returns:
+            bool: Whether a checkpoint was written (False if the action has no state).
+        """
+        state = self.state_dict()
+        if not state:
+            return False
+        checkpoint = {
+            "action": self.__class__.__name__,
+            "config_hash": self._get_config_hash(),
+            "timestamp": time.time(),
+            "state": state,
+        }
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.checkpoint_path, "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._last_checkpoint = time.time()
+        logger.info(f"💾 Checkpointed {self.__class__.__name__} to {self.checkpoint_path}")
+        return True
+    
+    def maybe_checkpoint(self) -> bool:
+        """
+        Save a checkpoint if checkpoint_interval_minutes have passed since the last one.
+        
+        Call it at safe points of long loops (e.g. after an optimizer step), so that a job
+        killed without warning loses at most one interval of work.
+        
+        Returns:
+            bool: Whether a checkpoint was written.
+        """
+        if not self.checkpoint_interval_minutes:
+            return False
+        if time.time() - self._last_checkpoint < self.checkpoint_interval_minutes * 60:
+            return False
+        return self.save_checkpoint()
+    
+    def restore_checkpoint(self) -> bool:
+        """
+        Load the checkpoint of an interrupted run of this action, if any, into load_state_dict.
+        
+        Checkpoints written with a different configuration are ignored.
+        
+        Returns:
+            bool: Whether a checkpoint was restored.
+        """
+        if not self.checkpoint_path.exists():
+            return False
+        try:
+            with open(self.checkpoint_path, "rb") as f:
+                checkpoint = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return False
+        if checkpoint.get("config_hash") != self._get_config_hash():
+            logger.warning(f"Ignoring checkpoint {self.checkpoint_path}: it was written with a different configuration")
+            return False
+        self.load_state_dict(checkpoint["state"])
+        logger.info(f"⏯️ Resuming {self.__class__.__name__} from the checkpoint written "
+                    f"{datetime.fromtimestamp(checkpoint['timestamp']):%Y-%m-%d %H:%M:%S}")
+        return True
+    
+    def clear_checkpoint(self) -> None:
+        """Delete the checkpoint once the action has completed."""
+        self.checkpoint_path.unlink(missing_ok=True)
     
     def get_outputs(self) -> Dict[str, Any]:
         """
@@ -163,175 +429,195 @@ class Action(ABC):
         # This ensures the same action (e.g., _2_sample_constructor) with same config 
         # shares cache across standalone, pipeline A, pipeline B, etc.
         action_name = getattr(self.cfg, 'action_name', None) or self.__class__.__name__
+        debug = cache_debug_logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            cache_debug_logger.debug("🔑 Cache key generation for %s (cfg.action_name: %s, class: %s)",
+                                     action_name, getattr(self.cfg, 'action_name', None), self.__class__.__name__)
+        
+        # Include action name, code version and full configuration in cache key
+        code_version = self.get_action_version()
+        canonical_config = self._get_canonical_config()
+        final_cache_key = action_cache_key(action_name, canonical_config, code_version)
+        
+        if debug:
+            serializable_config = self._get_serializable_config()
+            cache_debug_logger.debug("   Config keys: %s", sorted(serializable_config))
+            cache_debug_logger.debug("   Code fingerprint: %s", code_version)
+            cache_debug_logger.debug("   Config string (%d chars): %.200s...", len(canonical_config), canonical_config)
+            cache_debug_logger.debug("   Generated cache key: %s", final_cache_key)
+            # Show the full config when the key differs from the existing entries of the action
+            existing_keys = [entry.cache_key for entry in self.cache_manager.index.entries_for_action(action_name)]
+            if existing_keys and final_cache_key not in existing_keys:
+                cache_debug_logger.debug("🔍 Cache key mismatch detected! Generated: %s", final_cache_key)
+                cache_debug_logger.debug("🔍 Existing entries: %s", existing_keys)
+                cache_debug_logger.debug("🔍 Full config string for comparison: %s", canonical_config)
         
-        logger.info(f"🔑 Action name determination:")
-        logger.info(f"   cfg.action_name: {getattr(self.cfg, 'action_name', None)}")
-        logger.info(f"   class name: {self.__class__.__name__}")
-        logger.info(f"   final action_name: {action_name}")
-        
-        serializable_config = self._get_serializable_config()
-        
-        # Include action name and full configuration in cache key
-        key_factors = {
-            'action_name': action_name,
-            'config': serializable_config
-        }
-        
-        # Debug logging to understand cache key generation
-        logger.info(f"🔑 Cache key generation for {action_name}:")
-        logger.info(f"   Config keys: {list(serializable_config.keys()) if isinstance(serializable_config, dict) else 'N/A'}")
-        if isinstance(serializable_config, dict) and 'device' in serializable_config:
-            logger.info(f"   Config device: {serializable_config['device']}")
-        
-        # Convert to JSON for consistent ordering
-        key_string = json.dumps(key_factors, sort_keys=True)
-        logger.info(f"   Key string length: {len(key_string)}")
-        logger.info(f"   Key string (first 200 chars): {key_string[:200]}...")
-        
-        # Generate hash
-        cache_key = hashlib.sha256(key_string.encode()).hexdigest()[:16]
+        return final_cache_key
+    
+    def get_action_version(self) -> Optional[str]:
+        """
+        Return the version of the action's code that takes part in its cache key.
         
-        final_cache_key = f"{action_name}_{cache_key}"
-        logger.info(f"   Generated cache key: {final_cache_key}")
+        With `cache_code_fingerprint` enabled this is a fingerprint of the source of the module
+        defining the action and of the local modules under `actions/` it imports, transitively,
+        so editing an action only invalidates the cache entries of actions whose code changed.
+        Otherwise it is None and code changes do not invalidate cache entries.
         
-        # For debugging: if this is a different key from existing cache files, show differences
-        if self.cache_dir.exists():
-            existing_files = list(self.cache_dir.glob(f"{action_name}_*.pkl"))
-            if existing_files and not any(final_cache_key in str(f) for f in existing_files):
-                logger.info(f"🔍 Cache key mismatch detected! Generated: {final_cache_key}")
-                logger.info(f"🔍 Existing files: {[f.name for f in existing_files]}")
-                logger.info(f"🔍 Full key string for comparison: {key_string}")
+        Subclasses may override this to return an explicit version string instead.
         
-        return final_cache_key
+        Returns:
+            Optional[str]: The code version, or None if the code is not part of the cache key.
+        """
+        if not self.cache_code_fingerprint:
+            return None
+        try:
+            module_path = inspect.getsourcefile(type(self))
+        except TypeError:
+            module_path = None
+        if module_path is None:
+            logger.warning(f"Cannot locate the source of {self.__class__.__name__}, its code is not part of the cache key")
+            return None
+        return action_code_version(Path(module_path))
     
     def _get_serializable_config(self) -> Dict[str, Any]:
-        """Get a serializable version of the configuration for caching."""
+        """
+        Get a serializable version of the configuration for caching.
+        
+        The result is computed once per run_with_cache call and memoized, since it resolves
+        the whole action config.
+        """
+        if self._serializable_config is None:
+            self._serializable_config = self._build_serializable_config()
+        return self._serializable_config
+    
+    def _get_canonical_config(self) -> str:
+        """Get the canonical JSON string of the serializable config (memoized like the config itself)."""
+        if self._canonical_config is None:
+            self._canonical_config = canonical_json(self._get_serializable_config())
+        return self._canonical_config
+    
+    def _get_config_hash(self) -> str:
+        """Get the short hash of the serializable config recorded with cache entries."""
+        return hashlib.sha256(self._get_canonical_config().encode()).hexdigest()[:8]
+    
+    def _build_serializable_config(self) -> Dict[str, Any]:
         try:
             from omegaconf import OmegaConf
             if hasattr(self, 'action_config'):
                 cfg_dict = OmegaConf.to_container(self.action_config, resolve=True)
-                
-                # Debug logging
-                logger.info(f"📋 Config serialization for {self.__class__.__name__}:")
-                logger.info(f"   Original config keys: {sorted(cfg_dict.keys())}")
-                
-                # Show some key config values for debugging
-                if 'device' in cfg_dict:
-                    logger.info(f"   Config device: {cfg_dict['device']}")
-                if 'seed' in cfg_dict:
-                    logger.info(f"   Config seed: {cfg_dict['seed']}")
-                
-                # Remove keys that should not affect caching (enables cross-pipeline cache sharing)
-                filtered_cfg = {k: v for k, v in cfg_dict.items() if k not in CACHE_IGNORE_KEYS}
-                
-                removed_keys = set(cfg_dict.keys()) - set(filtered_cfg.keys())
-                if removed_keys:
-                    logger.info(f"   Removed keys: {sorted(removed_keys)}")
-                logger.info(f"   Final config keys: {sorted(filtered_cfg.keys())}")
-                
-                # Show a sample of the final config for debugging
-                logger.info(f"   Final config sample: {str(filtered_cfg)[:300]}...")
-                
-                return filtered_cfg
-            return {}
+                source = ""
+            else:
+                return {}
         except Exception:
             # Fallback to dict conversion
             if hasattr(self, 'action_config') and hasattr(self.action_config, 'items'):
                 cfg_dict = dict(self.action_config)
-                logger.info(f"📋 Config serialization (fallback) for {self.__class__.__name__}:")
-                logger.info(f"   Original config keys: {sorted(cfg_dict.keys())}")
-                
-                # Remove keys that should not affect caching
-                filtered_cfg = {k: v for k, v in cfg_dict.items() if k not in CACHE_IGNORE_KEYS}
-                
-                removed_keys = set(cfg_dict.keys()) - set(filtered_cfg.keys())
-                if removed_keys:
-                    logger.info(f"   Removed keys: {sorted(removed_keys)}")
-                logger.info(f"   Final config keys: {sorted(filtered_cfg.keys())}")
-                
-                return filtered_cfg
-            return {}
+                source = " (fallback)"
+            else:
+                return {}
+        
+        # Remove keys that should not affect caching (enables cross-pipeline cache sharing)
+        filtered_cfg = filter_cache_config(cfg_dict)
+        
+        if cache_debug_logger.isEnabledFor(logging.DEBUG):
+            cache_debug_logger.debug("📋 Config serialization%s for %s:", source, self.__class__.__name__)
+            cache_debug_logger.debug("   Original config keys: %s", sorted(cfg_dict.keys()))
+            for key in ('device', 'seed'):
+                if key in cfg_dict:
+                    cache_debug_logger.debug("   Config %s: %s", key, cfg_dict[key])
+            removed_keys = set(cfg_dict.keys()) - set(filtered_cfg.keys())
+            if removed_keys:
+                cache_debug_logger.debug("   Removed keys: %s", sorted(removed_keys))
+            cache_debug_logger.debug("   Final config keys: %s", sorted(filtered_cfg.keys()))
+            cache_debug_logger.debug("   Final config sample: %.300s...", filtered_cfg)
+        
+        return filtered_cfg
     
     def _get_cache_path(self, cache_key: str) -> Path:
         """Get the file path for a cache entry."""
         return self.cache_dir / f"{cache_key}.pkl"
     
+    def _get_metadata_path(self, cache_key: str) -> Path:
+        """Get the file path for the human-readable metadata of a cache entry."""
+        return self.cache_dir / f"{cache_key}.yaml"
+    
     def _load_from_cache(self) -> Optional[Dict[str, Any]]:
-        """Load outputs from cache if available and valid."""
+        """
+        Load outputs from cache if available and valid.
+        
+        The outcome (hit, miss, expired, ...) is kept in `_cache_status` for the one-line
+        summary logged by run_with_cache.
+        """
         if not self.cache_enabled or self.force_rerun:
-            logger.info(f"💾 Cache disabled or force_rerun for {self.__class__.__name__} (enabled: {self.cache_enabled}, force_rerun: {self.force_rerun})")
+            self._cache_status = "disabled" if not self.cache_enabled else "force_rerun"
             return None
         
         # Use stored cache key if available, otherwise generate new one
-        stored_key = getattr(self, '_cache_key', None)
-        if stored_key:
-            cache_key = stored_key
-            logger.info(f"💾 Using stored cache key: {cache_key}")
-        else:
-            cache_key = self._generate_cache_key()
-            logger.info(f"💾 Generated new cache key: {cache_key}")
-        
-        cache_path = self._get_cache_path(cache_key)
-        logger.info(f"💾 Looking for cache at: {cache_path}")
-        
-        # Debug: List existing cache files
-        if self.cache_dir.exists():
+        cache_key = getattr(self, '_cache_key', None) or self._generate_cache_key()
+        debug = cache_debug_logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            cache_debug_logger.debug("💾 Looking for cache entry %s in %s (backend: %s)",
+                                     cache_key, self.cache_dir, self.cache_backend.name)
+            # List existing cache entries recorded in the index
             action_name = getattr(self.cfg, 'action_name', None) or self.__class__.__name__
-            existing_files = list(self.cache_dir.glob(f"{action_name}_*.pkl"))
-            logger.info(f"💾 Found {len(existing_files)} existing cache files for {action_name}:")
-            for f in existing_files:
-                logger.info(f"   📁 {f.name}")
-        
-        if not cache_path.exists():
-            logger.info(f"💾 Cache file not found: {cache_path.name}")
+            existing_entries = self.cache_manager.index.entries_for_action(action_name)
+            cache_debug_logger.debug("💾 Found %d indexed cache entries for %s:", len(existing_entries), action_name)
+            for existing in existing_entries:
+                cache_debug_logger.debug("   📁 %s", existing.cache_key)
+        
+        entry = self.cache_manager.lookup(cache_key, self.cache_backend)
+        if entry is None:
+            self._cache_status = "miss"
             return None
         
+        # Expiry can be decided from the index without touching the payload
+        if self.cache_max_age is not None:
+            age = time.time() - entry.created
+            cache_debug_logger.debug("   Cache age: %.1fs, max_age: %ss", age, self.cache_max_age)
+            if age > self.cache_max_age:
+                self._cache_status = f"expired (age {age:.0f}s)"
+                return None
+        
         try:
-            with open(cache_path, 'rb') as f:
-                cache_data = pickle.load(f)
+            cache_data = self.cache_backend.load(cache_key)
             
-            logger.info(f"💾 Loaded cache data from {cache_path.name}")
-            logger.info(f"   Cache timestamp: {cache_data.get('timestamp', 'N/A')}")
-            logger.info(f"   Cache action_name: {cache_data.get('action_name', 'N/A')}")
-            logger.info(f"   Cache config_hash: {cache_data.get('config_hash', 'N/A')}")
-            logger.info(f"   Cache has outputs: {'outputs' in cache_data}")
-            
-            # Check if cache is still valid
-            if self.cache_max_age is not None:
-                age = time.time() - cache_data['timestamp']
-                logger.info(f"   Cache age: {age:.1f}s, max_age: {self.cache_max_age}s")
-                if age > self.cache_max_age:
-                    logger.info(f"❌ Cache for {self.__class__.__name__} is expired (age: {age:.1f}s)")
-                    return None
-            else:
-                logger.info(f"   No cache age limit set")
+            if debug:
+                cache_debug_logger.debug("💾 Loaded cache data for %s", cache_key)
+                for field in ('timestamp', 'action_name', 'config_hash'):
+                    cache_debug_logger.debug("   Cache %s: %s", field, cache_data.get(field, 'N/A'))
+                cache_debug_logger.debug("   Cache has outputs: %s", 'outputs' in cache_data)
             
-            logger.info(f"✅ Loading cached outputs for {self.__class__.__name__} from {cache_path.name}")
-            self.aim_run[f"action_{self.__class__.__name__}_cache_hit"] = True
+            self.cache_manager.record_access(cache_key, cache_data.get('action_name', cache_key), self.cache_backend)
+            self.tracker[f"action_{self.__class__.__name__}_cache_hit"] = True
+            self._cache_status = "hit"
             return cache_data['outputs']
             
         except Exception as e:
             logger.warning(f"Failed to load cache for {self.__class__.__name__}: {e}")
+            self.cache_manager.forget(cache_key)
+            self._cache_status = "unreadable"
             return None
     
-    def _save_to_cache(self, outputs: Dict[str, Any]):
-        """Save outputs to cache."""
+    def _save_to_cache(self, outputs: Dict[str, Any], runtime_seconds: Optional[float] = None):
+        """
+        Save outputs to cache.
+        
+        Args:
+            outputs: The outputs to cache
+            runtime_seconds: How long computing the outputs took, recorded to estimate future runs
+        """
         if not self.cache_enabled:
             return
         
         try:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            
             # Use stored cache key to ensure consistency with initial lookup
             stored_key = getattr(self, '_cache_key', None)
             if stored_key:
                 cache_key = stored_key
-                logger.info(f"💾 Saving with stored cache key: {cache_key}")
             else:
                 cache_key = self._generate_cache_key()
-                logger.info(f"💾 Saving with new cache key: {cache_key}")
-            
-            cache_path = self._get_cache_path(cache_key)
+            cache_debug_logger.debug("💾 Saving %s with %s cache key %s",
+                                     self.__class__.__name__, "stored" if stored_key else "new", cache_key)
             
             # Use the same action name logic as cache key generation for consistency
             action_name = getattr(self.cfg, 'action_name', None) or self.__class__.__name__
@@ -340,31 +626,43 @@ class Action(ABC):
                 'outputs': outputs,
                 'timestamp': time.time(),
                 'action_name': action_name,
-                'config_hash': hashlib.sha256(json.dumps(self._get_serializable_config(), sort_keys=True).encode()).hexdigest()[:8]
+                'config_hash': self._get_config_hash(),
+                'action_version': self.get_action_version(),
             }
             
-            with open(cache_path, 'wb') as f:
-                pickle.dump(cache_data, f)
+            self.cache_backend.save(cache_key, cache_data)
             
             # Also save human-readable metadata
-            metadata_path = cache_path.with_suffix('.yaml')
+            metadata_path = self._get_metadata_path(cache_key)
             metadata = {
                 'cache_key': cache_key,
                 'action_name': action_name,  # Use the same action name as in cache_data
                 'timestamp': datetime.fromtimestamp(cache_data['timestamp']).isoformat(),
                 'config_hash': cache_data['config_hash'],
+                'action_version': cache_data['action_version'],
+                'cache_backend': self.cache_backend.name,
+                'compression': repr(self.cache_codec) if self.cache_codec else None,
                 'output_keys': list(outputs.keys()),
                 'full_config': self._get_serializable_config()  # Add full config content
             }
-            with open(metadata_path, 'w') as f:
+            with atomic_write(metadata_path, 'w') as f:
                 yaml.dump(metadata, f, default_flow_style=False, indent=2, sort_keys=False)
             
-            logger.info(f"Cached outputs for {self.__class__.__name__} with key {cache_key}")
-            self.aim_run[f"action_{self.__class__.__name__}_cache_hit"] = False
+            self.cache_manager.record_save(cache_key, action_name, self.cache_backend,
+                                            config_hash=cache_data['config_hash'],
+                                            runtime_seconds=runtime_seconds)
+            cache_debug_logger.debug("Cached outputs for %s with key %s", self.__class__.__name__, cache_key)
             
         except Exception as e:
             logger.warning(f"Failed to save cache for {self.__class__.__name__}: {e}")
     
+    def _log_cache_summary(self) -> None:
+        """Log the outcome of the cache lookup in one line (the details go to `urartu.debug_cache`)."""
+        status = getattr(self, '_cache_status', 'miss')
+        next_step = "loading cached outputs" if status == "hit" else "running"
+        logger.info(f"💾 {self.__class__.__name__}: cache {status} for {self._cache_key} "
+                    f"({self.cache_backend.name}), {next_step}")
+    
     def run_with_cache(self):
         """
         Run the action with caching support.
@@ -372,43 +670,84 @@ class Action(ABC):
         This method should be called instead of run() directly to enable caching.
         It will check cache first, run the action if needed, and save to cache.
         """
-        # Generate cache key once and store it to ensure consistency
-        self._cache_key = self._generate_cache_key()
-        
-        # Try to load from cache first
-        cached_outputs = self._load_from_cache()
+        # Generate cache key once and store it to ensure consistency; the config is serialized
+        # afresh for each call in case it was changed since the previous one
+        self._serializable_config = None
+        self._canonical_config = None
+        with profile_phase("cache_lookup"):
+            self._cache_key = self._generate_cache_key()
+            
+            # Try to load from cache first
+            cached_outputs = self._load_from_cache()
         if cached_outputs is not None:
             self._cached_outputs = cached_outputs
+            self._log_cache_summary()
             return
         
-        # Cache miss - run the action
-        logger.info(f"Running {self.__class__.__name__} (cache miss)")
-        
-        # Call the actual run method (must be implemented by subclasses)
-        if hasattr(self, 'run'):
-            self.run()
-        elif hasattr(self, 'main'):
-            self.main()
-        else:
-            raise NotImplementedError(f"Action {self.__class__.__name__} must implement run() or main() method")
-        
-        # Get outputs and save to cache
-        outputs = self.get_outputs()
-        if outputs:
-            self._save_to_cache(outputs)
-            self._cached_outputs = outputs
+        # Cache miss - compute the entry under its lock, so that jobs sharing the cache
+        # directory compute it once and the others wait and reuse the result
+        with ExitStack() as key_lock:
+            if self.cache_enabled:
+                with profile_phase("cache_lookup"):
+                    key_lock.enter_context(self.cache_manager.lock(self._cache_key))
+                    # Another job may have saved the entry while we were waiting for the lock
+                    if self.cache_manager.lookup(self._cache_key, self.cache_backend) is not None:
+                        cached_outputs = self._load_from_cache()
+                if cached_outputs is not None:
+                    self._cached_outputs = cached_outputs
+                    self._log_cache_summary()
+                    return
+            
+            self._log_cache_summary()
+            
+            # Continue from where a preempted run of the action stopped, if it left a checkpoint
+            self.restore_checkpoint()
+            
+            # Call the actual run method (must be implemented by subclasses)
+            start_time = time.time()
+            with profile_phase("run"):
+                if hasattr(self, 'run'):
+                    self.run()
+                elif hasattr(self, 'main'):
+                    self.main()
+                else:
+                    raise NotImplementedError(f"Action {self.__class__.__name__} must implement run() or main() method")
+            
+            runtime_seconds = time.time() - start_time
+            self.clear_checkpoint()
+            
+            # Get outputs and save to cache
+            with profile_phase("extract_outputs"):
+                outputs = self.get_outputs()
+            if outputs:
+                self._cached_outputs = outputs
+                if self.cache_enabled:
+                    self.tracker[f"action_{self.__class__.__name__}_cache_hit"] = False
+                if self.cache_enabled and self.cache_async_write:
+                    # The writer releases the key lock once the entry is on disk
+                    release_lock = key_lock.pop_all()
+                    try:
+                        # Only the hand-off is on the action's clock (it blocks while the writer is backed up)
+                        with profile_phase("cache_save"):
+                            get_async_cache_writer().submit(
+                                lambda: self._save_to_cache(outputs, runtime_seconds), on_done=release_lock.close
+                            )
+                    except BaseException:
+                        release_lock.close()
+                        raise
+                else:
+                    with profile_phase("cache_save"):
+                        self._save_to_cache(outputs, runtime_seconds)
     
     def clear_cache(self):
         """Clear the cache for this action."""
         if self.cache_dir.exists():
             cache_key = getattr(self, '_cache_key', None) or self._generate_cache_key()
-            cache_path = self._get_cache_path(cache_key)
             
-            if cache_path.exists():
-                cache_path.unlink()
-                metadata_path = cache_path.with_suffix('.yaml')
-                if metadata_path.exists():
-                    metadata_path.unlink()
+            if self.cache_backend.exists(cache_key):
+                self.cache_backend.delete(cache_key)
+                self._get_metadata_path(cache_key).unlink(missing_ok=True)
+                self.cache_manager.forget(cache_key)
                 logger.info(f"Cleared cache for {self.__class__.__name__}")
     
     def cleanup_memory(self):
@@ -421,6 +760,9 @@ class Action(ABC):
         """
         logger.info(f"🧹 Cleaning up memory for action: {self.__class__.__name__}")
         
+        # Apply the tracking calls still queued, which may hold references to large values
+        self.tracker.flush()
+        
         # Get initial memory stats
         initial_gpu_memory = self._get_gpu_memory_mb()
         initial_ram_gb = self._get_ram_usage_gb()
@@ -434,13 +776,14 @@ class Action(ABC):
         # Generic cleanup of common ML objects
         self._cleanup_common_attributes()
         
-        # Clear GPU memory cache
-        self._clear_gpu_cache()
-        
-        # Force garbage collection
+        # Force garbage collection (this also returns models held through dropped Model
+        # objects to the model pool) before the GPU cache is cleared
         collected = gc.collect()
         logger.info(f"Garbage collector freed {collected} objects")
         
+        # Clear GPU memory cache
+        self._clear_gpu_cache()
+        
         # Log memory savings
         final_gpu_memory = self._get_gpu_memory_mb()
         final_ram_gb = self._get_ram_usage_gb()
@@ -493,8 +836,11 @@ class Action(ABC):
     
     def _clear_gpu_cache(self):
         """Clear GPU memory cache if available."""
+        # Nothing can be on the GPU if torch was never imported, and importing it is slow
+        torch = sys.modules.get("torch")
+        if torch is None:
+            return
         try:
-            import torch
             if torch.cuda.is_available():
                 initial_memory = torch.cuda.memory_allocated()
                 torch.cuda.empty_cache()
@@ -503,19 +849,14 @@ class Action(ABC):
                 freed_mb = (initial_memory - final_memory) / (1024 * 1024)
                 if freed_mb > 1:  # Only log if significant
                     logger.info(f"Cleared GPU cache, freed {freed_mb:.1f} MB")
-        except ImportError:
-            pass  # PyTorch not available
         except Exception as e:
             logger.warning(f"Failed to clear GPU cache: {e}")
     
     def _get_gpu_memory_mb(self) -> Optional[float]:
         """Get current GPU memory usage in MB."""
-        try:
-            import torch
-            if torch.cuda.is_available():
-                return torch.cuda.memory_allocated() / (1024 * 1024)
-        except ImportError:
-            pass
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            return torch.cuda.memory_allocated() / (1024 * 1024)
         return None
     
     def _get_ram_usage_gb(self) -> Optional[float]:
@@ -554,7 +895,7 @@ class ActionDataset(Action):
         derived from the dataset configuration, ensuring uniqueness for tracking.
     """
     
-    def __init__(self, cfg: DictConfig, aim_run: Run):
+    def __init__(self, cfg: DictConfig, aim_run: "Run"):
         """
         Initializes the ActionDataset object with the necessary configuration and Aim session.
         
@@ -584,5 +925,5 @@ class ActionDataset(Action):
         if dataset_config and hasattr(dataset_config, 'name'):
             dataset_config["hash"] = f"{dataset_config.name}_{dict_to_8char_hash(dataset_config)}"
         
-        aim_run.set("cfg", cfg, strict=False)
         super().__init__(cfg, aim_run)
+        self.tracker.set("cfg", cfg, strict=False)
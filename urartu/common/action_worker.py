@@ -0,0 +1,290 @@
+"""
+Process-isolated execution of pipeline actions in urartu.
+
+With `isolate_actions: true` a pipeline runs every action that is not a cache hit in a fresh
+worker process started with the `spawn` method. All memory the action allocated, host or
+CUDA, goes back to the OS when the worker exits, however the action stored it, and workers
+can be pinned to different GPUs through CUDA_VISIBLE_DEVICES.
+
+The action config is resolved in the parent. Outputs passed by reference (object store
+interpolations) cannot cross processes, so they are pickled into the worker and put into
+the worker's own object store. Outputs come back through the action cache when the action
+cached them, or pickled through the result pipe otherwise. The worker cannot write to the
+parent's Aim run, so it records what the action tracks and the parent replays it.
+
+This module only imports the standard library and OmegaConf at the top, so environment
+variables set for the worker take effect before torch is imported.
+"""
+
+import ast
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from omegaconf import OmegaConf
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks that the worker is still alive while waiting for its result
+WORKER_POLL_INTERVAL = 1.0
+
+
+def import_action_module(action_name: str):
+    """Import the module of an action from the `actions` package or directory."""
+    try:
+        # First try fully qualified package import (actions.<name>)
+        return importlib.import_module(f"actions.{action_name}")
+    except ImportError:
+        # Fall back to importing from local actions directory added to sys.path
+        actions_dir = Path.cwd() / "actions"
+        if str(actions_dir) not in sys.path:
+            sys.path.append(str(actions_dir))
+        try:
+            return importlib.import_module(action_name)
+        except ImportError as e:
+            raise ImportError(
+                f"Failed to import action '{action_name}' from package or directory {actions_dir}: {e}"
+            )
+
+
+def find_action_class(action_module) -> Optional[type]:
+    """Find the Action subclass defined by an action module, or None for main-style modules."""
+    from .action import Action, ActionDataset
+
+    # Try to find action class - look for classes that inherit from Action
+    action_candidates = []
+    for attr_name in dir(action_module):
+        attr = getattr(action_module, attr_name)
+        if (isinstance(attr, type) and
+            issubclass(attr, Action) and
+            attr != Action and
+            attr != ActionDataset):  # Exclude abstract base classes
+            action_candidates.append(attr)
+
+    # Prefer the most specific class (not imported from urartu.common)
+    for candidate in action_candidates:
+        if candidate.__module__ == action_module.__name__:
+            return candidate
+
+    # Fallback to any suitable candidate
+    return action_candidates[0] if action_candidates else None
+
+
+# urartu base classes of actions that keep the default Action.get_action_version
+DEFAULT_VERSION_BASES = {"Action", "ActionDataset", "Pipeline"}
+
+
+def find_static_action_source(action_name: str) -> Optional[Path]:
+    """
+    Locate the module of an action, if its code version can be derived without importing it.
+
+    The module is searched like import_action_module would import it. Its code version is only
+    known up front when the module defines the action class itself, directly on a urartu base
+    class (DEFAULT_VERSION_BASES), and does not override get_action_version: then it is
+    action_code_version() of the module, as Action.get_action_version computes it.
+
+    Returns:
+        The source file of the action module, or None if the version needs the action imported
+    """
+    try:
+        spec = importlib.util.find_spec(f"actions.{action_name}")
+    except (ImportError, ValueError):
+        spec = None
+    if spec is not None and spec.origin and spec.origin.endswith(".py"):
+        source_file = Path(spec.origin)
+    else:
+        source_file = Path.cwd() / "actions" / f"{action_name}.py"
+        if not source_file.is_file():
+            return None
+
+    try:
+        tree = ast.parse(source_file.read_bytes(), filename=str(source_file))
+    except (OSError, SyntaxError):
+        return None
+    action_classes = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if any(isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name == "get_action_version"
+               for item in node.body):
+            return None
+        bases = {base.id if isinstance(base, ast.Name) else getattr(base, "attr", None) for base in node.bases}
+        if bases & DEFAULT_VERSION_BASES:
+            action_classes.append(node)
+    return source_file if action_classes else None
+
+
+class ShippedObject:
+    """An object passed by reference in the parent's config, pickled into the worker."""
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+def ship_config(cfg) -> Dict[str, Any]:
+    """
+    Resolve an action config into a picklable container for the worker.
+
+    Object store references are replaced by the objects they refer to, wrapped in
+    ShippedObject so the worker can put them into its own object store.
+    """
+    from .object_store import object_store
+
+    def ship(unresolved: Any, resolved: Any) -> Any:
+        if object_store.handle_of(unresolved) is not None:
+            return ShippedObject(resolved)
+        if isinstance(unresolved, dict) and isinstance(resolved, dict):
+            return {key: ship(unresolved[key], resolved[key]) for key in unresolved}
+        if isinstance(unresolved, list) and isinstance(resolved, list):
+            return [ship(u, r) for u, r in zip(unresolved, resolved)]
+        return resolved
+
+    return ship(OmegaConf.to_container(cfg, resolve=False), OmegaConf.to_container(cfg, resolve=True))
+
+
+def unship_config(container: Any) -> Any:
+    """Rebuild an action config shipped by ship_config, inside the worker."""
+    from .object_store import object_store
+
+    def unship(node: Any) -> Any:
+        if isinstance(node, ShippedObject):
+            return object_store.reference(object_store.put(node.value))
+        if isinstance(node, dict):
+            return {key: unship(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [unship(value) for value in node]
+        return node
+
+    return OmegaConf.create(unship(container))
+
+
+class RecordingRun:
+    """
+    Stand-in for the Aim run inside a worker, recording what the action tracks.
+
+    Item assignments are kept (and can be read back); method calls such as `track` or
+    `add_tag` are recorded as (method, args, kwargs) and replayed on the parent's run.
+    """
+
+    def __init__(self, run_hash: Optional[str] = None):
+        self.hash = run_hash
+        self.records: List[Tuple[str, tuple, dict]] = []
+        self._items: Dict[str, Any] = {}
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._items[key] = value
+        self.records.append(("__setitem__", (key, value), {}))
+
+    def __getitem__(self, key: str) -> Any:
+        return self._items[key]
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.records.append((name, args, kwargs))
+
+        return record
+
+
+def replay_records(aim_run, records: List[Tuple[str, tuple, dict]]) -> None:
+    """Apply what an action tracked in a worker to the parent's Aim run."""
+    for method, args, kwargs in records:
+        try:
+            getattr(aim_run, method)(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"Could not replay '{method}' tracked by a worker process: {e}")
+
+
+def _peak_memory() -> Tuple[Optional[int], Optional[int]]:
+    """Peak RSS and peak CUDA memory of this process."""
+    from urartu.utils.profiling import _cuda, _max_rss_bytes
+
+    cuda = _cuda()
+    return _max_rss_bytes(), cuda.max_memory_allocated() if cuda is not None else None
+
+
+def _run(action_name: str, name: str, cfg, aim_run: RecordingRun) -> Dict[str, Any]:
+    from .cache_manager import flush_async_cache_writes
+    from urartu.utils.profiling import profile_action, profile_phase
+
+    with profile_action(name, action_name) as profile:
+        with profile_phase("import"):
+            action_module = import_action_module(action_name)
+            action_class = find_action_class(action_module)
+
+        cache = None
+        if action_class:
+            with profile_phase("construct"):
+                action_instance = action_class(cfg, aim_run)
+            if hasattr(action_instance, 'run_with_cache'):
+                action_instance.run_with_cache()
+            elif hasattr(action_instance, 'run'):
+                with profile_phase("run"):
+                    action_instance.run()
+            elif hasattr(action_instance, 'main'):
+                with profile_phase("run"):
+                    action_instance.main()
+            else:
+                raise AttributeError(f"Action {action_name} has no run() or main() method")
+
+            with profile_phase("extract_outputs"):
+                outputs = action_instance.get_outputs() if hasattr(action_instance, 'get_outputs') else {}
+                if not outputs and getattr(action_instance, '_cached_outputs', None):
+                    outputs = action_instance._cached_outputs
+
+            # Outputs saved to the cache are loaded from there by the parent
+            if outputs and getattr(action_instance, 'cache_enabled', False) and action_instance._cache_key:
+                with profile_phase("cache_save"):
+                    flush_async_cache_writes()
+                if action_instance.cache_backend.exists(action_instance._cache_key):
+                    cache = {
+                        "cache_key": action_instance._cache_key,
+                        "cache_backend": action_instance.cache_backend.name,
+                        "cache_dir": str(action_instance.cache_backend.cache_dir),
+                    }
+        elif hasattr(action_module, 'main'):
+            with profile_phase("run"):
+                action_module.main(cfg=cfg, aim_run=aim_run)
+            outputs = {}
+        else:
+            raise AttributeError(f"Action {action_name} has no Action class or main() function")
+
+    return {
+        "outputs": None if cache else dict(outputs or {}),
+        "cache": cache,
+        "phases": profile.phases,
+        "events": profile.events,
+    }
+
+
+def worker_main(action_name: str, name: str, shipped_cfg: Dict[str, Any], run_hash: Optional[str],
+                env: Dict[str, str], conn) -> None:
+    """Entry point of a worker process: run one action and send its result to the parent."""
+    from urartu.utils.tracking import flush_async_tracking
+
+    os.environ.update(env)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    aim_run = RecordingRun(run_hash)
+    try:
+        result = _run(action_name, name, unship_config(shipped_cfg), aim_run)
+        result["error"] = None
+    except BaseException as e:
+        result = {"error": f"{type(e).__name__}: {e}\n{traceback.format_exc()}"}
+    flush_async_tracking()
+    result["aim_records"] = aim_run.records
+    result["peak_rss_bytes"], result["peak_cuda_bytes"] = _peak_memory()
+    try:
+        conn.send(result)
+    except Exception as e:
+        # E.g. outputs that cannot be pickled
+        conn.send({"error": f"Could not send the result of action '{name}' to the pipeline: {e}",
+                   "aim_records": aim_run.records})
+    finally:
+        conn.close()
@@ -0,0 +1,501 @@
+"""
+Storage backends for the action cache in urartu.
+
+A cache backend persists the payload of a cache entry (the action outputs together with
+a few metadata fields such as the timestamp and config hash) under a cache key inside the
+shared cache directory. Backends are selected per action with the `cache_backend` config key.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Type
+
+from .cache_codecs import CacheCodec, compress, decompress, detect_codec
+
+logger = logging.getLogger(__name__)
+
+
+class LazyOutputs(Mapping):
+    """
+    Read-only mapping of cached outputs that materializes each value on first access.
+
+    Keys are known up front, so membership tests, iteration and `keys()` never load anything;
+    a value is decoded from its backing file(s) the first time it is looked up and then kept.
+    """
+
+    def __init__(self, nodes: Dict[str, Any], decode: Callable[[Any], Any]):
+        self._nodes = nodes
+        self._decode = decode
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._values:
+            node = self._nodes[key]
+            with self._lock:
+                if key not in self._values:
+                    self._values[key] = self._decode(node)
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def is_loaded(self, key: str) -> bool:
+        """Check if the value for key has already been materialized."""
+        return key in self._values
+
+    def loaded(self) -> Dict[str, Any]:
+        """Return the values materialized so far, without loading the others."""
+        return dict(self._values)
+
+    def __repr__(self) -> str:
+        return f"LazyOutputs(keys={list(self._nodes)}, loaded={list(self._values)})"
+
+
+def describe_outputs(outputs: Mapping) -> Dict[str, Any]:
+    """
+    Return outputs in a form suitable for tracking without forcing lazy values to load.
+
+    Values of LazyOutputs that have not been accessed yet are replaced by a placeholder.
+    """
+    if isinstance(outputs, LazyOutputs):
+        return {key: outputs[key] if outputs.is_loaded(key) else "<not loaded>" for key in outputs}
+    return outputs
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "wb") -> Iterator[IO]:
+    """
+    Write a file through a temporary file in the same directory that is renamed into place.
+
+    Readers (possibly other jobs sharing the cache directory) see either the previous file or
+    the complete new one, never a partially written file.
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+class CacheBackend(ABC):
+    """
+    Abstract base class for cache storage backends.
+
+    Attributes:
+        name (str): Name used to select the backend via the `cache_backend` config key.
+        cache_dir (Path): Directory holding the cache entries.
+        codec (Optional[CacheCodec]): Codec compressing new entries, None to store them uncompressed.
+            Entries are read with whichever codec they were written with.
+    """
+
+    name: str = ""
+
+    def __init__(self, cache_dir: Path, codec: Optional[CacheCodec] = None):
+        self.cache_dir = Path(cache_dir)
+        self.codec = codec
+
+    @abstractmethod
+    def exists(self, cache_key: str) -> bool:
+        """Check if an entry is stored under the given cache key."""
+        pass
+
+    @abstractmethod
+    def save(self, cache_key: str, payload: Dict[str, Any]) -> None:
+        """Store the payload (a dict holding 'outputs' and metadata fields) under the cache key."""
+        pass
+
+    @abstractmethod
+    def load(self, cache_key: str) -> Dict[str, Any]:
+        """Load the payload stored under the cache key."""
+        pass
+
+    @abstractmethod
+    def entry_paths(self, cache_key: str) -> List[Path]:
+        """Return the files owned by the entry (excluding blobs shared with other entries)."""
+        pass
+
+    def delete(self, cache_key: str) -> None:
+        """Delete the files owned by the entry."""
+        for path in self.entry_paths(cache_key):
+            path.unlink(missing_ok=True)
+
+    def entry_size(self, cache_key: str) -> int:
+        """Return the number of bytes on disk used by the entry."""
+        return sum(path.stat().st_size for path in self.entry_paths(cache_key) if path.exists())
+
+
+class PickleCacheBackend(CacheBackend):
+    """Stores the whole payload as a single pickle file `<cache_key>.pkl`."""
+
+    name = "pickle"
+
+    def _path(self, cache_key: str) -> Path:
+        return self.cache_dir / f"{cache_key}.pkl"
+
+    def exists(self, cache_key: str) -> bool:
+        return self._path(cache_key).exists()
+
+    def save(self, cache_key: str, payload: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self._path(cache_key), "wb") as f:
+            if self.codec is None:
+                pickle.dump(payload, f)
+            else:
+                f.write(self.codec.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def load(self, cache_key: str) -> Dict[str, Any]:
+        with open(self._path(cache_key), "rb") as f:
+            codec_class = detect_codec(f.read(8))
+            f.seek(0)
+            if codec_class is None:
+                return pickle.load(f)
+            return pickle.loads(codec_class().decompress(f.read()))
+
+    def entry_paths(self, cache_key: str) -> List[Path]:
+        return [self._path(cache_key)]
+
+
+class ContentAddressedCacheBackend(CacheBackend):
+    """
+    Stores outputs as content-addressed blobs plus a small JSON manifest.
+
+    Each entry is a `<cache_key>.manifest.json` file. Small JSON-compatible values (strings,
+    numbers, lists and dicts with string keys) are stored inline in the manifest, while large
+    ones and everything else are written to `blobs/` under the SHA-256 of their bytes, so
+    identical blobs produced by different actions are stored once:
+
+    - torch tensors are stored as safetensors files and memory-mapped on load (CPU tensors);
+    - numpy arrays are stored as `.npy` files and loaded as read-only memory maps;
+    - HF datasets that are exactly the contents of their Arrow files are stored by reference to
+      those files; other datasets, including ones with columns renamed, removed or cast since
+      they were loaded, are saved once per fingerprint with `save_to_disk` and memory-mapped on load;
+    - any other value is pickled into its own blob.
+
+    Pickled and JSON blobs are compressed with the backend's codec; tensors, arrays and
+    datasets are stored uncompressed so they can be memory-mapped.
+
+    Loaded outputs are returned as LazyOutputs, so only the keys a consumer actually reads
+    are decoded from their blobs.
+    """
+
+    name = "content_addressed"
+    MANIFEST_VERSION = 1
+    BLOB_MARKER = "__cache_blob__"
+    # Top-level outputs whose JSON encoding exceeds this size get their own blob file
+    INLINE_LIMIT_BYTES = 64 * 1024
+
+    @property
+    def blob_dir(self) -> Path:
+        return self.cache_dir / "blobs"
+
+    def _manifest_path(self, cache_key: str) -> Path:
+        return self.cache_dir / f"{cache_key}.manifest.json"
+
+    def exists(self, cache_key: str) -> bool:
+        return self._manifest_path(cache_key).exists()
+
+    def entry_paths(self, cache_key: str) -> List[Path]:
+        return [self._manifest_path(cache_key)]
+
+    def save(self, cache_key: str, payload: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "version": self.MANIFEST_VERSION,
+            "metadata": {k: v for k, v in payload.items() if k != "outputs"},
+            "outputs": {key: self._encode_output(value) for key, value in payload.get("outputs", {}).items()},
+        }
+        # The manifest is written last, so an entry only becomes visible once all its blobs exist
+        with atomic_write(self._manifest_path(cache_key), "w") as f:
+            json.dump(manifest, f, default=str)
+
+    def load(self, cache_key: str) -> Dict[str, Any]:
+        with open(self._manifest_path(cache_key), "r") as f:
+            manifest = json.load(f)
+        payload = dict(manifest["metadata"])
+        payload["outputs"] = LazyOutputs(manifest["outputs"], self._decode)
+        return payload
+
+    def entry_size(self, cache_key: str) -> int:
+        # Blobs shared with other entries are counted for each entry referencing them
+        size = super().entry_size(cache_key)
+        for blob_path in self.referenced_blobs(cache_key):
+            if blob_path.is_dir():
+                size += sum(p.stat().st_size for p in blob_path.rglob("*") if p.is_file())
+            elif blob_path.exists():
+                size += blob_path.stat().st_size
+        return size
+
+    def referenced_blobs(self, cache_key: str) -> List[Path]:
+        """Return the blob files (and saved dataset directories) referenced by an entry."""
+        with open(self._manifest_path(cache_key), "r") as f:
+            manifest = json.load(f)
+        blobs = []
+        self._collect_blobs(manifest["outputs"], blobs)
+        return blobs
+
+    def _collect_blobs(self, node: Any, blobs: List[Path]) -> None:
+        if isinstance(node, list):
+            for item in node:
+                self._collect_blobs(item, blobs)
+        elif isinstance(node, dict):
+            if "blob" in node and self.BLOB_MARKER in node:
+                blob_path = self.blob_dir / node["blob"]
+                blobs.append(blob_path)
+                if node[self.BLOB_MARKER] == "json" and blob_path.exists():
+                    self._collect_blobs(self._read_json_blob(node["blob"]), blobs)
+            elif node.get(self.BLOB_MARKER) == "dataset_dir":
+                blobs.append(self.blob_dir / node["path"])
+            for value in node.values():
+                self._collect_blobs(value, blobs)
+
+    def _write_blob(self, data: bytes, suffix: str) -> str:
+        """Write bytes to the blob store (once per content hash) and return the blob's relative path."""
+        digest = hashlib.sha256(data).hexdigest()
+        relative_path = f"{digest[:2]}/{digest}{suffix}"
+        blob_path = self.blob_dir / relative_path
+        if not self._reuse(blob_path):
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(blob_path, "wb") as f:
+                f.write(data)
+        return relative_path
+
+    @staticmethod
+    def _reuse(blob_path: Path) -> bool:
+        """
+        Mark an existing blob (or saved dataset directory) as in use again.
+
+        Its modification time is refreshed, so CacheManager.remove_orphan_blobs keeps it for
+        the grace period even if no manifest references it until the new one is written.
+
+        Returns:
+            False if the blob does not exist and has to be written
+        """
+        try:
+            os.utime(blob_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _read_json_blob(self, blob: str) -> Any:
+        with open(self.blob_dir / blob, "rb") as f:
+            return json.loads(decompress(f.read()))
+
+    def _blob_node(self, kind: str, **fields) -> Dict[str, Any]:
+        return {self.BLOB_MARKER: kind, **fields}
+
+    def _encode_output(self, value: Any) -> Any:
+        """Encode a top-level output, moving large inline JSON into its own blob."""
+        node = self._encode(value)
+        if isinstance(node, (list, str)) or (isinstance(node, dict) and self.BLOB_MARKER not in node):
+            data = json.dumps(node).encode()
+            if len(data) > self.INLINE_LIMIT_BYTES:
+                return self._blob_node("json", blob=self._write_blob(compress(data, self.codec), ".json"))
+        return node
+
+    def _encode(self, value: Any) -> Any:
+        """Encode a value into a JSON-compatible manifest node, writing blobs as needed."""
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, dict) and all(isinstance(k, str) for k in value) and self.BLOB_MARKER not in value:
+            return {k: self._encode(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._encode(v) for v in value]
+        if isinstance(value, tuple):
+            return self._blob_node("tuple", items=[self._encode(v) for v in value])
+
+        # Only look for library types whose module is already imported: a value of that type
+        # cannot exist otherwise, and this keeps the backend free of heavy imports.
+        torch = sys.modules.get("torch")
+        if torch is not None and isinstance(value, torch.Tensor):
+            node = self._encode_tensor(value)
+            if node is not None:
+                return node
+        numpy = sys.modules.get("numpy")
+        if numpy is not None and isinstance(value, numpy.ndarray) and not value.dtype.hasobject:
+            buffer = io.BytesIO()
+            numpy.save(buffer, value, allow_pickle=False)
+            return self._blob_node("ndarray", blob=self._write_blob(buffer.getvalue(), ".npy"))
+        datasets = sys.modules.get("datasets")
+        if datasets is not None and isinstance(value, datasets.DatasetDict):
+            return self._blob_node(
+                "dataset_dict", splits={split: self._encode_dataset(ds) for split, ds in value.items()}
+            )
+        if datasets is not None and isinstance(value, datasets.Dataset):
+            return self._encode_dataset(value)
+
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return self._blob_node("pickle", blob=self._write_blob(compress(data, self.codec), ".pkl"))
+
+    def _encode_tensor(self, tensor) -> Any:
+        try:
+            from safetensors.torch import save as save_safetensors
+        except ImportError:
+            return None  # Fall back to a pickled blob
+        data = save_safetensors({"tensor": tensor.detach().cpu().contiguous()})
+        return self._blob_node(
+            "tensor",
+            blob=self._write_blob(data, ".safetensors"),
+            device=str(tensor.device),
+            requires_grad=bool(tensor.requires_grad),
+        )
+
+    @staticmethod
+    def _is_stored_in_cache_files(dataset) -> bool:
+        """
+        Whether a dataset is exactly the contents of its Arrow cache files.
+
+        Transforms such as rename_column, remove_columns or cast keep the cache files and are
+        replayed on the memory-mapped table instead, so a dataset only qualifies if no block
+        of its table has replays and every file has the schema of the table.
+        """
+        import pyarrow as pa
+        from datasets.table import ConcatenationTable, MemoryMappedTable
+
+        if dataset._indices is not None:
+            return False
+        table = dataset._data
+        if isinstance(table, ConcatenationTable):
+            # Blocks side by side (concatenated along columns) cannot be rebuilt from the files
+            if any(len(row) != 1 for row in table.blocks):
+                return False
+            blocks = [row[0] for row in table.blocks]
+        else:
+            blocks = [table]
+        if not all(isinstance(block, MemoryMappedTable) and not block.replays for block in blocks):
+            return False
+        paths = [block.path for block in blocks]
+        if paths != [entry["filename"] for entry in dataset.cache_files]:
+            return False
+        for path in paths:
+            if not Path(path).exists():
+                return False
+            with pa.memory_map(path) as source:
+                if not pa.ipc.open_stream(source).schema.equals(table.schema):
+                    return False
+        return True
+
+    def _encode_dataset(self, dataset) -> Dict[str, Any]:
+        if dataset.cache_files and self._is_stored_in_cache_files(dataset):
+            # Already stored as is in Arrow files on disk: keep a reference instead of copying
+            cache_files = [entry["filename"] for entry in dataset.cache_files]
+            return self._blob_node("dataset_files", files=cache_files, format=dataset.format)
+
+        dataset_dir = self.blob_dir / "datasets" / dataset._fingerprint
+        if not self._reuse(dataset_dir):
+            tmp_dir = dataset_dir.with_name(f".{dataset_dir.name}.{uuid.uuid4().hex}.tmp")
+            dataset.save_to_disk(str(tmp_dir))
+            try:
+                os.rename(tmp_dir, dataset_dir)
+            except OSError:
+                # Another job saved the same dataset first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                if not dataset_dir.exists():
+                    raise
+        return self._blob_node("dataset_dir", path=str(dataset_dir.relative_to(self.blob_dir)))
+
+    def _decode(self, node: Any) -> Any:
+        """Rebuild a value from a manifest node."""
+        if isinstance(node, list):
+            return [self._decode(v) for v in node]
+        if not isinstance(node, dict):
+            return node
+        kind = node.get(self.BLOB_MARKER)
+        if kind is None:
+            return {k: self._decode(v) for k, v in node.items()}
+
+        if kind == "tuple":
+            return tuple(self._decode(v) for v in node["items"])
+        if kind == "json":
+            return self._decode(self._read_json_blob(node["blob"]))
+        if kind == "pickle":
+            with open(self.blob_dir / node["blob"], "rb") as f:
+                return pickle.loads(decompress(f.read()))
+        if kind == "tensor":
+            import torch
+            from safetensors.torch import load_file
+
+            tensor = load_file(str(self.blob_dir / node["blob"]))["tensor"]
+            if node["device"] != "cpu" and torch.cuda.is_available():
+                tensor = tensor.to(node["device"])
+            return tensor.requires_grad_(node["requires_grad"])
+        if kind == "ndarray":
+            import numpy
+
+            return numpy.load(self.blob_dir / node["blob"], mmap_mode="r")
+        if kind == "dataset_files":
+            import datasets
+
+            parts = [datasets.Dataset.from_file(f) for f in node["files"]]
+            dataset = parts[0] if len(parts) == 1 else datasets.concatenate_datasets(parts)
+            fmt = node["format"]
+            dataset.set_format(
+                type=fmt["type"],
+                columns=fmt["columns"],
+                output_all_columns=fmt["output_all_columns"],
+                **fmt["format_kwargs"],
+            )
+            return dataset
+        if kind == "dataset_dir":
+            import datasets
+
+            return datasets.load_from_disk(str(self.blob_dir / node["path"]))
+        if kind == "dataset_dict":
+            import datasets
+
+            return datasets.DatasetDict({split: self._decode(ds) for split, ds in node["splits"].items()})
+        raise ValueError(f"Unknown cache blob kind '{kind}'")
+
+
+CACHE_BACKENDS: Dict[str, Type[CacheBackend]] = {
+    PickleCacheBackend.name: PickleCacheBackend,
+    ContentAddressedCacheBackend.name: ContentAddressedCacheBackend,
+}
+
+
+def register_cache_backend(backend_class: Type[CacheBackend]) -> None:
+    """Register a custom cache backend so it can be selected via `cache_backend`."""
+    CACHE_BACKENDS[backend_class.name] = backend_class
+
+
+def get_cache_backend(name: str, cache_dir: Path, codec: Optional[CacheCodec] = None) -> CacheBackend:
+    """
+    Instantiate the cache backend registered under the given name.
+
+    Args:
+        name: Backend name (e.g. 'pickle' or 'content_addressed')
+        cache_dir: Directory holding the cache entries
+        codec: Codec compressing new entries (see get_cache_codec), None for no compression
+
+    Returns:
+        The cache backend instance
+
+    Raises:
+        ValueError: If no backend is registered under the name
+    """
+    backend_class = CACHE_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown cache backend '{name}'. Available backends: {sorted(CACHE_BACKENDS)}")
+    return backend_class(cache_dir, codec)
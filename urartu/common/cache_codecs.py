@@ -0,0 +1,148 @@
+"""
+Compression codecs for cache entries in urartu.
+
+A codec compresses the serialized bytes of a cache entry. Every codec's output starts with
+the magic number of its format, so `decompress` recognizes compressed data by itself and
+entries written with any codec (or none) can be read regardless of the current settings.
+Codecs are selected per action with the `cache_compression` and `cache_compression_level`
+config keys.
+"""
+
+import gzip
+from typing import Dict, Optional, Type
+
+
+class CacheCodec:
+    """
+    Base class for cache compression codecs.
+
+    Attributes:
+        name (str): Name used to select the codec via the `cache_compression` config key.
+        magic (bytes): Leading bytes identifying data compressed by this codec.
+        default_level (int): Compression level used when none is configured.
+        level (int): Compression level of this codec instance.
+    """
+
+    name: str = ""
+    magic: bytes = b""
+    default_level: int = 0
+
+    def __init__(self, level: Optional[int] = None):
+        self.level = self.default_level if level is None else int(level)
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"{self.name}:{self.level}"
+
+
+class GzipCodec(CacheCodec):
+    """gzip from the standard library: available everywhere, but the slowest of the codecs."""
+
+    name = "gzip"
+    magic = b"\x1f\x8b"
+    default_level = 6
+
+    def compress(self, data: bytes) -> bytes:
+        # A fixed mtime keeps the output deterministic, so identical content-addressed blobs dedupe
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class ZstdCodec(CacheCodec):
+    """Zstandard (requires the `zstandard` package): good ratios at high speed, levels 1-22."""
+
+    name = "zstd"
+    magic = b"\x28\xb5\x2f\xfd"
+    default_level = 3
+
+    def __init__(self, level: Optional[int] = None):
+        super().__init__(level)
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("The 'zstd' cache compression requires the 'zstandard' package: pip install zstandard")
+        self._zstandard = zstandard
+
+    def compress(self, data: bytes) -> bytes:
+        return self._zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+class Lz4Codec(CacheCodec):
+    """LZ4 frames (requires the `lz4` package): the fastest codec, with lower ratios."""
+
+    name = "lz4"
+    magic = b"\x04\x22\x4d\x18"
+    default_level = 0
+
+    def __init__(self, level: Optional[int] = None):
+        super().__init__(level)
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ImportError("The 'lz4' cache compression requires the 'lz4' package: pip install lz4")
+        self._lz4_frame = lz4.frame
+
+    def compress(self, data: bytes) -> bytes:
+        return self._lz4_frame.compress(data, compression_level=self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._lz4_frame.decompress(data)
+
+
+CACHE_CODECS: Dict[str, Type[CacheCodec]] = {
+    GzipCodec.name: GzipCodec,
+    ZstdCodec.name: ZstdCodec,
+    Lz4Codec.name: Lz4Codec,
+}
+
+
+def get_cache_codec(name: Optional[str], level: Optional[int] = None) -> Optional[CacheCodec]:
+    """
+    Instantiate the codec registered under the given name.
+
+    Args:
+        name: Codec name ('gzip', 'zstd' or 'lz4'), or None/'none'/False for no compression
+        level: Compression level, the codec's default if None
+
+    Returns:
+        The codec instance, or None for no compression
+
+    Raises:
+        ValueError: If no codec is registered under the name
+        ImportError: If the library required by the codec is not installed
+    """
+    if not name or str(name).lower() == "none":
+        return None
+    codec_class = CACHE_CODECS.get(name)
+    if codec_class is None:
+        raise ValueError(f"Unknown cache compression '{name}'. Available codecs: {sorted(CACHE_CODECS)}")
+    return codec_class(level)
+
+
+def compress(data: bytes, codec: Optional[CacheCodec]) -> bytes:
+    """Compress data with the codec, or return it unchanged if there is none."""
+    return data if codec is None else codec.compress(data)
+
+
+def detect_codec(header: bytes) -> Optional[Type[CacheCodec]]:
+    """Return the codec whose magic number starts the given bytes, or None for uncompressed data."""
+    for codec_class in CACHE_CODECS.values():
+        if header.startswith(codec_class.magic):
+            return codec_class
+    return None
+
+
+def decompress(data: bytes) -> bytes:
+    """Decompress data written by any registered codec, or return uncompressed data unchanged."""
+    codec_class = detect_codec(data)
+    return data if codec_class is None else codec_class().decompress(data)
@@ -0,0 +1,558 @@
+"""
+Size management for the shared action cache in urartu.
+
+The CacheIndex keeps a small SQLite database inside the cache directory with one row per
+cache entry (action name, size, config hash, creation and last access time) and the history
+of action runtimes, used to estimate the cost of recomputing an action. Cache lookups
+consult it instead of scanning the directory, and the CacheManager uses it to keep the cache
+within a byte budget by evicting least-recently-used entries. The CacheManager also provides
+per-key file locks, so jobs sharing the cache directory compute each entry only once, and the
+AsyncCacheWriter persists entries in the background when `cache_async_write` is enabled.
+"""
+
+import atexit
+import logging
+import queue
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+from .cache import CacheBackend, ContentAddressedCacheBackend, get_cache_backend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexEntry:
+    """A row of the cache index."""
+    cache_key: str
+    action_name: str
+    backend: str
+    size_bytes: int
+    created: float
+    last_access: float
+    config_hash: Optional[str] = None
+
+
+class CacheIndex:
+    """
+    SQLite index of the entries stored in a cache directory.
+
+    A connection is opened per operation so the index can be shared by threads and by
+    several jobs using the same cache directory.
+    """
+
+    FILENAME = "cache_index.sqlite"
+    COLUMNS = "cache_key, action_name, backend, size_bytes, created, last_access, config_hash"
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.path = self.cache_dir / self.FILENAME
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.path), timeout=60)
+        if not self._schema_ready:
+            with connection:
+                connection.execute(
+                    """CREATE TABLE IF NOT EXISTS entries (
+                        cache_key TEXT PRIMARY KEY,
+                        action_name TEXT NOT NULL,
+                        backend TEXT NOT NULL,
+                        size_bytes INTEGER NOT NULL,
+                        created REAL NOT NULL,
+                        last_access REAL NOT NULL,
+                        config_hash TEXT
+                    )"""
+                )
+                columns = {row[1] for row in connection.execute("PRAGMA table_info(entries)")}
+                if "config_hash" not in columns:  # Index created before config hashes were recorded
+                    connection.execute("ALTER TABLE entries ADD COLUMN config_hash TEXT")
+                connection.execute("CREATE INDEX IF NOT EXISTS entries_action_name ON entries (action_name)")
+                # Kept separately from the entries so the history survives eviction
+                connection.execute(
+                    """CREATE TABLE IF NOT EXISTS runtimes (
+                        cache_key TEXT NOT NULL,
+                        action_name TEXT NOT NULL,
+                        seconds REAL NOT NULL,
+                        recorded REAL NOT NULL
+                    )"""
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS runtimes_action_name ON runtimes (action_name)")
+            self._schema_ready = True
+        return connection
+
+    def record(self, entry: IndexEntry) -> None:
+        """Insert or replace the row of an entry."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO entries ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry.cache_key, entry.action_name, entry.backend, entry.size_bytes,
+                 entry.created, entry.last_access, entry.config_hash),
+            )
+
+    def touch(self, cache_key: str, timestamp: Optional[float] = None) -> bool:
+        """Update the last access time of an entry. Returns False if the entry is not indexed."""
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "UPDATE entries SET last_access = ? WHERE cache_key = ?",
+                (timestamp or time.time(), cache_key),
+            )
+            return cursor.rowcount > 0
+
+    def get(self, cache_key: str) -> Optional[IndexEntry]:
+        """Return the row of an entry, or None if it is not indexed."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                f"SELECT {self.COLUMNS} FROM entries WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        return IndexEntry(*row) if row else None
+
+    def entries_for_action(self, action_name: str) -> List[IndexEntry]:
+        """Return the rows of all entries produced by an action, most recent first."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT {self.COLUMNS} FROM entries WHERE action_name = ? ORDER BY created DESC",
+                (action_name,),
+            ).fetchall()
+        return [IndexEntry(*row) for row in rows]
+
+    def remove(self, cache_keys: Iterable[str]) -> None:
+        """Remove the rows of the given entries."""
+        with closing(self._connect()) as connection, connection:
+            connection.executemany("DELETE FROM entries WHERE cache_key = ?", [(key,) for key in cache_keys])
+
+    def entries(self) -> List[IndexEntry]:
+        """Return all rows, least recently used first."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(f"SELECT {self.COLUMNS} FROM entries ORDER BY last_access ASC").fetchall()
+        return [IndexEntry(*row) for row in rows]
+
+    def record_runtime(self, cache_key: str, action_name: str, seconds: float) -> None:
+        """Record how long computing an entry took."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO runtimes (cache_key, action_name, seconds, recorded) VALUES (?, ?, ?, ?)",
+                (cache_key, action_name, seconds, time.time()),
+            )
+
+    def runtimes(self, action_name: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Return the (cache_key, seconds) of the most recent runs of an action, most recent first."""
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT cache_key, seconds FROM runtimes WHERE action_name = ? ORDER BY recorded DESC LIMIT ?",
+                (action_name, limit),
+            ).fetchall()
+
+    def total_size(self) -> int:
+        """Return the summed size of all indexed entries in bytes."""
+        with closing(self._connect()) as connection:
+            (total,) = connection.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()
+        return total
+
+
+class CacheManager:
+    """
+    Keeps a cache directory within a byte budget by evicting least-recently-used entries.
+
+    Entries are recorded in the CacheIndex when they are saved and touched when they are
+    loaded. When the indexed size exceeds `max_bytes`, entries are evicted in order of last
+    access (the cache file(s) and the `.yaml` metadata), and blobs of the content-addressed
+    backend that are no longer referenced by any entry are removed.
+
+    Attributes:
+        cache_dir (Path): Directory holding the cache entries.
+        max_bytes (Optional[int]): Byte budget of the cache, None for no limit.
+        index (CacheIndex): Index of the entries in the cache directory.
+    """
+
+    LOCK_DIRNAME = "locks"
+    # Unreferenced blobs younger than this may belong to an entry whose manifest is still being written
+    ORPHAN_GRACE_SECONDS = 3600
+
+    def __init__(self, cache_dir: Path, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.index = CacheIndex(self.cache_dir)
+
+    def metadata_path(self, cache_key: str) -> Path:
+        """Get the file path for the human-readable metadata of a cache entry."""
+        return self.cache_dir / f"{cache_key}.yaml"
+
+    @contextmanager
+    def lock(self, cache_key: str) -> Iterator[None]:
+        """
+        Hold an exclusive lock on a cache key, shared across threads and processes.
+
+        The lock is an flock on `locks/<cache_key>.lock` in the cache directory, so it also
+        coordinates the jobs of a multirun sharing the cache, and is released by the OS if
+        the process holding it dies. Without fcntl (Windows) no locking is done.
+        """
+        if fcntl is None:
+            yield
+            return
+        lock_path = self.cache_dir / self.LOCK_DIRNAME / f"{cache_key}.lock"
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info(f"⏳ Waiting for another job computing cache entry {cache_key}")
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _entry_size(self, cache_key: str, backend: CacheBackend) -> int:
+        metadata_path = self.metadata_path(cache_key)
+        metadata_size = metadata_path.stat().st_size if metadata_path.exists() else 0
+        return backend.entry_size(cache_key) + metadata_size
+
+    def lookup(self, cache_key: str, backend: CacheBackend) -> Optional[IndexEntry]:
+        """
+        Find an entry, consulting the index before the filesystem.
+
+        Entries missing from the index (written before it existed) are found with a single
+        existence check and indexed on the spot.
+
+        Returns:
+            The index row of the entry, or None if there is no such entry
+        """
+        entry = self.index.get(cache_key)
+        if entry is not None and entry.backend != backend.name:
+            entry = None  # Stored by another backend
+        if entry is None and backend.exists(cache_key):
+            entry = self._index_existing(cache_key, backend)
+        return entry
+
+    def _index_existing(self, cache_key: str, backend: CacheBackend, action_name: Optional[str] = None,
+                        last_access: Optional[float] = None) -> IndexEntry:
+        """Index an entry that exists on disk but not in the index, dated by its file times."""
+        paths = [path for path in backend.entry_paths(cache_key) if path.exists()]
+        modified = max(path.stat().st_mtime for path in paths) if paths else time.time()
+        entry = IndexEntry(
+            cache_key=cache_key,
+            action_name=action_name or cache_key.rsplit("_", 1)[0],
+            backend=backend.name,
+            size_bytes=self._entry_size(cache_key, backend),
+            created=modified,
+            last_access=last_access or modified,
+        )
+        self.index.record(entry)
+        return entry
+
+    def record_save(self, cache_key: str, action_name: str, backend: CacheBackend,
+                    config_hash: Optional[str] = None, runtime_seconds: Optional[float] = None) -> None:
+        """Index a freshly saved entry and evict older entries if the budget is exceeded."""
+        now = time.time()
+        if runtime_seconds is not None:
+            self.index.record_runtime(cache_key, action_name, runtime_seconds)
+        self.index.record(IndexEntry(
+            cache_key=cache_key,
+            action_name=action_name,
+            backend=backend.name,
+            size_bytes=self._entry_size(cache_key, backend),
+            created=now,
+            last_access=now,
+            config_hash=config_hash,
+        ))
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes, protect={cache_key})
+
+    def estimate_runtime(self, action_name: str, cache_key: Optional[str] = None) -> Optional[float]:
+        """
+        Estimate how long computing an entry takes from past runs.
+
+        Returns:
+            The last runtime of the same cache key if it was computed before, else the mean of
+            the recent runtimes of the action, or None without history
+        """
+        history = self.index.runtimes(action_name)
+        for key, seconds in history:
+            if key == cache_key:
+                return seconds
+        if not history:
+            return None
+        return sum(seconds for _, seconds in history) / len(history)
+
+    def record_access(self, cache_key: str, action_name: str, backend: CacheBackend) -> None:
+        """Mark an entry as used now, indexing it if it predates the index."""
+        if not self.index.touch(cache_key):
+            self._index_existing(cache_key, backend, action_name=action_name, last_access=time.time())
+
+    def forget(self, cache_key: str) -> None:
+        """Remove an entry from the index (after it has been deleted)."""
+        self.index.remove([cache_key])
+
+    def _delete_entry(self, entry: IndexEntry) -> None:
+        get_cache_backend(entry.backend, self.cache_dir).delete(entry.cache_key)
+        self.metadata_path(entry.cache_key).unlink(missing_ok=True)
+
+    def evict(self, max_bytes: int, protect: Iterable[str] = (), ignore: Iterable[str] = (),
+              dry_run: bool = False) -> List[IndexEntry]:
+        """
+        Evict least-recently-used entries until the indexed size fits in max_bytes.
+
+        Args:
+            max_bytes: Byte budget to enforce
+            protect: Cache keys that must not be evicted (e.g. the entry just written)
+            ignore: Cache keys to treat as already removed
+            dry_run: Only report the entries that would be evicted
+
+        Returns:
+            The evicted entries
+        """
+        protected = set(protect)
+        ignored = set(ignore)
+        entries = [entry for entry in self.index.entries() if entry.cache_key not in ignored]
+        total = sum(entry.size_bytes for entry in entries)
+        evicted = []
+        for entry in entries:
+            if total <= max_bytes:
+                break
+            if entry.cache_key in protected:
+                continue
+            evicted.append(entry)
+            total -= entry.size_bytes
+
+        if evicted and not dry_run:
+            for entry in evicted:
+                self._delete_entry(entry)
+            self.index.remove(entry.cache_key for entry in evicted)
+            logger.info(
+                f"🧹 Evicted {len(evicted)} cache entries ({sum(e.size_bytes for e in evicted) / 1024**3:.2f} GB) "
+                f"to keep {self.cache_dir} under {max_bytes / 1024**3:.2f} GB"
+            )
+            if any(entry.backend == ContentAddressedCacheBackend.name for entry in evicted):
+                self.remove_orphan_blobs()
+        return evicted
+
+    def remove_orphan_blobs(self, dry_run: bool = False) -> int:
+        """
+        Delete blobs of the content-addressed backend that no entry references any more.
+
+        Returns:
+            The number of bytes freed (or that would be freed with dry_run)
+        """
+        backend = ContentAddressedCacheBackend(self.cache_dir)
+        if not backend.blob_dir.exists():
+            return 0
+
+        referenced = set()
+        for manifest_path in self.cache_dir.glob("*.manifest.json"):
+            cache_key = manifest_path.name[: -len(".manifest.json")]
+            try:
+                referenced.update(backend.referenced_blobs(cache_key))
+            except Exception as e:
+                logger.warning(f"Could not read cache manifest {manifest_path.name}, keeping its blobs: {e}")
+                return 0
+
+        freed = 0
+        datasets_dir = backend.blob_dir / "datasets"
+        recent = time.time() - self.ORPHAN_GRACE_SECONDS
+        for blob_path in backend.blob_dir.glob("*/*"):
+            if blob_path.parent == datasets_dir or blob_path in referenced:
+                continue
+            if blob_path.stat().st_mtime > recent:
+                continue
+            freed += blob_path.stat().st_size
+            if not dry_run:
+                blob_path.unlink(missing_ok=True)
+        if datasets_dir.exists():
+            for dataset_dir in datasets_dir.iterdir():
+                if dataset_dir in referenced or dataset_dir.stat().st_mtime > recent:
+                    continue
+                freed += sum(p.stat().st_size for p in dataset_dir.rglob("*") if p.is_file())
+                if not dry_run:
+                    shutil.rmtree(dataset_dir, ignore_errors=True)
+        return freed
+
+    def remove_orphans(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Delete files of the cache directory that belong to no complete entry.
+
+        These are `.yaml` metadata whose cache file is gone, temporary files left behind by
+        writers that crashed, lock files of keys without an entry and unreferenced blobs. Files
+        younger than ORPHAN_GRACE_SECONDS are kept, as they may belong to an entry being written,
+        and so are lock files currently held by a job.
+
+        Args:
+            dry_run: Only report what would be removed
+
+        Returns:
+            Dictionary with the number of removed files and the bytes freed
+        """
+        self.rebuild_index()
+        entries = {entry.cache_key for entry in self.index.entries()}
+        recent = time.time() - self.ORPHAN_GRACE_SECONDS
+        orphans: List[Path] = []
+
+        for path in self.cache_dir.glob("*.yaml"):
+            if path.stem not in entries and path.stat().st_mtime <= recent:
+                orphans.append(path)
+        for pattern in (".*.tmp", "blobs/*/.*.tmp"):
+            orphans.extend(path for path in self.cache_dir.glob(pattern) if path.stat().st_mtime <= recent)
+        lock_dir = self.cache_dir / self.LOCK_DIRNAME
+        if lock_dir.exists():
+            for path in lock_dir.glob("*.lock"):
+                if path.stem not in entries and path.stat().st_mtime <= recent and not self._is_locked(path):
+                    orphans.append(path)
+
+        freed = 0
+        for path in orphans:
+            try:
+                freed += path.stat().st_size
+                if not dry_run:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+        blob_bytes = self.remove_orphan_blobs(dry_run=dry_run)
+        return {"removed_files": len(orphans), "freed_bytes": freed + blob_bytes}
+
+    @staticmethod
+    def _is_locked(lock_path: Path) -> bool:
+        """Whether a job currently holds the lock of a lock file."""
+        if fcntl is None:
+            return False
+        with open(lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return False
+
+    def rebuild_index(self) -> None:
+        """Index entries written before the index existed and drop rows whose files are gone."""
+        on_disk: Dict[str, str] = {}
+        for path in self.cache_dir.glob("*.pkl"):
+            on_disk[path.stem] = "pickle"
+        for path in self.cache_dir.glob("*.manifest.json"):
+            on_disk[path.name[: -len(".manifest.json")]] = ContentAddressedCacheBackend.name
+
+        indexed = {entry.cache_key for entry in self.index.entries()}
+        self.index.remove(indexed - set(on_disk))
+        for cache_key, backend_name in on_disk.items():
+            if cache_key not in indexed:
+                self._index_existing(cache_key, get_cache_backend(backend_name, self.cache_dir))
+
+    def gc(self, max_bytes: Optional[int] = None, max_age_hours: Optional[float] = None,
+           dry_run: bool = False) -> Dict[str, int]:
+        """
+        Garbage-collect the cache directory.
+
+        Removes entries older than max_age_hours, evicts least-recently-used entries until the
+        cache fits in max_bytes and deletes unreferenced blobs.
+
+        Args:
+            max_bytes: Byte budget to enforce (defaults to the manager's budget)
+            max_age_hours: Remove entries created longer ago than this
+            dry_run: Only report what would be removed
+
+        Returns:
+            Dictionary with the number of removed entries and the bytes freed
+        """
+        self.rebuild_index()
+        removed: List[IndexEntry] = []
+
+        if max_age_hours is not None:
+            cutoff = time.time() - max_age_hours * 3600
+            expired = [entry for entry in self.index.entries() if entry.created < cutoff]
+            if not dry_run:
+                for entry in expired:
+                    self._delete_entry(entry)
+                self.index.remove(entry.cache_key for entry in expired)
+            removed.extend(expired)
+
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        if max_bytes is not None:
+            removed.extend(self.evict(max_bytes, ignore={entry.cache_key for entry in removed}, dry_run=dry_run))
+
+        freed_blobs = self.remove_orphan_blobs(dry_run=dry_run)
+        return {
+            "removed_entries": len(removed),
+            "freed_bytes": sum(entry.size_bytes for entry in removed) + freed_blobs,
+        }
+
+
+class AsyncCacheWriter:
+    """
+    Persists cache entries on a background thread, so the next action can start computing
+    while the outputs of the previous one are serialized and written.
+
+    Saves wait in a bounded queue: once `max_pending` saves are queued, submitting blocks until
+    the writer catches up, which bounds the memory held by outputs waiting to be written.
+    Outputs handed to the writer must not be modified afterwards.
+    """
+
+    def __init__(self, max_pending: int = 2):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, save: Callable[[], None], on_done: Optional[Callable[[], None]] = None) -> None:
+        """
+        Queue a save, blocking while the queue is full.
+
+        Args:
+            save: Callable writing the entry
+            on_done: Called after the save has finished (successfully or not), e.g. to release
+                the lock of the cache key
+        """
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name="urartu-cache-writer", daemon=True)
+                self._thread.start()
+        self._queue.put((save, on_done))
+
+    def _work(self) -> None:
+        while True:
+            save, on_done = self._queue.get()
+            try:
+                save()
+            except Exception as e:
+                logger.warning(f"Background cache write failed: {e}")
+            finally:
+                if on_done is not None:
+                    on_done()
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued save has been written."""
+        pending = self._queue.unfinished_tasks
+        if pending:
+            logger.info(f"💾 Waiting for {pending} pending cache write(s)")
+        self._queue.join()
+
+
+_async_writer: Optional[AsyncCacheWriter] = None
+_async_writer_lock = threading.Lock()
+
+
+def get_async_cache_writer() -> AsyncCacheWriter:
+    """Get the process-wide background cache writer, creating it on first use."""
+    global _async_writer
+    with _async_writer_lock:
+        if _async_writer is None:
+            _async_writer = AsyncCacheWriter()
+            # Pending writes must not be lost when the interpreter exits
+            atexit.register(_async_writer.flush)
+        return _async_writer
+
+
+def flush_async_cache_writes() -> None:
+    """Wait for pending background cache writes, if the background writer was used."""
+    if _async_writer is not None:
+        _async_writer.flush()
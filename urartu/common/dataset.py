@@ -2,7 +2,6 @@ import logging
 from typing import Any, Dict, List
 
 import hydra
-from torch.utils.data import DataLoader
 
 # Configure logging
 logging.basicConfig(level=logging.WARNING)
@@ -77,6 +76,7 @@ class Dataset:
         maximum input size, optionally includes additional attributes, and handles warnings for inputs
         exceeding tokenizer limits.
         """
+        from torch.utils.data import DataLoader
 
         def collate_fn(examples):
             max_input_size = max(len(example[dataloader_cfg["input_key"]]) for example in examples)
@@ -1,7 +1,5 @@
 import logging
 
-import torch
-
 
 class Device:
     """
@@ -30,13 +28,17 @@ class Device:
         """
         if device_name == "auto":
             Device.DEVICE = "auto"
-        elif device_name == "cuda":
-            assert (
-                device_name == "cuda" and torch.cuda.is_available()
-            ), "CUDA is not available on this system."
-            Device.DEVICE = torch.device("cuda")
         else:
-            Device.DEVICE = torch.device("cpu")
+            # Imported here so that actions on the "auto" device do not pay for it up front
+            import torch
+
+            if device_name == "cuda":
+                assert (
+                    device_name == "cuda" and torch.cuda.is_available()
+                ), "CUDA is not available on this system."
+                Device.DEVICE = torch.device("cuda")
+            else:
+                Device.DEVICE = torch.device("cpu")
 
         logging.info(f"Using DEVICE: {Device.DEVICE}")
 
@@ -175,6 +175,24 @@ class Intervention(nn.Module):
         """
         raise NotImplementedError("method 'intervene' is not implemented")
 
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Returns the progress of a running intervention (e.g. mask logits, optimizer state and
+        position in the data), included in the state_dict of the Action it is registered with
+        (see Action.register_intervention). Empty by default, for interventions that cannot resume.
+        """
+        return {}
+
+    def load_checkpoint_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restores the progress returned by checkpoint_state, so that the next intervene() call
+        continues where the interrupted one stopped.
+
+        Args:
+            state (Dict[str, Any]): The progress saved by the interrupted run.
+        """
+        pass
+
 
     def generate(self, prompt):
         """
@@ -1,7 +1,5 @@
 from typing import Any, Dict, List
 
-import evaluate
-
 
 class Metric:
     """
@@ -29,4 +27,6 @@ class Metric:
         This method assumes the configuration list contains exactly one dictionary with at least a 'name' key,
         which is used to identify and load the corresponding metric from the `evaluate` library.
         """
+        import evaluate
+
         return evaluate.load(cfg[0]["name"])
@@ -1,7 +1,9 @@
-from typing import Any, Dict, List
+import weakref
+from typing import Any, Callable, Dict, List
 
 import hydra
-from transformers import AutoModelForCausalLM
+
+from .model_pool import ModelKey, model_pool
 
 
 class Model:
@@ -18,6 +20,7 @@ class Model:
         get_model: Static method to instantiate a model using Hydra's utility based on the configuration.
         model: Property that should provide access to the instantiated model object.
         generate: Method to perform generation based on a given input prompt.
+        release: Method to give a pooled model back to the model pool.
     """
 
     def __init__(self, cfg: List[Dict[str, Any]]):
@@ -29,6 +32,7 @@ class Model:
         """
         self.cfg = cfg
         self._model = None
+        self._pool_release = None
 
     @staticmethod
     def get_model(cfg):
@@ -61,6 +65,33 @@ class Model:
         """
         self._model = value
 
+    def _acquire_pooled(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """
+        Acquires a model from the process-level model pool, loading it with loader if it is not resident.
+
+        The model is held until release() is called or this object is garbage collected, so
+        actions that drop their Model release it without further changes.
+
+        Args:
+            key (ModelKey): Pool key of the model, see urartu.common.model_pool.model_key.
+            loader (Callable[[], Any]): Function loading the model.
+
+        Returns:
+            Any: The loaded model, shared with other holders of the same key.
+        """
+        model = model_pool.acquire(key, loader)
+        self._pool_release = weakref.finalize(self, model_pool.release, key)
+        return model
+
+    def release(self):
+        """
+        Gives a pooled model back to the model pool; the model is loaded again on next access.
+        """
+        if self._pool_release is not None:
+            self._pool_release()
+            self._pool_release = None
+        self._model = None
+
     def generate(self, prompt):
         """
         Abstract method to generate output based on the provided prompt.
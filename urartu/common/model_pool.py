@@ -0,0 +1,202 @@
+"""
+Process-level pool of loaded models in urartu.
+
+Loading a checkpoint with `from_pretrained` dominates the start-up of many actions, and a
+pipeline such as generate -> score -> evaluate loads the same weights once per action. The
+ModelPool keeps loaded models keyed by (name, dtype, revision, device, loader) and counts the
+Model wrappers holding each of them. When the last holder goes away the model either stays
+resident, so the next action acquiring the same key reuses it, or is dropped:
+
+- Pipelines keep idle models resident while they run (see `ModelPool.keep_resident`) and drop
+  the ones no pending action refers to after each action, and all of them at the end.
+- Outside of pipelines idle models are dropped right away, as before.
+- With a memory budget (`model_pool_max_gb`), idle models are evicted least recently used
+  first to keep the resident models within it.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str, str, str, str]
+
+
+def model_key(name: str, dtype: Any = None, revision: Any = None, device: Any = None, loader: str = "",
+              **load_options: Any) -> ModelKey:
+    """
+    Build the pool key of a model; None values are kept distinct from their string forms.
+
+    Args:
+        name: Name or path of the checkpoint.
+        dtype: Data type the weights are loaded in.
+        revision: Revision of the checkpoint.
+        device: Device (map) the model is loaded on.
+        loader: Name of the function loading the model, so models of the same checkpoint
+            prepared differently (e.g. frozen or not) are not shared.
+        **load_options: Further options of the loader changing the loaded model
+            (e.g. trust_remote_code); options set to None are left out.
+
+    Returns:
+        ModelKey: (name, dtype, revision, device, loader and sorted load options)
+    """
+    options = ",".join(f"{option}={value}" for option, value in sorted(load_options.items()) if value is not None)
+    loaded_by = f"{loader}({options})" if options else loader
+    return tuple("" if value is None else str(value) for value in (name, dtype, revision, device, loaded_by))
+
+
+def model_size_bytes(model: Any) -> int:
+    """Return the bytes taken by a model's parameters and buffers (0 if it has none)."""
+    size = 0
+    for method in ("parameters", "buffers"):
+        tensors = getattr(model, method, None)
+        if callable(tensors):
+            try:
+                size += sum(tensor.numel() * tensor.element_size() for tensor in tensors())
+            except Exception:
+                pass
+    return size
+
+
+@dataclass
+class PooledModel:
+    """A model resident in the pool."""
+    key: ModelKey
+    model: Any
+    size_bytes: int
+    holders: int = 0
+    last_used: float = field(default_factory=time.time)
+
+
+class ModelPool:
+    """
+    Reference-counted models shared by the actions of a process.
+
+    Attributes:
+        max_bytes (Optional[int]): Budget for resident models, None for no limit. Models in
+            use are never evicted, so the budget can be exceeded while they are held.
+        keep_idle (bool): Whether models without holders stay resident for reuse.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.keep_idle = False
+        self._models: Dict[ModelKey, PooledModel] = {}
+        self._loading: Dict[ModelKey, threading.Lock] = {}
+        self._known_sizes: Dict[ModelKey, int] = {}
+        self._lock = threading.RLock()
+
+    def acquire(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """
+        Return the model stored under key, loading it with loader if it is not resident.
+
+        Every acquire holds the model until a matching release(key).
+        """
+        with self._lock:
+            pooled = self._hold(key)
+            if pooled is None:
+                loading_lock = self._loading.setdefault(key, threading.Lock())
+        if pooled is not None:
+            logger.info(f"♻️ Reusing resident model {key[0]} (dtype={key[1] or 'default'}, device={key[3] or 'default'})")
+            return pooled.model
+
+        # Concurrent acquirers of the same key wait for a single load
+        with loading_lock:
+            with self._lock:
+                pooled = self._hold(key)
+                if pooled is None:
+                    self._make_room(self._known_sizes.get(key, 0))
+            if pooled is None:
+                start = time.time()
+                try:
+                    model = loader()
+                except BaseException:
+                    with self._lock:
+                        self._loading.pop(key, None)
+                    raise
+                size = model_size_bytes(model)
+                logger.info(f"Loaded model {key[0]} into the model pool in {time.time() - start:.1f}s "
+                            f"({size / 1024**3:.2f} GB)")
+                # Stored before the loading lock is dropped, so later acquirers find the model
+                with self._lock:
+                    pooled = PooledModel(key=key, model=model, size_bytes=size, holders=1)
+                    self._models[key] = pooled
+                    self._known_sizes[key] = size
+                    self._loading.pop(key, None)
+                    self._make_room(0)
+        return pooled.model
+
+    def _hold(self, key: ModelKey) -> Optional[PooledModel]:
+        pooled = self._models.get(key)
+        if pooled is not None:
+            pooled.holders += 1
+            pooled.last_used = time.time()
+        return pooled
+
+    def release(self, key: ModelKey) -> None:
+        """Drop one hold on the model; without holders it stays resident only if keep_idle is set."""
+        with self._lock:
+            pooled = self._models.get(key)
+            if pooled is None or pooled.holders == 0:
+                return
+            pooled.holders -= 1
+            pooled.last_used = time.time()
+            if pooled.holders == 0:
+                if self.keep_idle:
+                    self._make_room(0)
+                else:
+                    self._evict(key)
+
+    def trim(self, needed_names: Collection[str] = ()) -> None:
+        """Evict the idle models whose name is not in needed_names."""
+        with self._lock:
+            for key, pooled in list(self._models.items()):
+                if pooled.holders == 0 and key[0] not in needed_names:
+                    self._evict(key)
+
+    def clear(self) -> None:
+        """Evict all idle models."""
+        self.trim(())
+
+    @contextmanager
+    def keep_resident(self, max_bytes: Optional[int] = None) -> Iterator["ModelPool"]:
+        """Keep idle models resident (within max_bytes) for the duration of the block, then evict them."""
+        with self._lock:
+            previous = self.keep_idle, self.max_bytes
+            self.keep_idle, self.max_bytes = True, max_bytes
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.keep_idle, self.max_bytes = previous
+                self.clear()
+
+    def resident_bytes(self) -> int:
+        """Return the total size of the resident models."""
+        with self._lock:
+            return sum(pooled.size_bytes for pooled in self._models.values())
+
+    def _make_room(self, incoming_bytes: int) -> None:
+        """Evict idle models, least recently used first, until incoming_bytes fit into the budget."""
+        if self.max_bytes is None:
+            return
+        idle = sorted((pooled for pooled in self._models.values() if pooled.holders == 0), key=lambda p: p.last_used)
+        for pooled in idle:
+            if self.resident_bytes() + incoming_bytes <= self.max_bytes:
+                break
+            self._evict(pooled.key)
+
+    def _evict(self, key: ModelKey) -> None:
+        pooled = self._models.pop(key, None)
+        if pooled is not None:
+            logger.info(f"Releasing model {key[0]} from the model pool ({pooled.size_bytes / 1024**3:.2f} GB)")
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+model_pool = ModelPool()
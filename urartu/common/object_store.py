@@ -0,0 +1,77 @@
+"""
+In-process object store for passing values into OmegaConf configs by reference.
+
+OmegaConf copies lists and dicts into config nodes and rejects arbitrary objects, so large
+action outputs (tensors, datasets, long lists of prompts) handed to the next pipeline step
+are stored here instead and the config receives an interpolation `${urartu_object:<handle>}`.
+Accessing the config value resolves the interpolation to the stored object itself, without
+copying it; the object is shared and must not be modified by the receiving action.
+"""
+
+import itertools
+import re
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from omegaconf import OmegaConf
+
+
+class ObjectStore:
+    """
+    Thread-safe registry of objects referenced from configs by handle.
+
+    Attributes:
+        RESOLVER (str): Name of the OmegaConf resolver returning stored objects.
+    """
+
+    RESOLVER = "urartu_object"
+
+    def __init__(self):
+        self._objects: Dict[str, Any] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def put(self, obj: Any) -> str:
+        """Store an object and return its handle."""
+        with self._lock:
+            handle = f"obj_{next(self._counter)}"
+            self._objects[handle] = obj
+        return handle
+
+    def reference(self, handle: str) -> str:
+        """Return the config interpolation that resolves to the object stored under handle."""
+        return f"${{{self.RESOLVER}:{handle}}}"
+
+    def handle_of(self, value: Any) -> Optional[str]:
+        """Return the handle referenced by a config value if it is an object store reference, else None."""
+        if not isinstance(value, str):
+            return None
+        match = re.fullmatch(rf"\$\{{{self.RESOLVER}:(\w+)\}}", value)
+        return match.group(1) if match else None
+
+    def get(self, handle: str) -> Any:
+        """
+        Return the object stored under handle.
+
+        Raises:
+            KeyError: If the handle is unknown or has been released
+        """
+        with self._lock:
+            if handle not in self._objects:
+                raise KeyError(f"Object '{handle}' is not in the object store (it was released or belongs to another process)")
+            return self._objects[handle]
+
+    def release(self, handles: Iterable[str]) -> None:
+        """Drop the store's references to the objects under the given handles."""
+        with self._lock:
+            for handle in handles:
+                self._objects.pop(handle, None)
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+
+object_store = ObjectStore()
+
+if not OmegaConf.has_resolver(ObjectStore.RESOLVER):
+    OmegaConf.register_new_resolver(ObjectStore.RESOLVER, object_store.get)
@@ -6,29 +6,65 @@ manage data flow between steps, and handle configuration overrides.
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Union, Callable
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Set, Tuple, Union, Callable
 from pathlib import Path
-import importlib
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+import copy
 import json
+import multiprocessing
+import queue
 import hashlib
-import pickle
 import time
-import yaml
-from datetime import datetime
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from abc import ABC, abstractmethod
 
-from aim import Run
 from omegaconf import DictConfig, OmegaConf
 
-from .action import Action, ActionDataset
+from .action import Action, action_cache_key, action_code_version, cache_debug_logger, filter_cache_config
+from .action_worker import (WORKER_POLL_INTERVAL, find_action_class, find_static_action_source, import_action_module,
+                            replay_records, ship_config, worker_main)
+from .cache import CacheBackend, describe_outputs, get_cache_backend
+from .cache_manager import CacheManager, flush_async_cache_writes
 from .device import Device
+from .model_pool import model_pool
+from .object_store import object_store
+from .pipeline_checkpoint import PipelineCheckpoint
+from urartu.utils.hash import canonical_json
+from urartu.utils.profiling import ActionProfile, current_profile, profile_action, profile_phase, write_chrome_trace
+from urartu.utils.tracking import flush_async_tracking
+
+if TYPE_CHECKING:
+    from aim import Run
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
+# Outputs with at most this many scalar items (e.g. a list of data files) are copied into
+# configs; anything larger or non-scalar is passed by reference through the object store
+INLINE_CONFIG_MAX_ITEMS = 32
+_CONFIG_SCALARS = (type(None), bool, int, float, str)
+
+# Reason of an action whose cache key needs the action imported (see find_static_action_source)
+CODE_VERSION_UNKNOWN = "code version unknown without importing the action"
+
+
+def _is_inline_config_value(value: Any) -> bool:
+    """Check if a value is small and plain enough to be copied into an OmegaConf config."""
+    if isinstance(value, _CONFIG_SCALARS):
+        return True
+    if isinstance(value, (list, tuple)):
+        return len(value) <= INLINE_CONFIG_MAX_ITEMS and all(isinstance(v, _CONFIG_SCALARS) for v in value)
+    if isinstance(value, Mapping):
+        return len(value) <= INLINE_CONFIG_MAX_ITEMS and all(
+            isinstance(k, str) and isinstance(v, _CONFIG_SCALARS) for k, v in value.items()
+        )
+    return False
+
+
 @dataclass
 class ActionOutput:
     """Container for action outputs."""
@@ -39,20 +75,14 @@ class ActionOutput:
 
 
 @dataclass
-class CacheEntry:
-    """Container for cached action outputs."""
-    action_output: ActionOutput
-    cache_key: str
-    timestamp: float
-    config_hash: str
-    action_version: Optional[str] = None
-    
-    def is_valid(self, max_age_seconds: Optional[int] = None) -> bool:
-        """Check if cache entry is still valid."""
-        if max_age_seconds is not None:
-            age = time.time() - self.timestamp
-            return age < max_age_seconds
-        return True
+class PlannedAction:
+    """What a pipeline run would do for one action, as determined by Pipeline.plan()."""
+    name: str
+    action_name: str
+    status: str  # "cached", "run", "skipped" or "unknown"
+    reason: str
+    cache_key: Optional[str] = None
+    estimated_seconds: Optional[float] = None
 
 
 class DataResolver(ABC):
@@ -75,6 +105,12 @@ class ActionOutputResolver(DataResolver):
     def can_resolve(self, value: str) -> bool:
         return isinstance(value, str) and value.startswith("{{actions.") and value.endswith("}}")
     
+    def referenced_action(self, value: str) -> Optional[str]:
+        """Return the name of the action referenced by value, if any."""
+        if not self.can_resolve(value):
+            return None
+        return value[10:-2].split(".")[0]
+    
     def resolve(self, value: str, context: Dict[str, Any]) -> Any:
         # Parse reference like {{actions.construct_samples.data_files}}
         parts = value[10:-2].split(".")  # Remove {{actions. and }}
@@ -88,10 +124,10 @@ class ActionOutputResolver(DataResolver):
         if action_name not in action_outputs:
             raise ValueError(f"Action '{action_name}' has not been executed yet or produced no outputs")
         
-        # Navigate nested dictionaries
+        # Navigate nested dictionaries (cached outputs may be lazy mappings)
         output = action_outputs[action_name].outputs
         for key in output_key.split("."):
-            if isinstance(output, dict) and key in output:
+            if isinstance(output, Mapping) and key in output:
                 output = output[key]
             else:
                 raise ValueError(f"Cannot find '{output_key}' in action '{action_name}' outputs")
@@ -132,7 +168,8 @@ class Pipeline(Action):
     Pipeline class for orchestrating multiple actions in sequence.
     
     Features:
-    - Sequential execution of actions
+    - Sequential execution of actions, or concurrent execution of independent
+      branches of the dependency graph (see `max_parallel_actions`)
     - Data flow between actions via output tracking
     - Configuration override support
     - Conditional action execution
@@ -140,12 +177,14 @@ class Pipeline(Action):
     - Comprehensive error handling and logging
     """
     
-    def __init__(self, cfg: DictConfig, aim_run: Run) -> None:
+    def __init__(self, cfg: DictConfig, aim_run: "Run") -> None:
         super().__init__(cfg, aim_run)
         self.actions: List[PipelineAction] = []
         self.action_outputs: Dict[str, ActionOutput] = {}
         self.resolvers: List[DataResolver] = [ActionOutputResolver()]
         self._initialized = False
+        # Handles of the outputs passed to actions through the object store, released after the run
+        self._object_handles: List[str] = []
         
         # Set up pipeline config accessor
         # Use the action_config which was properly set by the parent Action class
@@ -155,6 +194,25 @@ class Pipeline(Action):
         self.cache_enabled = self.pipeline_config.get('cache_enabled', True)
         self.force_rerun = self.pipeline_config.get('force_rerun', False)
         self.cache_max_age = self.pipeline_config.get('cache_max_age_hours', None)
+        
+        # Number of independent actions that may run at the same time (1 = sequential)
+        self.max_parallel_actions = max(1, int(self.pipeline_config.get('max_parallel_actions', 1) or 1))
+        
+        # Per-action phase timings and peak memory, tracked in Aim and written to pipeline_trace.json
+        self.profile_actions = self.pipeline_config.get('profile_actions', True)
+        self._profiles: List[ActionProfile] = []
+        
+        # Keep models loaded through the model pool resident between actions that use them
+        self.share_models = self.pipeline_config.get('share_models', True)
+        model_pool_max_gb = self.pipeline_config.get('model_pool_max_gb', None)
+        self.model_pool_max_bytes = int(model_pool_max_gb * 1024**3) if model_pool_max_gb is not None else None
+        
+        # Run actions in fresh worker processes, optionally spread over the given GPUs
+        self.isolate_actions = self.pipeline_config.get('isolate_actions', False)
+        self.worker_gpus = list(self.pipeline_config.get('worker_gpus', None) or [])
+        self._free_worker_gpus: queue.Queue = queue.Queue()
+        for gpu in self.worker_gpus:
+            self._free_worker_gpus.put(gpu)
             
         # Use a shared cache directory by extracting the base .runs folder from run_dir
         # run_dir is typically something like: /path/to/.runs/pipeline_name/timestamp/
@@ -182,6 +240,9 @@ class Pipeline(Action):
             runs_dir = Path('.') / '.runs'
         
         self.cache_dir = runs_dir / 'pipeline_cache'
+        self.cache_backend = get_cache_backend(self.pipeline_config.get('cache_backend', 'pickle'), self.cache_dir,
+                                               self.cache_codec)
+        self.cache_manager = CacheManager(self.cache_dir, max_bytes=self.cache_manager.max_bytes)
 
         if self.cache_max_age is not None:
             self.cache_max_age = self.cache_max_age * 3600  # Convert to seconds
@@ -215,16 +276,14 @@ class Pipeline(Action):
             'cache_enabled',       # Pipeline-level caching control
             'force_rerun',         # Pipeline-level cache bypass
             'cache_max_age_hours', # Pipeline-level cache expiry
+            'max_parallel_actions', # Pipeline-level scheduling
+            'profile_actions',     # Pipeline-level instrumentation
+            'share_models',        # Pipeline-level model pool
+            'model_pool_max_gb',   # Pipeline-level model pool budget
+            'isolate_actions',     # Pipeline-level execution mode
+            'worker_gpus',         # Pipeline-level GPU assignment of worker processes
         }
         
-        logger.info(f"🔧 Pipeline config propagation debug:")
-        logger.info(f"   pipeline_config type: {type(self.pipeline_config)}")
-        logger.info(f"   pipeline_config keys: {list(self.pipeline_config.keys()) if hasattr(self.pipeline_config, 'keys') else 'N/A'}")
-        if 'device' in self.pipeline_config:
-            logger.info(f"   pipeline_config.device: {self.pipeline_config['device']}")
-        else:
-            logger.info(f"   device NOT found in pipeline_config")
-        
         # Propagate all pipeline configs except pipeline-specific ones
         for key, value in self.pipeline_config.items():
             if key not in pipeline_specific_keys:
@@ -234,16 +293,15 @@ class Pipeline(Action):
         if hasattr(self.cfg, 'debug') and 'debug' not in common_configs:
             common_configs['debug'] = self.cfg.debug
             
-        logger.info(f"   common_configs keys: {list(common_configs.keys())}")
-        if 'device' in common_configs:
-            logger.info(f"   common_configs.device: {common_configs['device']}")
-        else:
-            logger.info(f"   device NOT found in common_configs")
-            
-        logger.debug(f"Pipeline configs to propagate to actions: {list(common_configs.keys())}")
+        if cache_debug_logger.isEnabledFor(logging.DEBUG):
+            cache_debug_logger.debug("🔧 Pipeline config propagation: pipeline_config keys %s, device %s",
+                                     list(self.pipeline_config.keys()), self.pipeline_config.get('device', 'not set'))
+            cache_debug_logger.debug("   common_configs keys: %s, device %s",
+                                     list(common_configs.keys()), common_configs.get('device', 'not set'))
         return common_configs
     
-    def _inject_action_outputs(self, action_config_dict: Dict[str, Any], current_action_name: str) -> Dict[str, Any]:
+    def _inject_action_outputs(self, action_config_dict: Dict[str, Any], current_action_name: str,
+                               action_outputs: Optional[Dict[str, ActionOutput]] = None) -> Dict[str, Any]:
         """
         Inject outputs from previous actions into the current action's configuration.
         
@@ -255,32 +313,36 @@ class Pipeline(Action):
         Args:
             action_config_dict: The action's configuration dictionary
             current_action_name: Name of the current action being configured
+            action_outputs: Outputs of the completed actions (defaults to self.action_outputs)
             
         Returns:
             Updated configuration dictionary with injected outputs
         """
+        if action_outputs is None:
+            action_outputs = self.action_outputs
+        
         # Make a deep copy to avoid modifying the original
         import copy
         config = copy.deepcopy(action_config_dict)
         
         # Check if this action declares dependencies
         if 'depends_on' not in config:
-            logger.info(f"📝 Action '{current_action_name}' has no dependencies declared")
+            cache_debug_logger.debug("📝 Action '%s' has no dependencies declared", current_action_name)
             return config
             
-        logger.info(f"🔄 Processing dependencies for action '{current_action_name}'")
+        cache_debug_logger.debug("🔄 Processing dependencies for action '%s'", current_action_name)
         dependencies = config['depends_on']
         
         # Process each dependency
         for source_action_name, mappings in dependencies.items():
-            logger.info(f"   📤 Processing dependency on '{source_action_name}'")
+            cache_debug_logger.debug("   📤 Processing dependency on '%s'", source_action_name)
             
             # Check if the source action has completed and produced outputs
-            if source_action_name not in self.action_outputs:
+            if source_action_name not in action_outputs:
                 logger.error(f"   ❌ Source action '{source_action_name}' has not completed yet!")
                 continue
                 
-            source_outputs = self.action_outputs[source_action_name].outputs
+            source_outputs = action_outputs[source_action_name].outputs
             if not source_outputs:
                 logger.warning(f"   ⚠️ Source action '{source_action_name}' produced no outputs")
                 continue
@@ -288,11 +350,12 @@ class Pipeline(Action):
             # Process each output->config mapping
             for output_key, config_path in mappings.items():
                 if output_key in source_outputs:
-                    output_value = source_outputs[output_key]
+                    config_value = self._config_value(source_outputs[output_key])
                     
-                    # Inject the value at the specified config path
-                    self._set_nested_config_value(config, config_path, output_value)
-                    logger.info(f"   ✅ Injected {source_action_name}.{output_key} → {config_path} = {output_value}")
+                    # Inject the value (or its object store reference) at the specified config path
+                    self._set_nested_config_value(config, config_path, config_value)
+                    cache_debug_logger.debug("   ✅ Injected %s.%s → %s = %.200s",
+                                             source_action_name, output_key, config_path, config_value)
                 else:
                     logger.warning(f"   ❌ Output '{output_key}' not found in {source_action_name} outputs")
                     logger.warning(f"       Available outputs: {list(source_outputs.keys())}")
@@ -376,13 +439,15 @@ class Pipeline(Action):
         self.resolvers.append(resolver)
         return self
         
-    def _resolve_value(self, value: Any, context: Optional[Dict[str, Any]] = None) -> Any:
+    def _resolve_value(self, value: Any, context: Optional[Dict[str, Any]] = None, by_reference: bool = False) -> Any:
         """
         Resolve configuration values that may contain special references.
         
         Args:
             value: The value to resolve
             context: Context dictionary for resolvers
+            by_reference: Pass large resolved values by reference (see _config_value), for
+                values that end up in an action config
             
         Returns:
             Resolved value
@@ -393,15 +458,35 @@ class Pipeline(Action):
         if isinstance(value, str):
             for resolver in self.resolvers:
                 if resolver.can_resolve(value):
-                    return resolver.resolve(value, context)
+                    resolved = resolver.resolve(value, context)
+                    return self._config_value(resolved) if by_reference else resolved
         
         # Recursively resolve nested structures
         elif isinstance(value, dict):
-            return {k: self._resolve_value(v, context) for k, v in value.items()}
+            return {k: self._resolve_value(v, context, by_reference) for k, v in value.items()}
         elif isinstance(value, list):
-            return [self._resolve_value(v, context) for v in value]
+            return [self._resolve_value(v, context, by_reference) for v in value]
         
         return value
+    
+    def _config_value(self, value: Any) -> Any:
+        """
+        Prepare an action output for insertion into an action config.
+        
+        Scalars and small flat containers are inserted as they are. Anything else is put in the
+        object store and replaced by a `${urartu_object:<handle>}` interpolation, so reading the
+        config value returns the output itself instead of a deep copy converted to OmegaConf nodes.
+        """
+        if _is_inline_config_value(value):
+            return value
+        handle = object_store.put(value)
+        self._object_handles.append(handle)
+        return object_store.reference(handle)
+    
+    def _release_objects(self) -> None:
+        """Release the outputs this pipeline passed to actions by reference."""
+        handles, self._object_handles = self._object_handles, []
+        object_store.release(handles)
         
     def _merge_configs(self, base_cfg: DictConfig, overrides: Dict) -> DictConfig:
         """Merge override configuration into base configuration."""
@@ -431,7 +516,7 @@ class Pipeline(Action):
         # Get outputs from the standard get_outputs method
         if hasattr(action_instance, 'get_outputs') and callable(action_instance.get_outputs):
             outputs = action_instance.get_outputs()
-            if not isinstance(outputs, dict):
+            if not isinstance(outputs, Mapping):
                 logger.warning(f"get_outputs() from {pipeline_action.action_name} did not return a dict")
                 outputs = {}
         else:
@@ -439,44 +524,19 @@ class Pipeline(Action):
                 
         return outputs
         
-    def _run_action(self, pipeline_action: PipelineAction) -> ActionOutput:
-        """Execute a single pipeline action."""
-        logger.info(f"\n{'='*80}")
-        logger.info(f"Running pipeline action: {pipeline_action.name} (action: {pipeline_action.action_name})")
-        logger.info(f"{'='*80}")
-        
-        # Check if action should run
-        context = {"action_outputs": self.action_outputs}
-        if not pipeline_action.should_run(context):
-            logger.info(f"Skipping action {pipeline_action.name} due to condition")
-            return ActionOutput(
-                name=pipeline_action.name,
-                action_name=pipeline_action.action_name,
-                metadata={"skipped": True}
-            )
-        
-        # Resolve config overrides to handle any references
-        context = {"action_outputs": self.action_outputs}
-        resolved_config_overrides = self._resolve_value(pipeline_action.config_overrides, context)
-        
-        # Import the action module
-        try:
-            # First try fully qualified package import (actions.<name>)
-            action_module = importlib.import_module(f"actions.{pipeline_action.action_name}")
-        except ImportError:
-            # Fall back to importing from local actions directory added to sys.path
-            import sys
-            actions_dir = Path.cwd() / "actions"
-            if str(actions_dir) not in sys.path:
-                sys.path.append(str(actions_dir))
-            try:
-                action_module = importlib.import_module(pipeline_action.action_name)
-            except ImportError as e:
-                raise ImportError(
-                    f"Failed to import action '{pipeline_action.action_name}' from package or directory {actions_dir}: {e}"
-                )
+    def _build_action_config(self, pipeline_action: PipelineAction, resolved_config_overrides: Dict[str, Any],
+                             action_outputs: Optional[Dict[str, ActionOutput]] = None) -> DictConfig:
+        """
+        Prepare the full configuration an action is constructed with.
         
-        # Prepare configuration for this action
+        Args:
+            pipeline_action: The pipeline action
+            resolved_config_overrides: Its config overrides with references resolved
+            action_outputs: Outputs of the completed actions (defaults to self.action_outputs)
+            
+        Returns:
+            The configuration of the action, with the merged action config under `action_config`
+        """
         action_cfg = OmegaConf.create(self.cfg)  # Deep copy base config
         action_cfg.action_name = pipeline_action.action_name  # Set the action name
         
@@ -486,24 +546,11 @@ class Pipeline(Action):
             action_config_dict = resolved_config_overrides
             
             # Inject outputs from previous actions into config
-            action_config_dict = self._inject_action_outputs(action_config_dict, pipeline_action.name)
+            action_config_dict = self._inject_action_outputs(action_config_dict, pipeline_action.name, action_outputs)
             
             # Propagate common pipeline-level configs to individual actions
             pipeline_common_configs = self._get_common_pipeline_configs()
             
-            logger.info(f"🔧 Config merge debug for '{pipeline_action.name}':")
-            logger.info(f"   action_config_dict type: {type(action_config_dict)}")
-            if 'device' in action_config_dict:
-                logger.info(f"   action_config_dict.device: {action_config_dict['device']}")
-            else:
-                logger.info(f"   device NOT found in action_config_dict")
-            
-            # Log any dependencies that were processed
-            if 'depends_on' in resolved_config_overrides:
-                logger.info(f"   🔗 Dependencies declared: {list(resolved_config_overrides['depends_on'].keys())}")
-            else:
-                logger.info(f"   📝 No dependencies declared for this action")
-            
             # Merge pipeline common configs with action-specific configs
             # Action-specific configs take precedence over pipeline configs
             # OmegaConf.merge: later arguments override earlier ones
@@ -512,78 +559,321 @@ class Pipeline(Action):
                 OmegaConf.create(action_config_dict)        # Override (action-specific, with injections)
             )
             
-            logger.info(f"   merged_config type: {type(merged_config)}")
-            if 'device' in merged_config:
-                logger.info(f"   merged_config.device: {merged_config['device']}")
-            else:
-                logger.info(f"   device NOT found in merged_config")
-            
-            # Log config override details
-            overridden_keys = set(pipeline_common_configs.keys()) & set(action_config_dict.keys())
-            if overridden_keys:
-                logger.info(f"Action '{pipeline_action.name}' overrides pipeline configs: {list(overridden_keys)}")
+            if cache_debug_logger.isEnabledFor(logging.DEBUG):
+                depends_on = resolved_config_overrides.get('depends_on')
+                cache_debug_logger.debug(
+                    "🔧 Config merge for '%s': device %s (action) / %s (merged), dependencies %s, "
+                    "overrides pipeline configs %s",
+                    pipeline_action.name, action_config_dict.get('device'), merged_config.get('device'),
+                    list(depends_on.keys()) if depends_on else [],
+                    sorted(set(pipeline_common_configs.keys()) & set(action_config_dict.keys())),
+                )
             
             action_cfg.action_config = merged_config  # Set the action configuration
-            logger.info(f"Applied config overrides with pipeline common configs for {pipeline_action.name}")
         else:
             # Even if no overrides, apply common pipeline configs
             pipeline_common_configs = self._get_common_pipeline_configs()
             action_cfg.action_config = OmegaConf.create(pipeline_common_configs)  # Set the action configuration
-            
-            logger.info(f"🔧 No action overrides for '{pipeline_action.name}' - using pipeline configs:")
-            if 'device' in pipeline_common_configs:
-                logger.info(f"   pipeline device will be used: {pipeline_common_configs['device']}")
-            else:
-                logger.info(f"   No device in pipeline_common_configs - will default to 'auto'")
-            
-            logger.info(f"Applied pipeline common configs for {pipeline_action.name}")
+            cache_debug_logger.debug("🔧 No action overrides for '%s', using the pipeline configs (device %s)",
+                                     pipeline_action.name, pipeline_common_configs.get('device', 'auto'))
         
-        # Create a sub-context in Aim for this action
-        # Track action metadata
-        self.aim_run[f"pipeline_action_{pipeline_action.name}_config"] = {
-            "action": pipeline_action.action_name,
-            "overrides": pipeline_action.config_overrides
-        }
+        return action_cfg
+    
+    def _canonical_action_config(self, action_cfg: DictConfig) -> str:
+        """Serialize the cache-relevant part of an action's config as Action._get_canonical_config does."""
+        return canonical_json(filter_cache_config(OmegaConf.to_container(action_cfg.action_config, resolve=True)))
+    
+    def _action_config_hash(self, canonical_config: str) -> str:
+        """Hash identifying the config an action ran with, recorded in the pipeline manifest."""
+        return hashlib.sha256(canonical_config.encode()).hexdigest()[:16]
+    
+    def _action_cache_status(self, pipeline_action: PipelineAction, action_cfg: DictConfig,
+                             canonical_config: Optional[str] = None) -> Tuple[Optional[str], Optional[CacheBackend], str]:
+        """
+        Look up the cache entry of an action from its prepared configuration, without importing it.
         
-        # Try to find action class - look for classes that inherit from Action
-        action_class = None
-        action_instance = None  # Initialize to None
-        action_candidates = []
-        
-        for attr_name in dir(action_module):
-            attr = getattr(action_module, attr_name)
-            if (isinstance(attr, type) and 
-                issubclass(attr, Action) and 
-                attr != Action and
-                attr != ActionDataset):  # Exclude abstract base classes
-                action_candidates.append(attr)
-        
-        # Prefer the most specific class (not imported from urartu.common)
-        for candidate in action_candidates:
-            if candidate.__module__ == action_module.__name__:
-                action_class = candidate
-                break
+        The key is derived the same way Action._generate_cache_key derives it, with the code
+        version given by action_code_version() for the module located by
+        find_static_action_source(). When the code version cannot be known without importing
+        the action, there is no key and the reason is CODE_VERSION_UNKNOWN. The canonical config
+        is computed from action_cfg unless it is passed in.
+        
+        Returns:
+            Tuple of the cache key (None if caching is disabled or the key is unknown), the
+            backend holding a valid entry under that key (None if the action has to run or may
+            have to) and the reason for the status
+        """
+        action_config = action_cfg.action_config
+        if not action_config.get('cache_enabled', True):
+            return None, None, "caching disabled"
+        
+        source_file = find_static_action_source(pipeline_action.action_name)
+        if source_file is None:
+            return None, None, CODE_VERSION_UNKNOWN
+        code_version = None
+        if action_config.get('cache_code_fingerprint', False):
+            code_version = action_code_version(source_file)
+        if canonical_config is None:
+            canonical_config = self._canonical_action_config(action_cfg)
+        cache_key = action_cache_key(pipeline_action.action_name, canonical_config, code_version)
+        
+        if action_config.get('force_rerun', False):
+            return cache_key, None, "force_rerun"
+        backend = get_cache_backend(action_config.get('cache_backend', 'pickle'), self.cache_dir)
+        entry = self.cache_manager.lookup(cache_key, backend)
+        if entry is None:
+            return cache_key, None, "not cached"
+        max_age_hours = action_config.get('cache_max_age_hours', None)
+        if max_age_hours is not None and time.time() - entry.created > max_age_hours * 3600:
+            return cache_key, None, "cache entry expired"
+        return cache_key, backend, "cached"
+    
+    def _load_cached_action_output(self, pipeline_action: PipelineAction, cache_key: str,
+                                   backend: CacheBackend) -> Optional[ActionOutput]:
+        """Load the cached outputs of an action, or None if the entry cannot be read."""
+        try:
+            payload = backend.load(cache_key)
+        except Exception as e:
+            logger.warning(f"Failed to load cache entry {cache_key} for action '{pipeline_action.name}': {e}")
+            self.cache_manager.forget(cache_key)
+            return None
+        return ActionOutput(
+            name=pipeline_action.name,
+            action_name=pipeline_action.action_name,
+            outputs=payload['outputs'],
+            metadata={
+                "completed": True,
+                "cache_hit": True,
+                "cache_key": cache_key,
+                "cache_backend": backend.name,
+                "cache_dir": str(backend.cache_dir),
+            },
+        )
+    
+    def _serve_from_cache(self, pipeline_action: PipelineAction, action_cfg: DictConfig,
+                          canonical_config: Optional[str] = None) -> Optional[ActionOutput]:
+        """Return the cached outputs of an action if it is a cache hit, without importing the action."""
+        try:
+            cache_key, backend, _ = self._action_cache_status(pipeline_action, action_cfg, canonical_config)
+        except Exception as e:
+            logger.warning(f"Could not determine the cache key of '{pipeline_action.name}' up front: {e}")
+            return None
+        if backend is None:
+            return None
+        action_output = self._load_cached_action_output(pipeline_action, cache_key, backend)
+        if action_output is None:
+            return None
+        
+        self.cache_manager.record_access(cache_key, pipeline_action.action_name, backend)
+        logger.info(f"✅ Action '{pipeline_action.name}' served from cache entry {cache_key}")
+        self.tracker[f"pipeline_action_{pipeline_action.name}_cache_hit"] = True
+        if action_output.outputs:
+            self.tracker[f"pipeline_action_{pipeline_action.name}_outputs"] = describe_outputs(action_output.outputs)
+        return action_output
+    
+    def _run_action(self, pipeline_action: PipelineAction) -> ActionOutput:
+        """Execute a single pipeline action, profiling its phases and peak memory unless disabled."""
+        if not self.profile_actions:
+            return self._execute_action(pipeline_action)
+        profile = None
+        try:
+            with profile_action(pipeline_action.name, pipeline_action.action_name) as profile:
+                return self._execute_action(pipeline_action)
+        finally:
+            if profile is not None:
+                self._record_profile(profile)
+    
+    def _record_profile(self, profile: ActionProfile) -> None:
+        """Log the profile of an action, track it in Aim and keep it for the run's trace file."""
+        self._profiles.append(profile)
+        summary = profile.summary()
+        self.tracker[f"pipeline_action_{profile.name}_profile"] = summary
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in summary["phases"].items())
+        memory = ", ".join(
+            f"peak {kind} {summary[key]:.0f} MB"
+            for kind, key in (("RSS", "peak_rss_mb"), ("CUDA", "peak_cuda_mb")) if summary[key] is not None
+        )
+        logger.info(f"⏱️ Action '{profile.name}' took {summary['wall_seconds']:.2f}s ({phases}){'; ' + memory if memory else ''}")
+    
+    def _import_action_module(self, pipeline_action: PipelineAction):
+        """Import the module of an action from the `actions` package or directory."""
+        return import_action_module(pipeline_action.action_name)
+    
+    def _find_action_class(self, action_module) -> Optional[type]:
+        """Find the Action subclass defined by an action module, or None for main-style modules."""
+        return find_action_class(action_module)
+    
+    def _run_action_in_worker(self, pipeline_action: PipelineAction, action_cfg: DictConfig) -> ActionOutput:
+        """
+        Run an action in a fresh worker process (see urartu.common.action_worker).
+        
+        Outputs the worker saved to the cache are loaded from there. If that entry cannot be read
+        (e.g. it was evicted in the meantime), it is forgotten and the action runs again in a
+        worker with caching disabled, which sends its outputs back through the pipe.
+        
+        Raises:
+            RuntimeError: If the action fails in the worker, or the worker dies without a result
+                (e.g. killed for running out of memory)
+        """
+        result = self._run_worker(pipeline_action, action_cfg)
+        metadata = {"completed": True, "worker_pid": result["worker_pid"]}
+        cache = result["cache"]
+        if not cache:
+            outputs = result["outputs"]
+        else:
+            backend = get_cache_backend(cache["cache_backend"], Path(cache["cache_dir"]))
+            try:
+                outputs = backend.load(cache["cache_key"])['outputs']
+                metadata.update(cache)
+            except Exception as e:
+                logger.warning(f"Failed to load cache entry {cache['cache_key']} written by the worker of action "
+                               f"'{pipeline_action.name}': {e}; running it again without caching")
+                self.cache_manager.forget(cache["cache_key"])
+                uncached_cfg = copy.deepcopy(action_cfg)
+                OmegaConf.update(uncached_cfg, "action_config.cache_enabled", False, force_add=True)
+                result = self._run_worker(pipeline_action, uncached_cfg)
+                outputs = result["outputs"]
+                metadata["worker_pid"] = result["worker_pid"]
+        return ActionOutput(name=pipeline_action.name, action_name=pipeline_action.action_name,
+                            outputs=outputs, metadata=metadata)
+    
+    def _run_worker(self, pipeline_action: PipelineAction, action_cfg: DictConfig) -> Dict[str, Any]:
+        """
+        Run an action in a worker process, replaying what it tracked and adding its profile.
+        
+        Returns:
+            The result sent by the worker, with the pid of the worker under "worker_pid"
+        
+        Raises:
+            RuntimeError: If the action fails in the worker, or the worker dies without a result
+                (e.g. killed for running out of memory)
+        """
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        gpu = self._free_worker_gpus.get() if self.worker_gpus else None
+        env = {"CUDA_VISIBLE_DEVICES": str(gpu)} if gpu is not None else {}
+        process = context.Process(
+            target=worker_main,
+            args=(pipeline_action.action_name, pipeline_action.name, ship_config(action_cfg),
+                  getattr(self.aim_run, 'hash', None), env, sender),
+            name=f"urartu-{pipeline_action.name}",
+        )
+        result = None
+        try:
+            logger.info(f"🚀 Running action '{pipeline_action.name}' in a worker process"
+                        f"{f' on GPU {gpu}' if gpu is not None else ''}")
+            process.start()
+            sender.close()
+            # Receive before joining: the worker exits only once its result is read
+            while result is None:
+                if receiver.poll(WORKER_POLL_INTERVAL):
+                    try:
+                        result = receiver.recv()
+                    except EOFError:
+                        break
+                elif not process.is_alive() and not receiver.poll(0):
+                    break
+            process.join()
+        finally:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            receiver.close()
+            if gpu is not None:
+                self._free_worker_gpus.put(gpu)
+        
+        if result is None:
+            raise RuntimeError(f"Worker process of action '{pipeline_action.name}' exited with code "
+                               f"{process.exitcode} without a result (e.g. killed for running out of memory)")
+        replay_records(self.tracker, result.get("aim_records", []))
+        profile = current_profile()
+        if profile is not None and "phases" in result:
+            profile.add_worker_profile(result["phases"], result["events"], result.get("peak_rss_bytes"),
+                                       result.get("peak_cuda_bytes"))
+        if result["error"]:
+            raise RuntimeError(f"Action '{pipeline_action.name}' failed in its worker process: {result['error']}")
+        result["worker_pid"] = process.pid
+        return result
+    
+    def _execute_action(self, pipeline_action: PipelineAction) -> ActionOutput:
+        """Execute a single pipeline action."""
+        logger.info(f"\n{'='*80}")
+        logger.info(f"Running pipeline action: {pipeline_action.name} (action: {pipeline_action.action_name})")
+        logger.info(f"{'='*80}")
+        
+        # Check if action should run
+        # Work on a snapshot: other actions may complete concurrently and update self.action_outputs
+        context = {"action_outputs": dict(self.action_outputs)}
+        if not pipeline_action.should_run(context):
+            logger.info(f"Skipping action {pipeline_action.name} due to condition")
+            return ActionOutput(
+                name=pipeline_action.name,
+                action_name=pipeline_action.action_name,
+                metadata={"skipped": True}
+            )
         
-        # Fallback to any suitable candidate
-        if not action_class and action_candidates:
-            action_class = action_candidates[0]
+        with profile_phase("resolve_config"):
+            # Resolve config overrides to handle any references
+            resolved_config_overrides = self._resolve_value(pipeline_action.config_overrides, context, by_reference=True)
+            
+            # Prepare configuration for this action
+            action_cfg = self._build_action_config(pipeline_action, resolved_config_overrides, context["action_outputs"])
+            
+            # Create a sub-context in Aim for this action
+            # Track action metadata
+            self.tracker[f"pipeline_action_{pipeline_action.name}_config"] = {
+                "action": pipeline_action.action_name,
+                "overrides": pipeline_action.config_overrides
+            }
+            
+            # Serialized once for the cache lookup and the config hash recorded in the pipeline manifest
+            try:
+                canonical_config = self._canonical_action_config(action_cfg)
+            except Exception as e:
+                logger.warning(f"Could not serialize the config of '{pipeline_action.name}': {e}")
+                canonical_config = None
+            config_hash = self._action_config_hash(canonical_config) if canonical_config is not None else None
+        
+        # Pure cache hits are served without importing or constructing the action
+        with profile_phase("cache_lookup"):
+            cached_output = self._serve_from_cache(pipeline_action, action_cfg, canonical_config)
+        if cached_output is not None:
+            cached_output.metadata["config_hash"] = config_hash
+            return cached_output
+        
+        if self.isolate_actions:
+            with profile_phase("worker"):
+                action_output = self._run_action_in_worker(pipeline_action, action_cfg)
+            action_output.metadata["config_hash"] = config_hash
+            if action_output.outputs:
+                self.tracker[f"pipeline_action_{pipeline_action.name}_outputs"] = describe_outputs(action_output.outputs)
+            return action_output
+        
+        with profile_phase("import"):
+            action_module = self._import_action_module(pipeline_action)
+            action_class = self._find_action_class(action_module)
+        action_instance = None  # Initialize to None
         
         if action_class:
             # Use action class with run() method
-            action_instance = action_class(action_cfg, self.aim_run)
+            with profile_phase("construct"):
+                action_instance = action_class(action_cfg, self.aim_run)
             
-            # Run the action with its own caching support
+            # Run the action with its own caching support (which profiles its own phases)
             if hasattr(action_instance, 'run_with_cache'):
                 action_instance.run_with_cache()
             elif hasattr(action_instance, 'run'):
-                action_instance.run()
+                with profile_phase("run"):
+                    action_instance.run()
             elif hasattr(action_instance, 'main'):
-                action_instance.main()
+                with profile_phase("run"):
+                    action_instance.main()
             else:
                 raise AttributeError(f"Action {pipeline_action.action_name} has no run() or main() method")
             
             # Extract outputs
-            outputs = self._extract_outputs(pipeline_action, action_instance)
+            with profile_phase("extract_outputs"):
+                outputs = self._extract_outputs(pipeline_action, action_instance)
             
             # Ensure we have outputs even from cached actions
             if not outputs and hasattr(action_instance, '_cached_outputs') and action_instance._cached_outputs:
@@ -591,7 +881,8 @@ class Pipeline(Action):
                 logger.info(f"📤 Using cached outputs for pipeline action {pipeline_action.name}: {list(outputs.keys()) if outputs else 'None'}")
         elif hasattr(action_module, 'main'):
             # Fallback to module-level main function
-            action_module.main(cfg=action_cfg, aim_run=self.aim_run)
+            with profile_phase("run"):
+                action_module.main(cfg=action_cfg, aim_run=self.aim_run)
             outputs = {}  # Main-style actions don't return outputs directly
         else:
             raise AttributeError(f"Action {pipeline_action.action_name} has no Action class or main() function")
@@ -600,17 +891,25 @@ class Pipeline(Action):
             name=pipeline_action.name,
             action_name=pipeline_action.action_name,
             outputs=outputs,
-            metadata={"completed": True}
+            metadata={"completed": True, "config_hash": config_hash}
         )
+        # Outputs cached by the action are referenced by cache key in the pipeline manifest
+        if outputs and getattr(action_instance, 'cache_enabled', False) and getattr(action_instance, '_cache_key', None):
+            action_output.metadata.update(
+                cache_key=action_instance._cache_key,
+                cache_backend=action_instance.cache_backend.name,
+                cache_dir=str(action_instance.cache_backend.cache_dir),
+            )
         
-        # Track outputs in Aim
+        # Track outputs in Aim (without loading lazily cached values)
         if outputs:
-            self.aim_run[f"pipeline_action_{pipeline_action.name}_outputs"] = outputs
+            self.tracker[f"pipeline_action_{pipeline_action.name}_outputs"] = describe_outputs(outputs)
         
         # Clean up memory after action completes
         if action_instance is not None and hasattr(action_instance, 'cleanup_memory'):
             try:
-                action_instance.cleanup_memory()
+                with profile_phase("cleanup"):
+                    action_instance.cleanup_memory()
             except Exception as e:
                 logger.warning(f"Memory cleanup failed for action '{pipeline_action.name}': {e}")
             
@@ -648,198 +947,424 @@ class Pipeline(Action):
             
         self._initialized = True
         
-    def run(self):
-        """Execute the pipeline by running all actions in sequence."""
+    def _config_strings(self, value: Any) -> Set[str]:
+        """Collect all string values in a (nested) config."""
+        if isinstance(value, str):
+            return {value}
+        strings = set()
+        if isinstance(value, Mapping):
+            for item in value.values():
+                strings |= self._config_strings(item)
+        elif isinstance(value, (list, tuple)) or OmegaConf.is_list(value):
+            for item in value:
+                strings |= self._config_strings(item)
+        return strings
+    
+    def _trim_model_pool(self, remaining: List[PipelineAction]) -> None:
+        """Release the idle pooled models that no remaining action mentions in its config."""
+        needed = self._config_strings({k: v for k, v in self.pipeline_config.items() if k != 'actions'})
+        for action in remaining:
+            needed |= self._config_strings(action.config_overrides)
+        model_pool.trim(needed)
+    
+    def _find_action_references(self, value: Any) -> Set[str]:
+        """Collect the names of actions referenced via {{actions.x.y}} anywhere in value."""
+        references = set()
+        if isinstance(value, str):
+            for resolver in self.resolvers:
+                if isinstance(resolver, ActionOutputResolver):
+                    referenced = resolver.referenced_action(value)
+                    if referenced:
+                        references.add(referenced)
+        elif isinstance(value, Mapping):
+            for item in value.values():
+                references |= self._find_action_references(item)
+        elif isinstance(value, (list, tuple)) or OmegaConf.is_list(value):
+            for item in value:
+                references |= self._find_action_references(item)
+        return references
+    
+    def _build_dependency_graph(self) -> Dict[str, Set[str]]:
+        """
+        Build the dependency graph of the pipeline from `depends_on` blocks and
+        {{actions.x.y}} references in the action configurations.
+        
+        Returns:
+            Mapping from action name to the names of the actions it depends on
+            
+        Raises:
+            ValueError: If the dependencies contain a cycle
+        """
+        action_names = [action.name for action in self.actions]
+        dependencies = {}
+        for action in self.actions:
+            depends_on = action.config_overrides.get('depends_on') or {}
+            required = set(depends_on.keys()) | self._find_action_references(action.config_overrides)
+            unknown = required - set(action_names)
+            if unknown:
+                logger.warning(f"Action '{action.name}' depends on unknown actions: {sorted(unknown)}")
+            required -= unknown
+            required.discard(action.name)
+            dependencies[action.name] = required
+        
+        # Kahn's algorithm to reject cycles before anything runs
+        remaining = {name: set(required) for name, required in dependencies.items()}
+        while remaining:
+            ready = [name for name, required in remaining.items() if not required]
+            if not ready:
+                raise ValueError(f"Pipeline has cyclic action dependencies between: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for required in remaining.values():
+                required.difference_update(ready)
+        
+        return dependencies
+    
+    def plan(self) -> List[PlannedAction]:
+        """
+        Work out which actions a run would serve from the cache and which it would compute.
+        
+        Actions are visited in dependency order and their configs and cache keys are resolved
+        as during a run, using the cached outputs of upstream actions. An action depending on
+        an action that has to run is planned to run as well, since its config is only known
+        once its inputs are. Actions are neither imported nor executed; the estimated cost of
+        an action that has to run comes from the runtimes recorded in the cache index. An action
+        whose cache key depends on code that is only known once it is imported (e.g. it overrides
+        get_action_version) is planned as "unknown", and so are the actions depending on it.
+        
+        Returns:
+            The planned status of every action, in declaration order
+        """
         if not self._initialized:
             self.initialize()
-            
-        logger.info(f"\nStarting pipeline execution with {len(self.actions)} actions")
         
-        successful_actions = 0
-        for i, action in enumerate(self.actions):
-            try:
-                # Run the action
-                action_output = self._run_action(action)
-                
-                # Store output for use by later actions
-                self.action_outputs[action.name] = action_output
-                
-                if not action_output.metadata.get("skipped", False):
-                    successful_actions += 1
-                    
-                logger.info(f"Completed action {i+1}/{len(self.actions)}: {action.name}")
-                
-            except Exception as e:
-                logger.error(f"Failed at action '{action.name}': {str(e)}")
-                self.aim_run[f"pipeline_action_{action.name}_error"] = str(e)
-                self.aim_run["pipeline_failed_at_action"] = action.name
-                raise
-                
+        dependencies = self._build_dependency_graph()
+        planned: Dict[str, PlannedAction] = {}
+        outputs: Dict[str, ActionOutput] = {}
+        pending = list(self.actions)
+        while pending:
+            action = next(action for action in pending if dependencies[action.name] <= planned.keys())
+            pending.remove(action)
+            planned[action.name] = self._plan_action(action, dependencies[action.name], planned, outputs)
+        return [planned[action.name] for action in self.actions]
+    
+    def _plan_action(self, action: PipelineAction, dependencies: Set[str], planned: Dict[str, PlannedAction],
+                     outputs: Dict[str, ActionOutput]) -> PlannedAction:
+        recomputed = sorted(name for name in dependencies if planned[name].status == "run")
+        if recomputed:
+            return PlannedAction(
+                name=action.name,
+                action_name=action.action_name,
+                status="run",
+                reason=f"depends on {', '.join(recomputed)}",
+                estimated_seconds=self.cache_manager.estimate_runtime(action.action_name),
+            )
+        undetermined = sorted(name for name in dependencies if planned[name].status == "unknown")
+        if undetermined:
+            return PlannedAction(name=action.name, action_name=action.action_name, status="unknown",
+                                 reason=f"depends on {', '.join(undetermined)}")
+        
+        context = {"action_outputs": outputs}
+        try:
+            if not action.should_run(context):
+                outputs[action.name] = ActionOutput(name=action.name, action_name=action.action_name,
+                                                    metadata={"skipped": True})
+                return PlannedAction(name=action.name, action_name=action.action_name, status="skipped",
+                                     reason="condition not met")
+            resolved_config_overrides = self._resolve_value(action.config_overrides, context, by_reference=True)
+            action_cfg = self._build_action_config(action, resolved_config_overrides, outputs)
+            cache_key, backend, reason = self._action_cache_status(action, action_cfg)
+        except Exception as e:
+            return PlannedAction(
+                name=action.name,
+                action_name=action.action_name,
+                status="run",
+                reason=f"cannot resolve config: {e}",
+                estimated_seconds=self.cache_manager.estimate_runtime(action.action_name),
+            )
+        
+        if reason == CODE_VERSION_UNKNOWN:
+            return PlannedAction(name=action.name, action_name=action.action_name, status="unknown", reason=reason)
+        
+        # Downstream configs may reference the outputs, so cached actions are loaded
+        cached_output = self._load_cached_action_output(action, cache_key, backend) if backend else None
+        if cached_output is not None:
+            outputs[action.name] = cached_output
+            return PlannedAction(name=action.name, action_name=action.action_name, status="cached",
+                                 reason=reason, cache_key=cache_key)
+        return PlannedAction(
+            name=action.name,
+            action_name=action.action_name,
+            status="run",
+            reason=reason if backend is None else "cache entry unreadable",
+            cache_key=cache_key,
+            estimated_seconds=self.cache_manager.estimate_runtime(action.action_name, cache_key),
+        )
+    
+    def _report_plan(self, planned: List[PlannedAction]) -> None:
+        """Log the plan, write it to plan.json in the run directory and track it in Aim."""
         logger.info("\n" + "="*80)
-        logger.info(f"Pipeline completed successfully! Executed {successful_actions} actions.")
+        logger.info(f"Pipeline plan ({len(planned)} actions):")
+        for entry in planned:
+            estimate = f"~{entry.estimated_seconds:.0f}s" if entry.estimated_seconds is not None else ""
+            logger.info(f"  {entry.status.upper():<8} {entry.name:<30} {estimate:>8}  {entry.reason}")
+        
+        to_run = [entry for entry in planned if entry.status == "run"]
+        known = [entry.estimated_seconds for entry in to_run if entry.estimated_seconds is not None]
+        summary = f"{sum(entry.status == 'cached' for entry in planned)} cached, {len(to_run)} to run"
+        unknown = sum(entry.status == "unknown" for entry in planned)
+        if unknown:
+            summary += f", {unknown} unknown until their actions are imported"
+        if known:
+            summary += f", estimated compute ~{sum(known):.0f}s"
+            if len(known) < len(to_run):
+                summary += f" (no runtime history for {len(to_run) - len(known)} actions)"
+        logger.info(summary)
         logger.info("="*80)
         
-        # Save final summary
-        self.aim_run["pipeline_summary"] = {
-            "total_actions": len(self.actions),
-            "successful_actions": successful_actions,
-            "action_names": [action.name for action in self.actions],
-            "outputs": {name: output.outputs for name, output in self.action_outputs.items()}
-        }
-        
-    def _generate_cache_key(self, pipeline_action: PipelineAction, resolved_config: Dict[str, Any]) -> str:
+        plan = [asdict(entry) for entry in planned]
+        plan_path = Path(self.cfg.get('run_dir', '.')) / "plan.json"
+        plan_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(plan_path, "w") as f:
+            json.dump(plan, f, indent=2)
+        logger.info(f"Plan written to {plan_path}")
+        self.tracker["pipeline_plan"] = plan
+    
+    def _submit_action(self, executor: Optional[ThreadPoolExecutor], action: PipelineAction) -> Future:
+        """Run an action in the executor, or inline when running sequentially."""
+        if executor is not None:
+            return executor.submit(self._run_action, action)
+        future = Future()
+        try:
+            future.set_result(self._run_action(action))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def _resume_from_checkpoint(self, checkpoint: PipelineCheckpoint, dependencies: Dict[str, Set[str]]) -> List[str]:
         """
-        Generate a unique cache key for an action based on its configuration.
+        Restore the actions completed by the unfinished run selected by the `resume` option.
         
-        For cross-pipeline cache sharing, we focus on the action's core configuration
-        and ignore pipeline context when the action doesn't depend on previous outputs.
+        `resume=true` picks the latest unfinished run of the pipeline, `resume=<run_dir>`
+        a specific one. Actions are restored in dependency order as long as everything they
+        depend on was restored, their config (resolved against the restored outputs) hashes
+        to the one recorded, and their outputs can still be loaded. The restored actions are
+        recorded in the new run's manifest, so it can be resumed in turn.
         
-        Args:
-            pipeline_action: The pipeline action
-            resolved_config: The resolved configuration (with references resolved)
-            
         Returns:
-            A unique cache key string
+            Names of the restored actions
         """
-        # Import the cache ignore keys from action module for consistency
-        from .action import CACHE_IGNORE_KEYS
+        resume = self.cfg.get('resume', False)
+        run_dir = Path(self.cfg.get('run_dir', '.'))
+        manifest_path = PipelineCheckpoint.find_resumable(run_dir) if resume is True else Path(str(resume))
+        if manifest_path is None:
+            logger.warning(f"resume: no unfinished run of this pipeline found next to {run_dir}, running from the start")
+            return []
+        try:
+            previous = PipelineCheckpoint.load(manifest_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"resume: cannot read the pipeline manifest at {manifest_path}, running from the start: {e}")
+            return []
+        logger.info(f"Resuming pipeline run {previous.run_dir} (failed at: {previous.manifest.get('failed_action')})")
+        checkpoint.manifest["resumed_from"] = str(previous.run_dir)
+        self.tracker["pipeline_resumed_from"] = str(previous.run_dir)
+        
+        restored: List[str] = []
+        visited: Set[str] = set()
+        pending = list(self.actions)
+        while pending:
+            action = next(action for action in pending if dependencies[action.name] <= visited)
+            pending.remove(action)
+            visited.add(action.name)
+            entry = previous.actions.get(action.name)
+            if entry is None or not dependencies[action.name] <= set(restored):
+                continue
+            
+            if entry["status"] == "skipped":
+                action_output = ActionOutput(name=action.name, action_name=action.action_name,
+                                             metadata={"skipped": True, "restored": True})
+            else:
+                context = {"action_outputs": self.action_outputs}
+                try:
+                    resolved_config_overrides = self._resolve_value(action.config_overrides, context, by_reference=True)
+                    action_cfg = self._build_action_config(action, resolved_config_overrides, self.action_outputs)
+                    config_hash = self._action_config_hash(self._canonical_action_config(action_cfg))
+                except Exception as e:
+                    logger.info(f"resume: cannot resolve the config of '{action.name}', running it again: {e}")
+                    continue
+                if entry.get("config_hash") is None or entry["config_hash"] != config_hash:
+                    logger.info(f"resume: the config of '{action.name}' changed since the previous run, running it again")
+                    continue
+                outputs = previous.load_outputs(action.name)
+                if outputs is None:
+                    logger.info(f"resume: the outputs of '{action.name}' are no longer available, running it again")
+                    continue
+                action_output = ActionOutput(
+                    name=action.name,
+                    action_name=action.action_name,
+                    outputs=outputs,
+                    metadata={
+                        "completed": True,
+                        "restored": True,
+                        "config_hash": config_hash,
+                        "cache_key": entry.get("cache_key"),
+                        "checkpoint_outputs": entry["outputs"],
+                    },
+                )
+            
+            self.action_outputs[action.name] = action_output
+            checkpoint.record_action(action.name, action.action_name, action_output.outputs, action_output.metadata)
+            restored.append(action.name)
+            logger.info(f"⏩ Restored action '{action.name}' from the previous run")
+        
+        remaining = [action.name for action in self.actions if action.name not in self.action_outputs]
+        logger.info(f"Resumed {len(restored)} completed actions; running: {remaining}")
+        return restored
+        
+    def _write_trace(self, run_dir: Path) -> None:
+        """Write the profiles of the actions run so far to pipeline_trace.json (Chrome trace format)."""
+        if not self._profiles:
+            return
+        trace_path = run_dir / "pipeline_trace.json"
+        try:
+            write_chrome_trace(self._profiles, trace_path)
+            logger.info(f"Action trace written to {trace_path} (open in chrome://tracing or ui.perfetto.dev)")
+        except Exception as e:
+            logger.warning(f"Failed to write the action trace to {trace_path}: {e}")
         
-        # Filter config to enable cross-pipeline cache sharing
-        # Remove pipeline-level keys that don't affect action outputs
-        filtered_config = {k: v for k, v in resolved_config.items() if k not in CACHE_IGNORE_KEYS}
+    def run(self):
+        """
+        Execute the pipeline.
+        
+        Actions are scheduled from the dependency graph built from `depends_on` and
+        {{actions.x.y}} references: an action starts as soon as all actions it depends
+        on have completed, in declaration order among ready actions. With the default
+        `max_parallel_actions: 1` this is sequential execution in declaration order.
+        Larger values run independent branches concurrently in a thread pool; note that
+        concurrent actions share the process (e.g. the global Device setting), so they
+        should agree on the device they run on.
+        
+        With `plan=true` (or `urartu ... --plan`) the pipeline only reports which actions
+        would be cache hits and which would be recomputed (see plan()), without running any.
+        
+        Progress is recorded in a checkpoint manifest in the run directory (see
+        PipelineCheckpoint). With `resume=true` (or `urartu ... --resume`) the actions
+        completed by the latest unfinished run are restored instead of run again, and the
+        pipeline continues from the action that failed.
+        
+        Each action's wall time is split into phases (config resolution, cache lookup,
+        import, construction, run, output extraction, cache save, cleanup) and tracked with
+        its peak RSS and CUDA memory in Aim and in `pipeline_trace.json` (Chrome trace
+        format) in the run directory; set `profile_actions: false` to turn this off.
+        """
+        if not self._initialized:
+            self.initialize()
         
-        # For cross-pipeline cache sharing: if this action has no previous outputs (first action),
-        # generate a cache key based only on the action config, not pipeline context
-        has_previous_outputs = bool(self.action_outputs)
-        has_depends_on = 'depends_on' in resolved_config and resolved_config['depends_on']
+        if self.cfg.get('plan', False):
+            try:
+                self._report_plan(self.plan())
+            finally:
+                self._release_objects()
+            return
+            
+        logger.info(f"\nStarting pipeline execution with {len(self.actions)} actions")
         
-        if not has_previous_outputs and not has_depends_on:
-            # First action with no dependencies - use simplified cache key for cross-pipeline sharing
-            key_factors = {
-                'action_name': pipeline_action.action_name,
-                'config': self._make_serializable(filtered_config),
-            }
-        else:
-            # Action depends on previous outputs - include pipeline context
-            key_factors = {
-                'action_name': pipeline_action.action_name,
-                'config_overrides': self._make_serializable(filtered_config),
-                'outputs_to_track': self._make_serializable(pipeline_action.outputs_to_track),
-                # Include previous action outputs that might affect this action
-                'previous_outputs': {
-                    name: self._make_serializable(output.outputs) 
-                    for name, output in self.action_outputs.items()
-                }
-            }
+        dependencies = self._build_dependency_graph()
+        parallel = self.max_parallel_actions > 1
+        if parallel:
+            logger.info(f"Running up to {self.max_parallel_actions} independent actions concurrently")
         
-        # Convert to JSON for consistent ordering
-        key_string = json.dumps(key_factors, sort_keys=True)
+        # Run directories are `.runs/<pipeline config>/<timestamp>`
+        run_dir = Path(self.cfg.get('run_dir', '.'))
+        checkpoint = PipelineCheckpoint(run_dir, run_dir.resolve().parent.name)
+        checkpoint.save()
         
-        # Generate hash
-        cache_key = hashlib.sha256(key_string.encode()).hexdigest()[:16]
+        successful_actions = 0
+        completed_actions = 0
+        running: Dict[Future, PipelineAction] = {}
+        failure: Optional[Exception] = None
         
-        return f"{pipeline_action.action_name}_{cache_key}"
-    
-    def _get_cache_path(self, cache_key: str) -> Path:
-        """Get the file path for a cache entry."""
-        return self.cache_dir / f"{cache_key}.pkl"
-    
-    def _save_to_cache(self, cache_key: str, action_output: ActionOutput, config_hash: str):
-        """Save action output to cache."""
-        if not self.cache_enabled:
-            return
-            
         try:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            
-            cache_entry = CacheEntry(
-                action_output=action_output,
-                cache_key=cache_key,
-                timestamp=time.time(),
-                config_hash=config_hash,
-                action_version=None  # Could add git hash or file modification time
-            )
+            if self.cfg.get('resume', False):
+                for name in self._resume_from_checkpoint(checkpoint, dependencies):
+                    completed_actions += 1
+                    if not self.action_outputs[name].metadata.get("skipped", False):
+                        successful_actions += 1
+            pending = [action for action in self.actions if action.name not in self.action_outputs]
             
-            cache_path = self._get_cache_path(cache_key)
-            with open(cache_path, 'wb') as f:
-                pickle.dump(cache_entry, f)
+            executor_context = ThreadPoolExecutor(max_workers=self.max_parallel_actions) if parallel else nullcontext()
+            pool_context = model_pool.keep_resident(self.model_pool_max_bytes) if self.share_models else nullcontext()
+            with pool_context, executor_context as executor:
+                while pending or running:
+                    # Dispatch every ready action while there is capacity (stop dispatching after a failure)
+                    if failure is None:
+                        for action in list(pending):
+                            if len(running) >= self.max_parallel_actions:
+                                break
+                            if dependencies[action.name] <= self.action_outputs.keys():
+                                pending.remove(action)
+                                running[self._submit_action(executor, action)] = action
                 
-            # Also save a human-readable metadata file
-            metadata_path = cache_path.with_suffix('.yaml')
-            
-            # Get the full resolved config for this action
-            pipeline_action = None
-            for action in self.actions:
-                if action.action_name == action_output.action_name:
-                    pipeline_action = action
-                    break
-            
-            # Build full config including pipeline context
-            full_config = {}
-            if pipeline_action:
-                # Include the resolved config overrides
-                resolved_config_overrides = self._resolve_value(pipeline_action.config_overrides)
-                if hasattr(resolved_config_overrides, 'items'):
-                    resolved_config_overrides = OmegaConf.to_container(resolved_config_overrides, resolve=True) if OmegaConf.is_config(resolved_config_overrides) else dict(resolved_config_overrides)
-                full_config = resolved_config_overrides
-            
-            metadata = {
-                'cache_key': cache_key,
-                'action_name': action_output.action_name,
-                'timestamp': datetime.fromtimestamp(cache_entry.timestamp).isoformat(),
-                'config_hash': config_hash,
-                'outputs_keys': list(action_output.outputs.keys()),
-                'full_config': full_config  # Add full config content
-            }
-            with open(metadata_path, 'w') as f:
-                yaml.dump(metadata, f, default_flow_style=False, indent=2, sort_keys=False)
+                    if not running:
+                        break
                 
-            logger.info(f"Cached output for action '{action_output.name}' with key {cache_key}")
-            
-        except Exception as e:
-            logger.warning(f"Failed to save cache for {cache_key}: {e}")
-    
-    def _load_from_cache(self, cache_key: str) -> Optional[CacheEntry]:
-        """Load action output from cache if available and valid."""
-        if not self.cache_enabled:
-            logger.info(f"Cache is disabled, skipping cache lookup for {cache_key}")
-            return None
-            
-        if self.force_rerun:
-            logger.info(f"Force rerun is enabled, skipping cache lookup for {cache_key}")
-            return None
-            
-        cache_path = self._get_cache_path(cache_key)
-        logger.info(f"🔍 Checking cache file: {cache_path}")
-        logger.info(f"📂 Cache file exists: {cache_path.exists()}")
-        
-        if not cache_path.exists():
-            logger.info(f"❌ Cache file not found: {cache_path}")
-            return None
-            
-        try:
-            logger.info(f"📖 Attempting to load cache from: {cache_path}")
-            with open(cache_path, 'rb') as f:
-                cache_entry = pickle.load(f)
-            logger.info(f"✅ Successfully loaded cache entry for {cache_key}")
-                
-            # Check if cache is still valid
-            if self.cache_max_age is not None:
-                logger.info(f"⏰ Checking cache age (max_age: {self.cache_max_age}s)")
-            
-            if cache_entry.is_valid(self.cache_max_age):
-                logger.info(f"✅ Found valid cache for key {cache_key}")
-                return cache_entry
-            else:
-                logger.info(f"❌ Cache for key {cache_key} is expired")
-                return None
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        action = running.pop(future)
+                        try:
+                            action_output = future.result()
+                        except Exception as e:
+                            logger.error(f"Failed at action '{action.name}': {str(e)}")
+                            self.tracker[f"pipeline_action_{action.name}_error"] = str(e)
+                            if failure is None:
+                                self.tracker["pipeline_failed_at_action"] = action.name
+                                checkpoint.record_failure(action.name, e)
+                                failure = e
+                            continue
+                    
+                        # Store output for use by later actions
+                        self.action_outputs[action.name] = action_output
+                        checkpoint.record_action(action.name, action.action_name, action_output.outputs,
+                                                 action_output.metadata)
+                        completed_actions += 1
+                        if self.share_models:
+                            self._trim_model_pool(pending + list(running.values()))
+                    
+                        if not action_output.metadata.get("skipped", False):
+                            successful_actions += 1
+                        
+                        logger.info(f"Completed action {completed_actions}/{len(self.actions)}: {action.name}")
+        finally:
+            # Persist outputs handed to the background cache writer and drop the outputs passed
+            # by reference, also when an action failed
+            flush_async_cache_writes()
+            flush_async_tracking()
+            self._release_objects()
+            self._write_trace(run_dir)
+
+        if failure is not None:
+            raise failure
+        checkpoint.mark_completed()
+        
+        # Keep outputs in declaration order regardless of completion order
+        self.action_outputs = {
+            action.name: self.action_outputs[action.name]
+            for action in self.actions if action.name in self.action_outputs
+        }
                 
-        except Exception as e:
-            logger.error(f"💥 Failed to load cache for {cache_key}: {e}")
-            import traceback
-            logger.error(f"💥 Cache loading error details:\n{traceback.format_exc()}")
-            return None
-    
+        logger.info("\n" + "="*80)
+        logger.info(f"Pipeline completed successfully! Executed {successful_actions} actions.")
+        logger.info("="*80)
+        
+        # Save final summary
+        self.tracker["pipeline_summary"] = {
+            "total_actions": len(self.actions),
+            "successful_actions": successful_actions,
+            "action_names": [action.name for action in self.actions],
+            "outputs": {name: describe_outputs(output.outputs) for name, output in self.action_outputs.items()},
+            "action_seconds": {profile.name: profile.wall_seconds for profile in self._profiles},
+        }
+        
     def clear_cache(self):
         """Clear all cached outputs."""
         if self.cache_dir.exists():
@@ -0,0 +1,196 @@
+"""
+Checkpoint manifests for resuming failed pipeline runs in urartu.
+
+While a pipeline runs, a manifest `pipeline_manifest.json` in its run directory records
+every completed action with the hash of the config it ran with, its cache key and where its
+outputs can be reloaded from: the shared action cache when the action cached them, or a
+pickle in the run directory's `pipeline_checkpoint/` folder otherwise (e.g. actions run with
+caching disabled). Main-style actions without outputs are recorded as completed, so a
+resumed run does not repeat them either. With `resume=true` a pipeline restores the
+completed actions of the latest unfinished run and continues from the action that failed.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from .cache import PickleCacheBackend, atomic_write, get_cache_backend
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineCheckpoint:
+    """
+    Manifest of the progress of one pipeline run.
+
+    Attributes:
+        MANIFEST_NAME (str): File name of the manifest in the run directory.
+        OUTPUTS_DIRNAME (str): Folder in the run directory holding outputs that are not cached.
+        run_dir (Path): Run directory the manifest is written to.
+        manifest (Dict[str, Any]): The manifest: run status, failed action and per-action entries.
+    """
+
+    MANIFEST_NAME = "pipeline_manifest.json"
+    OUTPUTS_DIRNAME = "pipeline_checkpoint"
+
+    def __init__(self, run_dir: Path, pipeline_name: str):
+        self.run_dir = Path(run_dir).resolve()
+        self.manifest: Dict[str, Any] = {
+            "pipeline": pipeline_name,
+            "status": "running",
+            "failed_action": None,
+            "error": None,
+            "resumed_from": None,
+            "updated": time.time(),
+            "actions": {},
+        }
+
+    @property
+    def path(self) -> Path:
+        return self.run_dir / self.MANIFEST_NAME
+
+    @property
+    def actions(self) -> Dict[str, Dict[str, Any]]:
+        return self.manifest["actions"]
+
+    @classmethod
+    def load(cls, path: Path) -> "PipelineCheckpoint":
+        """
+        Load the manifest of a previous run.
+
+        Args:
+            path: The manifest file, or the run directory containing it
+
+        Raises:
+            FileNotFoundError: If there is no manifest at the path
+        """
+        path = Path(path)
+        if path.is_dir():
+            path = path / cls.MANIFEST_NAME
+        with open(path) as f:
+            manifest = json.load(f)
+        checkpoint = cls(path.parent, manifest.get("pipeline", ""))
+        checkpoint.manifest.update(manifest)
+        return checkpoint
+
+    @classmethod
+    def find_resumable(cls, run_dir: Path) -> Optional[Path]:
+        """
+        Find the manifest of the latest unfinished run next to run_dir.
+
+        Runs of a pipeline are sibling directories (`.runs/<action_config>/<timestamp>`), so
+        the most recently updated sibling whose manifest is not marked completed is returned,
+        unless a later run already resumed it (and then completed or failed in its own right).
+        """
+        run_dir = Path(run_dir).resolve()
+        if not run_dir.parent.is_dir():
+            return None
+        candidates, resumed = [], set()
+        for manifest_path in run_dir.parent.glob(f"*/{cls.MANIFEST_NAME}"):
+            if manifest_path.parent == run_dir:
+                continue
+            try:
+                with open(manifest_path) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable pipeline manifest {manifest_path}: {e}")
+                continue
+            if manifest.get("resumed_from"):
+                resumed.add(Path(manifest["resumed_from"]))
+            if manifest.get("status") != "completed":
+                candidates.append((manifest.get("updated", 0), manifest_path))
+        candidates = [candidate for candidate in candidates if candidate[1].parent.resolve() not in resumed]
+        return max(candidates)[1] if candidates else None
+
+    def record_action(self, name: str, action_name: str, outputs: Mapping[str, Any], metadata: Dict[str, Any]) -> None:
+        """
+        Record a completed (or skipped) action and persist the manifest.
+
+        Outputs stored in the shared cache are recorded by cache key; other outputs are
+        pickled into the run directory. If they cannot be pickled the action is recorded
+        without outputs and a resumed run runs it again.
+        """
+        entry = {
+            "action_name": action_name,
+            "status": "skipped" if metadata.get("skipped", False) else "completed",
+            "config_hash": metadata.get("config_hash"),
+            "cache_key": metadata.get("cache_key"),
+            "completed_at": time.time(),
+            "outputs": None,
+        }
+        if metadata.get("checkpoint_outputs") is not None:
+            # Restored from a previous run: keep pointing at where the outputs were found
+            entry["outputs"] = metadata["checkpoint_outputs"]
+        elif not outputs:
+            entry["outputs"] = {"location": "none"}
+        elif metadata.get("cache_key") and metadata.get("cache_backend"):
+            entry["outputs"] = {
+                "location": "cache",
+                "cache_key": metadata["cache_key"],
+                "cache_backend": metadata["cache_backend"],
+                "cache_dir": str(Path(metadata["cache_dir"]).resolve()),
+            }
+        else:
+            backend = PickleCacheBackend(self.run_dir / self.OUTPUTS_DIRNAME)
+            try:
+                backend.save(name, {"outputs": dict(outputs), "timestamp": time.time()})
+                entry["outputs"] = {"location": "checkpoint", "path": str(backend.cache_dir), "key": name}
+            except Exception as e:
+                logger.warning(f"Could not checkpoint the outputs of action '{name}', "
+                               f"a resumed run will run it again: {e}")
+        self.actions[name] = entry
+        self.save()
+
+    def record_failure(self, name: str, error: BaseException) -> None:
+        """Record the action the run failed at and persist the manifest."""
+        self.manifest["status"] = "failed"
+        self.manifest["failed_action"] = name
+        self.manifest["error"] = f"{type(error).__name__}: {error}"
+        self.save()
+
+    def mark_completed(self) -> None:
+        """Mark the run as completed, so it is not picked up by resume."""
+        self.manifest["status"] = "completed"
+        self.save()
+
+    def save(self) -> None:
+        """Write the manifest atomically; failures are logged, not raised."""
+        self.manifest["updated"] = time.time()
+        try:
+            self.run_dir.mkdir(parents=True, exist_ok=True)
+            with atomic_write(self.path, "w") as f:
+                json.dump(self.manifest, f, indent=2)
+        except Exception as e:
+            logger.warning(f"Failed to write pipeline manifest {self.path}: {e}")
+
+    def load_outputs(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Reload the recorded outputs of an action.
+
+        Returns:
+            The outputs, or None if they were not recorded or can no longer be read
+            (e.g. the cache entry has been evicted)
+        """
+        location = (self.actions.get(name) or {}).get("outputs")
+        if not location:
+            return None
+        try:
+            if location["location"] == "none":
+                return {}
+            if location["location"] == "cache":
+                backend = get_cache_backend(location["cache_backend"], Path(location["cache_dir"]))
+                if not backend.exists(location["cache_key"]):
+                    return None
+                return backend.load(location["cache_key"])["outputs"]
+            if location["location"] == "checkpoint":
+                backend = PickleCacheBackend(Path(location["path"]))
+                if not backend.exists(location["key"]):
+                    return None
+                return backend.load(location["key"])["outputs"]
+        except Exception as e:
+            logger.warning(f"Could not reload the outputs of action '{name}': {e}")
+            return None
+        logger.warning(f"Unknown output location '{location.get('location')}' for action '{name}'")
+        return None
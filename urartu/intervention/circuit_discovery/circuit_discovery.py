@@ -325,6 +325,15 @@ class CircuitTransformer(Intervention):
         self.reference_weight_mask = {}
         self.overlap_weight_or_circuit = {}
 
+        # Progress of run_prune, for checkpointing (see checkpoint_state). checkpoint_hook is
+        # called after every training step; Action.register_intervention sets it to the
+        # action's maybe_checkpoint.
+        self.checkpoint_hook = None
+        self._prune_progress = None
+        self._resume_progress = None
+        self._optimizer = None
+        self._completed_prune_modes = []
+
         #apply weight mask
 
         # weight mask logits initialization
@@ -644,16 +653,46 @@ class CircuitTransformer(Intervention):
     def intervene(self):
         modes='we'
         result = {}
-        if 'w' in modes:
+        # Modes finished before an interruption are not run again
+        if 'w' in modes and 'w' not in self._completed_prune_modes:
             result = self.run_prune(mode='w')
 
         gc.collect()
         torch.cuda.empty_cache()
 
-        if 'e' in modes:
+        if 'e' in modes and 'e' not in self._completed_prune_modes:
             result = self.run_prune(mode='e')
         return result
 
+    def checkpoint_state(self):
+        """Mask logits, optimizer state and position of run_prune, to continue it after an interruption."""
+        if self._prune_progress is None and not self._completed_prune_modes:
+            return {}
+        return {
+            'mask_logits_weight': {n: p.detach().cpu() for n, p in self.mask_logits_dict_weight.items()},
+            'mask_logits_edge': {n: p.detach().cpu() for n, p in self.mask_logits_dict_edge.items()},
+            'optimizer': self._optimizer.state_dict() if self._optimizer is not None else None,
+            'progress': dict(self._prune_progress) if self._prune_progress is not None else None,
+            'completed_modes': list(self._completed_prune_modes),
+        }
+
+    def load_checkpoint_state(self, state):
+        with torch.no_grad():
+            for key, mask_logits_dict in (('mask_logits_weight', self.mask_logits_dict_weight),
+                                          ('mask_logits_edge', self.mask_logits_dict_edge)):
+                for n, logits in state.get(key, {}).items():
+                    if n in mask_logits_dict:
+                        mask_logits_dict[n].copy_(logits.to(mask_logits_dict[n].device))
+        self._completed_prune_modes = list(state.get('completed_modes', []))
+        if state.get('progress') is not None:
+            self._resume_progress = dict(state['progress'], optimizer=state['optimizer'])
+
+    def _checkpoint(self, mode, epoch, batch, list_result):
+        """Record the position of run_prune after a completed step and let the owner checkpoint it."""
+        self._prune_progress = {'mode': mode, 'epoch': epoch, 'batch': batch, 'list_result': list_result}
+        if self.checkpoint_hook is not None:
+            self.checkpoint_hook()
+
     def run_prune(self, mode):
         if mode == 'w':
             # weight pruning
@@ -666,17 +705,26 @@ class CircuitTransformer(Intervention):
         mask_logits = [mask for _, mask in mask_logits_dict.items()]
         optimizer = torch.optim.AdamW(mask_logits, lr=hparams.lr)
 
+        # Continue an interrupted run from its checkpoint (see load_checkpoint_state)
+        start_epoch, skip_batches, list_result = 0, 0, []
+        resume = self._resume_progress
+        if resume is not None and resume['mode'] == mode:
+            if resume['optimizer'] is not None:
+                optimizer.load_state_dict(resume['optimizer'])
+            start_epoch, skip_batches, list_result = resume['epoch'], resume['batch'], list(resume['list_result'])
+            self._resume_progress = None
+        self._optimizer = optimizer
+
         if mode == 'w':
             self.turn_off_edge_masks()
         elif mode == 'e':
             self.turn_on_weight_masks(deterministic=True)
 
         # time.sleep(0.01)
-        epoch_loop = tqdm(range(hparams.train_epochs), desc='Number of Epochs', leave=True, dynamic_ncols=True)
-
-        list_result = []
+        epoch_loop = tqdm(range(start_epoch, hparams.train_epochs), desc='Number of Epochs', leave=True,
+                          dynamic_ncols=True, initial=start_epoch, total=hparams.train_epochs)
 
-        for i, epoch in enumerate(epoch_loop):
+        for epoch in epoch_loop:
             lambda_sparse = schedule_epoch_lambda(
                 epoch,
                 lambda_0=hparams.lambda_sparse_init,
@@ -687,7 +735,10 @@ class CircuitTransformer(Intervention):
             )
             lambda_complete = schedule_epoch_lambda(epoch, hparams.lambda_complete_init)
 
-            for batch_inputs in self.dls.train:
+            for batch_index, batch_inputs in enumerate(self.dls.train):
+                # Batches of the interrupted epoch that were already trained on
+                if epoch == start_epoch and batch_index < skip_batches:
+                    continue
 
                 # weight pruning
                 if mode == 'w':
@@ -731,13 +782,17 @@ class CircuitTransformer(Intervention):
                     optimizer.zero_grad()
                     self.turn_off_weight_masks()
 
-            if i % self.cfg.evaluate_every == self.cfg.evaluate_every - 1:
+                self._checkpoint(mode, epoch, batch_index + 1, list_result)
+
+            if epoch % self.cfg.evaluate_every == self.cfg.evaluate_every - 1:
                 comp = self.evaluate(reverse=True)
                 results = self.evaluate()
                 results['comp'] = comp['acc']
                 list_result.append(results)
                 pprint(results)
 
+            self._checkpoint(mode, epoch + 1, 0, list_result)
+
         weight_mask = self.mask_logits_dict_weight
         edge_mask = self.mask_logits_dict_edge
 
@@ -749,6 +804,10 @@ class CircuitTransformer(Intervention):
         # if mode == 'e':
         #     torch.save(edge_mask, output_dir / f'edge_mask_{mode}.pt')
 
+        self._completed_prune_modes.append(mode)
+        self._prune_progress = None
+        self._optimizer = None
+
         del mask_logits
         del optimizer
         gc.collect()
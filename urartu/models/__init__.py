@@ -1,9 +1,30 @@
-from .model_causal_language import ModelForCausalLM
-from .model_openai import ModelOpenAI
-from .model_pipeline import ModelPipeline
-
-__all__ = [
-    "ModelForCausalLM",
-    "ModelOpenAI",
-    "ModelPipeline",
-]
+import importlib
+from typing import TYPE_CHECKING
+
+# Imported on first access (PEP 562), so using ModelOpenAI does not import torch and
+# transformers through the Hugging Face model classes
+_EXPORTS = {
+    "ModelForCausalLM": ".model_causal_language",
+    "ModelOpenAI": ".model_openai",
+    "ModelPipeline": ".model_pipeline",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .model_causal_language import ModelForCausalLM
+    from .model_openai import ModelOpenAI
+    from .model_pipeline import ModelPipeline
@@ -3,6 +3,7 @@ from transformers import AutoModelForCausalLM, AutoTokenizer
 
 from urartu.common.device import Device
 from urartu.common.model import Model
+from urartu.common.model_pool import model_key
 from urartu.utils.dtype import eval_dtype
 
 
@@ -39,28 +40,53 @@ class ModelForCausalLM(Model):
         Retrieves or instantiates the causal language model specified in the configuration.
         The model is set to evaluation mode with gradients disabled.
 
+        Unless the configuration sets `pooled: false`, the model is taken from the process-level
+        model pool, so consecutive pipeline actions using the same checkpoint, dtype, revision,
+        device and loading options share one loaded copy. Pooled models must not be modified in place.
+
         Returns:
             An instance of AutoModelForCausalLM ready for inference.
         """
         if self._model is None:
-            self._model = AutoModelForCausalLM.from_pretrained(
-                self.cfg.name,
-                cache_dir=self.cfg.get("cache_dir"),
-                device_map=Device.get_device(),
-                torch_dtype=(
-                    eval_dtype(self.cfg.get("dtype"))
-                    if self.cfg.get("dtype") is not None
-                    else None
-                ),
-                token=self.cfg.get("api_token"),
-                trust_remote_code=self.cfg.get("trust_remote_code"),
-                revision=self.cfg.get("revision"),
-            )
-            for param in self._model.parameters():
-                param.requires_grad = False
-            self._model.eval()
+            if self.cfg.get("pooled", True):
+                key = model_key(
+                    self.cfg.name,
+                    self.cfg.get("dtype"),
+                    self.cfg.get("revision"),
+                    Device.get_device(),
+                    "ModelForCausalLM._load_model",
+                    trust_remote_code=self.cfg.get("trust_remote_code"),
+                )
+                self._model = self._acquire_pooled(key, self._load_model)
+            else:
+                self._model = self._load_model()
         return self._model
 
+    def _load_model(self) -> AutoModelForCausalLM:
+        """
+        Loads the causal language model with `from_pretrained` in evaluation mode, gradients disabled.
+
+        Returns:
+            An instance of AutoModelForCausalLM.
+        """
+        model = AutoModelForCausalLM.from_pretrained(
+            self.cfg.name,
+            cache_dir=self.cfg.get("cache_dir"),
+            device_map=Device.get_device(),
+            torch_dtype=(
+                eval_dtype(self.cfg.get("dtype"))
+                if self.cfg.get("dtype") is not None
+                else None
+            ),
+            token=self.cfg.get("api_token"),
+            trust_remote_code=self.cfg.get("trust_remote_code"),
+            revision=self.cfg.get("revision"),
+        )
+        for param in model.parameters():
+            param.requires_grad = False
+        model.eval()
+        return model
+
     @property
     def tokenizer(self):
         """
@@ -5,6 +5,7 @@ from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
 
 from urartu.common.device import Device
 from urartu.common.model import Model
+from urartu.common.model_pool import model_key
 from urartu.utils.dtype import eval_dtype
 
 
@@ -43,17 +44,24 @@ class ModelPipeline(Model):
         and a tokenizer, configured as specified in the configuration object. The model is set
         to run on the appropriate device with specified data types and any necessary tokens.
 
+        Unless the configuration sets `pooled: false`, the causal language model is taken from
+        the process-level model pool and shared with other models of the same checkpoint.
+
         Returns:
             A Hugging Face pipeline object for text generation.
         """
         if self._model is None:
-            clm_model = AutoModelForCausalLM.from_pretrained(
-                self.cfg.name,
-                cache_dir=self.cfg.cache_dir,
-                device_map=Device.get_device(),
-                torch_dtype=eval_dtype(self.cfg.dtype),
-                token=self.cfg.api_token,
-            )
+            if self.cfg.get("pooled", True):
+                key = model_key(
+                    self.cfg.name,
+                    self.cfg.dtype,
+                    self.cfg.get("revision"),
+                    Device.get_device(),
+                    "ModelPipeline._load_clm_model",
+                )
+                clm_model = self._acquire_pooled(key, self._load_clm_model)
+            else:
+                clm_model = self._load_clm_model()
 
             self._model = pipeline(
                 "text-generation",
@@ -65,6 +73,22 @@ class ModelPipeline(Model):
             )
         return self._model
 
+    def _load_clm_model(self) -> AutoModelForCausalLM:
+        """
+        Loads the causal language model wrapped by the pipeline.
+
+        Returns:
+            An instance of AutoModelForCausalLM.
+        """
+        return AutoModelForCausalLM.from_pretrained(
+            self.cfg.name,
+            cache_dir=self.cfg.cache_dir,
+            device_map=Device.get_device(),
+            torch_dtype=eval_dtype(self.cfg.dtype),
+            token=self.cfg.api_token,
+            revision=self.cfg.get("revision"),
+        )
+
     @property
     def tokenizer(self):
         """
@@ -0,0 +1,111 @@
+import ast
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Parsed modules keyed by path, invalidated when the file's mtime or size changes
+_parsed_modules: Dict[Path, Tuple[Tuple[int, int], str, List[Tuple[int, str, List[str]]]]] = {}
+
+
+def _parse_module(path: Path) -> Tuple[str, List[Tuple[int, str, List[str]]]]:
+    """
+    Parse a module into a normalized dump of its AST and the imports it contains.
+
+    The AST dump ignores comments and formatting, so only changes to the code itself
+    change the fingerprint.
+    """
+    stat = path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _parsed_modules.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1], cached[2]
+
+    source = path.read_bytes()
+    try:
+        tree = ast.parse(source, filename=str(path))
+    except SyntaxError:
+        dump, imports = source.decode(errors="replace"), []
+    else:
+        dump = ast.dump(tree)
+        imports = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imports.extend((0, alias.name, []) for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                imports.append((node.level, node.module or "", [alias.name for alias in node.names]))
+    _parsed_modules[path] = (signature, dump, imports)
+    return dump, imports
+
+
+def _module_files(base: Path, dotted: str) -> Iterator[Path]:
+    parts = [part for part in dotted.split(".") if part]
+    target = base.joinpath(*parts) if parts else base
+    yield target.with_suffix(".py") if parts else base / "__init__.py"
+    yield target / "__init__.py"
+
+
+def _local_imports(path: Path, root: Path) -> Set[Path]:
+    """Resolve the imports of a module to module files inside root."""
+    _, imports = _parse_module(path)
+    candidates: List[Path] = []
+    for level, module, names in imports:
+        if level:
+            base = path.parent
+            for _ in range(level - 1):
+                base = base.parent
+            bases = [base]
+        else:
+            # Actions import their siblings both as top-level modules and through the `actions` package
+            if module.split(".")[0] == root.name:
+                module = module[len(root.name):].lstrip(".")
+            bases = [root]
+        for base in bases:
+            candidates.extend(_module_files(base, module))
+            # `from package import submodule`
+            candidates.extend(candidate for name in names for candidate in _module_files(base, f"{module}.{name}"))
+
+    resolved = set()
+    for candidate in candidates:
+        candidate = candidate.resolve()
+        if candidate.is_file() and (candidate == root or root in candidate.parents):
+            resolved.add(candidate)
+    return resolved
+
+
+def source_fingerprint(module_path: Path, root: Optional[Path] = None) -> str:
+    """
+    Fingerprint the code of a module and the local modules it imports, transitively.
+
+    Only modules inside root (by default the `actions` directory containing the module, or
+    else the module's own directory) are followed, so library code does not take part.
+
+    Args:
+        module_path (Path): Source file of the module.
+        root (Optional[Path]): Directory whose modules are followed through imports.
+
+    Returns:
+        str: A 12-character hex fingerprint that changes when the code of any of the modules changes.
+
+    Example:
+        >>> source_fingerprint(Path('actions/generate.py'))
+        '5d41402abc4b'
+    """
+    module_path = Path(module_path).resolve()
+    if root is None:
+        root = next((parent for parent in module_path.parents if parent.name == "actions"), module_path.parent)
+    root = Path(root).resolve()
+
+    seen: Set[Path] = set()
+    pending = [module_path]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        pending.extend(_local_imports(path, root) - seen)
+
+    digest = hashlib.sha256()
+    for path in sorted(seen):
+        name = path.relative_to(root) if root in path.parents else path.name
+        digest.update(f"{name}\0{_parse_module(path)[0]}\0".encode())
+    return digest.hexdigest()[:12]
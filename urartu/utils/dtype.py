@@ -1,6 +1,3 @@
-import torch  # NOQA
-
-
 def eval_dtype(string: str):
     """
     Evaluates a string representation of a PyTorch data type to return the corresponding
@@ -21,4 +18,6 @@ def eval_dtype(string: str):
         >>> eval_dtype('torch.float32')
         torch.float32
     """
+    import torch  # NOQA: the evaluated string refers to it
+
     return eval(string)
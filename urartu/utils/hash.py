@@ -1,6 +1,10 @@
-import torch  # NOQA
-from typing import Dict
+from typing import Any, Dict
+import dataclasses
+import enum
 import hashlib
+import json
+import sys
+from pathlib import PurePath
 
 
 def dict_to_8char_hash(d: Dict):
@@ -23,3 +27,64 @@ def dict_to_8char_hash(d: Dict):
     hash_hex = hash_obj.hexdigest()
     
     return hash_hex[:8]
+
+
+def _canonical_default(value: Any) -> Any:
+    """
+    Encode values json does not handle natively into a stable JSON-compatible form.
+
+    Tensors and arrays are encoded by dtype, shape and a digest of their bytes rather than their
+    full contents, so large ones stay cheap to encode.
+    """
+    if isinstance(value, PurePath):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=canonical_json)
+    if isinstance(value, bytes):
+        return {"__bytes__": hashlib.sha256(value).hexdigest()}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+
+    torch_module = sys.modules.get("torch")
+    if torch_module is not None and isinstance(value, torch_module.Tensor):
+        value = value.detach().cpu().contiguous()
+        return {
+            "__tensor__": str(value.dtype),
+            "shape": list(value.shape),
+            "sha256": hashlib.sha256(value.view(-1).view(torch_module.uint8).numpy().tobytes()).hexdigest(),
+        }
+    numpy_module = sys.modules.get("numpy")
+    if numpy_module is not None:
+        if isinstance(value, numpy_module.ndarray):
+            return {
+                "__ndarray__": str(value.dtype),
+                "shape": list(value.shape),
+                "sha256": hashlib.sha256(numpy_module.ascontiguousarray(value).tobytes()).hexdigest(),
+            }
+        if isinstance(value, numpy_module.generic):
+            return value.item()
+
+    raise TypeError(f"Object of type {type(value).__name__} cannot be encoded canonically")
+
+
+def canonical_json(obj: Any) -> str:
+    """
+    Serialize an object to a canonical JSON string, suitable for hashing.
+
+    Keys are sorted and the default separators are kept, so for plain JSON data the result is
+    identical to `json.dumps(obj, sort_keys=True)`. Paths, enums, sets, bytes, dataclasses,
+    tensors and numpy arrays are encoded by value instead of raising a TypeError.
+
+    Args:
+        obj: The object to serialize.
+
+    Returns:
+        str: The canonical JSON string.
+
+    Example:
+        >>> canonical_json({'b': Path('data'), 'a': 1})
+        '{"a": 1, "b": "data"}'
+    """
+    return json.dumps(obj, sort_keys=True, default=_canonical_default)
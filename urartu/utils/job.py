@@ -1,8 +1,12 @@
+import logging
 import sys
 from importlib import import_module
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 
-from aim import Run
+from .tracking import AsyncTracker, flush_async_tracking, open_tracker
+
+if TYPE_CHECKING:
+    from aim import Run
 
 
 class ResumableSlurmJob:
@@ -23,7 +27,7 @@ class ResumableSlurmJob:
         on_job_fail: Handles clean-up and closure of the Aim run in the event of job failure.
     """
 
-    def __init__(self, module: str, action_name: str, cfg: Dict, aim_run: Run):
+    def __init__(self, module: str, action_name: str, cfg: Dict, aim_run: "Run"):
         """
         Initializes the ResumableSlurmJob with necessary parameters for job execution and
         experiment tracking.
@@ -38,18 +42,17 @@ class ResumableSlurmJob:
         self.action_name = action_name
         self.cfg = cfg
         self.aim_run = None
-        if self.cfg.aim.use_aim:
-            self.aim_run_hash = aim_run.hash
+        self.aim_run_hash = getattr(aim_run, "hash", None)
 
     def get_aim_run(self):
         """
-        Retrieves or initializes the Aim run object based on configuration settings.
+        Retrieves or initializes the tracker run (Aim or local) based on configuration settings.
 
         Returns:
-            Run: The Aim run object associated with the current job.
+            Tracker: The run associated with the current job, or None if it has none.
         """
-        if self.cfg.aim.use_aim and self.aim_run is None:
-            self.aim_run = Run(self.aim_run_hash, repo=self.cfg.aim.repo)
+        if self.aim_run is None:
+            self.aim_run = open_tracker(self.cfg, self.aim_run_hash)
         return self.aim_run
 
     def __call__(self):
@@ -65,26 +68,32 @@ class ResumableSlurmJob:
         self.cfg.slurm.init_method = "tcp"
         self.cfg.slurm.run_id = f"{master_ip}:{master_port}"
 
-        if self.cfg.aim.use_aim:
-            self.get_aim_run()
-            self.aim_run.set(
+        if self.get_aim_run() is not None:
+            AsyncTracker(self.aim_run).set(
                 "job",
                 {"job_id": int(environment.job_id), "hostname": environment.hostname},
             )
 
-        sys.path.append(f"{self.module}/actions")
-        action = import_module(self.action_name)
-        action.main(cfg=self.cfg, aim_run=self.aim_run)
+        run_action(self.module, self.action_name, self.cfg, self.aim_run)
 
     def checkpoint(self):
         """
         Prepares a checkpoint of the current job state that can be resumed later.
 
+        Called by submitit when the job is preempted or reaches its time limit: the running
+        actions save their state_dict to the run directory, and the resubmitted job restores
+        it in run_with_cache instead of starting over.
+
         Returns:
             DelayedSubmission: A submission object that can be used to resume the job.
         """
         import submitit
 
+        from urartu.common.action import checkpoint_active_actions
+
+        saved = checkpoint_active_actions()
+        logging.info(f"Job preempted: checkpointed {saved} action(s), resubmitting")
+
         runner = ResumableSlurmJob(
             module=self.module,
             action_name=self.action_name,
@@ -97,8 +106,9 @@ class ResumableSlurmJob:
         """
         Handles the necessary cleanup and closure of the Aim run in case the job fails.
         """
-        self.get_aim_run()
-        self.aim_run.close()
+        flush_async_tracking()
+        if self.get_aim_run() is not None:
+            self.aim_run.close()
 
 
 class ResumableJob:
@@ -109,7 +119,7 @@ class ResumableJob:
     Inherits similar attributes and methods from ResumableSlurmJob but tailored for non-Slurm environments.
     """
 
-    def __init__(self, module: str, action_name: str, cfg: Dict, aim_run: Run):
+    def __init__(self, module: str, action_name: str, cfg: Dict, aim_run: "Run"):
         """
         Initializes the ResumableJob with necessary parameters for job execution and
         experiment tracking without Slurm integration.
@@ -130,33 +140,34 @@ class ResumableJob:
         Executes the job action specified in the configuration. 
         Prefers action classes with run() method over module-level main() function.
         """
-        sys.path.append(f"{self.module}/actions")
-        action_module = import_module(self.action_name)
-        
-        # Try to find action class - look for classes that inherit from Action
-        from urartu.common.action import Action
-        action_class = None
-        
-        for attr_name in dir(action_module):
-            attr = getattr(action_module, attr_name)
-            if (isinstance(attr, type) and 
-                issubclass(attr, Action) and 
-                attr != Action):
-                action_class = attr
-                break
-        
-        if action_class:
-            # Use action class with run() method
-            action_instance = action_class(self.cfg, self.aim_run)
-            
-            # Use new caching-enabled run method if available
-            if hasattr(action_instance, 'run_with_cache'):
-                action_instance.run_with_cache()
-            elif hasattr(action_instance, 'run'):
-                action_instance.run()
-            else:
-                # Fallback to legacy main function on module
-                action_module.main(cfg=self.cfg, aim_run=self.aim_run)
+        run_action(self.module, self.action_name, self.cfg, self.aim_run)
+
+
+def run_action(module: str, action_name: str, cfg: Dict, aim_run: "Run"):
+    """
+    Runs an action, preferring its action class (through run_with_cache, which serves cache
+    hits and restores the checkpoint of a preempted run) over the module-level main() function.
+
+    Args:
+        module (str): Path to the module where job actions are located.
+        action_name (str): Name of the action module within the actions directory.
+        cfg (Dict): Configuration settings for the action.
+        aim_run (Run): An Aim toolkit Run object for tracking experiment data, or None.
+    """
+    from urartu.common.action_worker import find_action_class
+    from urartu.common.cache_manager import flush_async_cache_writes
+
+    sys.path.append(f"{module}/actions")
+    action_module = import_module(action_name)
+    action_class = find_action_class(action_module)
+
+    try:
+        if action_class is not None:
+            action_class(cfg, aim_run).run_with_cache()
         else:
-            # Fallback to legacy main function on module
-            action_module.main(cfg=self.cfg, aim_run=self.aim_run)
+            # Legacy main function on the module
+            action_module.main(cfg=cfg, aim_run=aim_run)
+    finally:
+        # Cache entries and tracking calls may still be queued for the background writers
+        flush_async_cache_writes()
+        flush_async_tracking()
@@ -1,14 +1,18 @@
+import json
 import logging
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-from aim import Run
-from iopath.common.file_io import g_pathmgr
+from omegaconf import OmegaConf
 
 from .job import ResumableJob, ResumableSlurmJob
+from .local_launcher import LocalJobPool
 
+if TYPE_CHECKING:
+    from aim import Run
 
-def create_submitit_executor(cfg: Dict):
+
+def create_submitit_executor(cfg: Dict, log_folder: Optional[Path] = None):
     """
     Creates and configures a SubmitIt executor based on the provided configuration.
     Ensures the log directory exists and is accessible.
@@ -16,6 +20,7 @@ def create_submitit_executor(cfg: Dict):
     Args:
         cfg (Dict): A dictionary containing configuration settings for the executor,
                     including directory paths and Slurm specific options.
+        log_folder (Optional[Path]): Folder for the SubmitIt logs, by default the run directory.
 
     Returns:
         submitit.AutoExecutor: A configured executor ready to handle job submissions.
@@ -25,8 +30,9 @@ def create_submitit_executor(cfg: Dict):
                         parameters are missing.
     """
     import submitit
+    from iopath.common.file_io import g_pathmgr
 
-    log_folder = Path(cfg["run_dir"])
+    log_folder = Path(log_folder or cfg["run_dir"])
     try:
         if not g_pathmgr.exists(log_folder):
             g_pathmgr.mkdirs(log_folder)
@@ -56,10 +62,13 @@ def create_submitit_executor(cfg: Dict):
         cpus_per_task=cfg["slurm"]["cpus_per_task"],
         slurm_additional_parameters=cfg["slurm"]["additional_parameters"],
     )
+    if cfg["slurm"].get("array_parallelism"):
+        # Maximum number of tasks of a job array running at the same time
+        executor.update_parameters(slurm_array_parallelism=cfg["slurm"]["array_parallelism"])
     return executor
 
 
-def launch_on_slurm(module: str, action_name: str, cfg: Dict, aim_run: Run):
+def launch_on_slurm(module: str, action_name: str, cfg: Dict, aim_run: "Run"):
     """
     Submits a job to a Slurm cluster using the provided module, action, configuration, and Aim run.
     Utilizes a SubmitIt executor for job management.
@@ -84,7 +93,7 @@ def launch_on_slurm(module: str, action_name: str, cfg: Dict, aim_run: Run):
     return job
 
 
-def launch(module: str, action_name: str, cfg: Dict, aim_run: Run):
+def launch(module: str, action_name: str, cfg: Dict, aim_run: "Run"):
     """
     Executes a job directly, without using Slurm, using the specified module, action, configuration,
     and Aim run.
@@ -99,3 +108,109 @@ def launch(module: str, action_name: str, cfg: Dict, aim_run: Run):
         module=module, action_name=action_name, cfg=cfg, aim_run=aim_run
     )
     trainer()
+
+
+# Sweep points of the current SLURM multirun, submitted together as job arrays
+_slurm_queue: List[ResumableSlurmJob] = []
+
+
+def queue_on_slurm(module: str, action_name: str, cfg: Dict, aim_run: "Run"):
+    """
+    Queues a sweep point of a multirun for submission to a Slurm cluster. Call
+    submit_queued_slurm_jobs once all sweep points are queued to submit them as job arrays.
+
+    Args:
+        module (str): The module where the job's action is defined.
+        action_name (str): The function or method to execute within the module.
+        cfg (Dict): Configuration dictionary for the Slurm environment and the job specifics.
+        aim_run (Run): An Aim toolkit Run object to track the job.
+    """
+    _slurm_queue.append(ResumableSlurmJob(module=module, action_name=action_name, cfg=cfg, aim_run=aim_run))
+
+
+def _executor_settings(cfg: Dict) -> str:
+    """The Slurm settings of a job, as a key grouping jobs that can share one job array."""
+    slurm_cfg = OmegaConf.to_container(cfg.slurm, resolve=True) if OmegaConf.is_config(cfg.slurm) else dict(cfg["slurm"])
+    return json.dumps(slurm_cfg, sort_keys=True, default=str)
+
+
+def submit_queued_slurm_jobs():
+    """
+    Submits the sweep points queued by queue_on_slurm, one job array per distinct Slurm
+    configuration (usually a single array for the whole sweep), instead of one sbatch call
+    per sweep point. The SubmitIt logs of an array go to the sweep directory.
+
+    Returns:
+        List[submitit.Job]: The submitted jobs, one per sweep point.
+    """
+    global _slurm_queue
+    trainers, _slurm_queue = _slurm_queue, []
+    groups: Dict[str, List[ResumableSlurmJob]] = {}
+    for trainer in trainers:
+        groups.setdefault(_executor_settings(trainer.cfg), []).append(trainer)
+
+    jobs = []
+    for group in groups.values():
+        cfg = group[0].cfg
+        log_folder = Path(cfg["run_dir"]).parent / ".submitit"
+        executor = create_submitit_executor(cfg, log_folder=log_folder)
+        try:
+            with executor.batch():
+                array_jobs = [executor.submit(trainer) for trainer in group]
+        except Exception as e:
+            logging.error(f"Failed to submit a job array of {len(group)} sweep points to SLURM: {e}")
+            raise
+        parallelism = cfg["slurm"].get("array_parallelism")
+        logging.info(f"Submitted job array {array_jobs[0].job_id.split('_')[0]} with {len(array_jobs)} tasks"
+                     f"{f', at most {parallelism} running at once' if parallelism else ''}")
+        jobs.extend(array_jobs)
+    return jobs
+
+
+# Pool of the current local multirun, created by its first sweep point
+_local_pool: Optional[LocalJobPool] = None
+
+
+def launch_in_local_pool(module: str, action_name: str, cfg: Dict, aim_run: "Run", log_file: Path):
+    """
+    Queues a sweep point of a local multirun to run concurrently in a worker process (see
+    urartu.utils.local_launcher). Call wait_for_local_jobs once all sweep points are queued.
+
+    Args:
+        module (str): The module where the job's action is defined.
+        action_name (str): The function or method to execute within the module.
+        cfg (Dict): Configuration dictionary for the job specifics, including the `local` section.
+        aim_run (Run): An Aim toolkit Run object to track the job; the worker reopens it by hash.
+        log_file (Path): File the worker writes its output to.
+    """
+    global _local_pool
+    if _local_pool is None:
+        _local_pool = LocalJobPool.from_config(cfg.get("local"))
+        logging.info(f"Running local sweep points {_local_pool.max_parallel_jobs} at a time")
+    _local_pool.submit(module, action_name, cfg, getattr(aim_run, "hash", None), log_file)
+
+
+def wait_for_local_jobs():
+    """
+    Waits for the sweep points queued by launch_in_local_pool, if any.
+
+    Raises:
+        RuntimeError: If any of the sweep points failed.
+    """
+    global _local_pool
+    if _local_pool is None:
+        return
+    pool, _local_pool = _local_pool, None
+    pool.wait()
+
+
+def finish_multirun():
+    """
+    Completes a multirun once Hydra has gone through all sweep points: submits the queued
+    Slurm sweep points as job arrays and waits for the local sweep points running in parallel.
+    """
+    try:
+        if _slurm_queue:
+            submit_queued_slurm_jobs()
+    finally:
+        wait_for_local_jobs()
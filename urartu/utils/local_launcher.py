@@ -0,0 +1,197 @@
+"""
+Parallel execution of local multirun sweep points in urartu.
+
+Hydra runs the sweep points of a multirun one after another. With `local.max_parallel_jobs`
+above 1 (or GPU / CPU pinning requested) each local sweep point is instead handed to a
+LocalJobPool, which runs it in a fresh worker process started with the `spawn` method, at
+most `max_parallel_jobs` at a time. Every worker takes one of the pool's slots, which pins
+it to a GPU (through CUDA_VISIBLE_DEVICES) and/or to its own set of CPU cores, so a sweep
+fills a multi-GPU node or a large CPU box without the sweep points competing for devices.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+
+def visible_gpus() -> List[str]:
+    """Return the indices of the GPUs visible to this process, without importing torch."""
+    if os.environ.get("CUDA_VISIBLE_DEVICES") is not None:
+        return [gpu.strip() for gpu in os.environ["CUDA_VISIBLE_DEVICES"].split(",") if gpu.strip()]
+    try:
+        result = subprocess.run(
+            ["nvidia-smi", "--query-gpu=index", "--format=csv,noheader"],
+            capture_output=True, text=True, check=True, timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return []
+    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+
+def available_cpus() -> List[int]:
+    """Return the CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def worker_slots(max_parallel_jobs: int, gpus: Sequence[Any] = (), cpus_per_job: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Build the pinning of each concurrent worker.
+
+    GPUs are assigned round robin, so more workers than GPUs share them. CPU core sets are
+    disjoint as long as max_parallel_jobs * cpus_per_job does not exceed the available cores.
+
+    Returns:
+        One dict per worker with the environment variables to set ("env") and the CPU cores
+        to pin the worker to ("cpus", None for no pinning)
+    """
+    cores = available_cpus()
+    if cpus_per_job and max_parallel_jobs * cpus_per_job > len(cores):
+        logger.warning(f"{max_parallel_jobs} workers with {cpus_per_job} cores each need more than the "
+                       f"{len(cores)} available cores, so some workers share cores")
+    slots = []
+    for index in range(max_parallel_jobs):
+        env, cpus = {}, None
+        if gpus:
+            env["CUDA_VISIBLE_DEVICES"] = str(gpus[index % len(gpus)])
+        if cpus_per_job:
+            start = index * cpus_per_job
+            cpus = [cores[(start + offset) % len(cores)] for offset in range(min(cpus_per_job, len(cores)))]
+            # Keep the thread pools of torch / numpy within the pinned cores
+            for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+                env[variable] = str(len(cpus))
+        slots.append({"env": env, "cpus": cpus})
+    return slots
+
+
+def run_local_job(module: str, action_name: str, cfg, aim_run_hash: Optional[str], env: Dict[str, str],
+                  cpus: Optional[List[int]], log_file: str) -> None:
+    """Entry point of a worker process: run one sweep point like `launch` does in the main process."""
+    os.environ.update(env)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+    from urartu import _setup_run_logging
+    from .job import ResumableJob
+    from .tee import restore_output
+    from .tracking import flush_async_tracking, open_tracker
+
+    _setup_run_logging(Path(log_file))
+    aim_run = open_tracker(cfg, aim_run_hash)
+    try:
+        ResumableJob(module=module, action_name=action_name, cfg=cfg, aim_run=aim_run)()
+    finally:
+        if aim_run is not None:
+            flush_async_tracking()
+            aim_run.close()
+        # Worker processes exit without running atexit handlers
+        restore_output()
+
+
+class LocalJobPool:
+    """
+    Runs sweep points concurrently in worker processes pinned to GPUs and/or CPU cores.
+
+    Attributes:
+        max_parallel_jobs (int): Number of sweep points running at the same time.
+        slots (List[Dict[str, Any]]): Pinning of each concurrent worker (see worker_slots).
+    """
+
+    def __init__(self, max_parallel_jobs: int, gpus: Sequence[Any] = (), cpus_per_job: Optional[int] = None):
+        self.max_parallel_jobs = max_parallel_jobs
+        self.slots = worker_slots(max_parallel_jobs, gpus, cpus_per_job)
+        self._free_slots: queue.Queue = queue.Queue()
+        for slot in self.slots:
+            self._free_slots.put(slot)
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel_jobs, thread_name_prefix="urartu-sweep")
+        self._jobs: List[tuple] = []
+
+    @staticmethod
+    def enabled(local_cfg) -> bool:
+        """Whether the `local` section of the config asks for parallel or pinned sweep points."""
+        local_cfg = local_cfg or {}
+        return bool((local_cfg.get("max_parallel_jobs") or 1) > 1 or local_cfg.get("gpus")
+                    or local_cfg.get("cpus_per_job"))
+
+    @classmethod
+    def from_config(cls, local_cfg) -> "LocalJobPool":
+        """
+        Create a pool from the `local` section of the config.
+
+        `gpus` is a list of GPU indices or "auto" for all visible GPUs; without an explicit
+        `max_parallel_jobs` one sweep point runs per GPU, or per `cpus_per_job` cores.
+        """
+        local_cfg = local_cfg or {}
+        gpus: Union[str, Sequence[Any]] = local_cfg.get("gpus") or []
+        if gpus == "auto":
+            gpus = visible_gpus()
+            if not gpus:
+                logger.warning("local.gpus=auto found no GPUs, sweep points are not pinned to GPUs")
+        cpus_per_job = local_cfg.get("cpus_per_job")
+        max_parallel_jobs = local_cfg.get("max_parallel_jobs")
+        if not max_parallel_jobs:
+            if gpus:
+                max_parallel_jobs = len(gpus)
+            elif cpus_per_job:
+                max_parallel_jobs = max(1, len(available_cpus()) // cpus_per_job)
+            else:
+                max_parallel_jobs = 1
+        return cls(int(max_parallel_jobs), list(gpus), cpus_per_job)
+
+    def submit(self, module: str, action_name: str, cfg, aim_run_hash: Optional[str], log_file: Path) -> Future:
+        """Queue a sweep point; it starts as soon as a worker slot is free."""
+        future = self._executor.submit(self._run, module, action_name, cfg, aim_run_hash, str(log_file))
+        self._jobs.append((future, log_file))
+        return future
+
+    def _run(self, module: str, action_name: str, cfg, aim_run_hash: Optional[str], log_file: str) -> None:
+        context = multiprocessing.get_context("spawn")
+        slot = self._free_slots.get()
+        try:
+            process = context.Process(
+                target=run_local_job,
+                args=(module, action_name, cfg, aim_run_hash, slot["env"], slot["cpus"], log_file),
+                name=f"urartu-{action_name}",
+            )
+            pinning = ", ".join(
+                part for part in (
+                    f"GPU {slot['env']['CUDA_VISIBLE_DEVICES']}" if "CUDA_VISIBLE_DEVICES" in slot["env"] else "",
+                    f"{len(slot['cpus'])} CPU cores" if slot["cpus"] else "",
+                ) if part
+            )
+            logger.info(f"🚀 Starting sweep point {Path(log_file).parent}{f' on {pinning}' if pinning else ''}")
+            process.start()
+            process.join()
+        finally:
+            self._free_slots.put(slot)
+        if process.exitcode != 0:
+            raise RuntimeError(f"Sweep point {Path(log_file).parent} failed with exit code {process.exitcode}, "
+                               f"see {log_file}")
+
+    def wait(self) -> None:
+        """
+        Wait for all queued sweep points to finish.
+
+        Raises:
+            RuntimeError: If any sweep point failed; the others still run to completion
+        """
+        failures = []
+        for future, log_file in self._jobs:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(str(e))
+                failures.append(log_file)
+        self._executor.shutdown()
+        self._jobs = []
+        if failures:
+            raise RuntimeError(f"{len(failures)} sweep point(s) failed")
+        logger.info("✅ All sweep points finished")
@@ -0,0 +1,256 @@
+"""
+Per-action timing and memory instrumentation.
+
+An ActionProfile splits the wall time of an action into named phases (import, construct,
+cache lookup, run, ...) and tracks the peak host (RSS) and CUDA memory while the action
+runs. Code deeper in the call stack, such as Action.run_with_cache, marks its phases with
+`profile_phase(...)`, which records into the profile active in the current thread and does
+nothing when there is none. Profiles are exported in the Chrome trace event format, viewable
+in chrome://tracing or https://ui.perfetto.dev.
+
+Memory is sampled by a background thread and complemented by the process high-water marks
+(`ru_maxrss`, `torch.cuda.max_memory_allocated`) when they rise during the action. Both are
+process-wide, so with actions running concurrently the peaks of overlapping actions include
+each other's memory.
+"""
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Seconds between memory samples while an action runs
+MEMORY_SAMPLE_INTERVAL = 0.1
+
+_current_profile: contextvars.ContextVar[Optional["ActionProfile"]] = contextvars.ContextVar(
+    "urartu_action_profile", default=None
+)
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size of the process, or None if it cannot be determined."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss_bytes() -> Optional[int]:
+    """Peak resident set size of the process so far, or None if it cannot be determined."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and in bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _cuda():
+    """The torch.cuda module if torch is already imported and CUDA is available, else None."""
+    # Never import torch just for profiling
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return None
+    try:
+        return torch.cuda if torch.cuda.is_available() else None
+    except Exception:
+        return None
+
+
+class ActionProfile:
+    """
+    Phase timings and peak memory of one action.
+
+    Attributes:
+        name (str): Name of the action in the pipeline.
+        action_name (str): Name of the action module.
+        phases (Dict[str, float]): Seconds spent per phase, summed over repeated phases.
+        events (List[Dict[str, Any]]): The phases as Chrome trace events.
+        wall_seconds (Optional[float]): Wall time of the action, set when it finishes.
+        peak_rss_bytes (Optional[int]): Peak resident set size of the process during the action.
+        peak_cuda_bytes (Optional[int]): Peak CUDA memory allocated by torch during the action.
+        worker_peak_rss_bytes (Optional[int]): Peak RSS of the worker process, for isolated actions.
+        worker_peak_cuda_bytes (Optional[int]): Peak CUDA memory of the worker process, for isolated actions.
+    """
+
+    def __init__(self, name: str, action_name: str):
+        self.name = name
+        self.action_name = action_name
+        self.phases: Dict[str, float] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.wall_seconds: Optional[float] = None
+        self.peak_rss_bytes: Optional[int] = None
+        self.peak_cuda_bytes: Optional[int] = None
+        self.worker_peak_rss_bytes: Optional[int] = None
+        self.worker_peak_cuda_bytes: Optional[int] = None
+        self.error: Optional[str] = None
+        self._start_us = time.time_ns() // 1000
+        self._start = time.perf_counter()
+        self._tid = threading.get_native_id()
+        self._stop_sampling = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._max_rss_at_start = _max_rss_bytes()
+        cuda = _cuda()
+        self._max_cuda_at_start = cuda.max_memory_allocated() if cuda is not None else None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as the given phase."""
+        start_us = time.time_ns() // 1000
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + duration
+            self.events.append({
+                "name": name,
+                "cat": "phase",
+                "ph": "X",
+                "ts": start_us,
+                "dur": int(duration * 1e6),
+                "pid": os.getpid(),
+                "tid": threading.get_native_id(),
+                "args": {"action": self.name},
+            })
+
+    def _sample_memory(self) -> None:
+        cuda = _cuda()
+        while True:
+            rss = _rss_bytes()
+            if rss is not None:
+                self.peak_rss_bytes = max(self.peak_rss_bytes or 0, rss)
+            if cuda is not None:
+                try:
+                    self.peak_cuda_bytes = max(self.peak_cuda_bytes or 0, cuda.memory_allocated())
+                except Exception:
+                    cuda = None
+            if self._stop_sampling.wait(MEMORY_SAMPLE_INTERVAL):
+                return
+
+    def start(self) -> None:
+        """Start sampling memory in the background."""
+        self._sampler = threading.Thread(target=self._sample_memory, name=f"profile-{self.name}", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop sampling and settle the wall time and memory peaks."""
+        self.wall_seconds = time.perf_counter() - self._start
+        self._stop_sampling.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+        # The process high-water marks are exact when they were raised during the action
+        max_rss = _max_rss_bytes()
+        if max_rss is not None and self._max_rss_at_start is not None and max_rss > self._max_rss_at_start:
+            self.peak_rss_bytes = max(self.peak_rss_bytes or 0, max_rss)
+        cuda = _cuda()
+        if cuda is not None:
+            max_cuda = cuda.max_memory_allocated()
+            if self._max_cuda_at_start is None or max_cuda > self._max_cuda_at_start:
+                self.peak_cuda_bytes = max(self.peak_cuda_bytes or 0, max_cuda)
+
+    def add_worker_profile(self, phases: Dict[str, float], events: List[Dict[str, Any]],
+                           peak_rss_bytes: Optional[int], peak_cuda_bytes: Optional[int]) -> None:
+        """Merge the profile of the worker process the action ran in (see urartu.common.action_worker)."""
+        for name, seconds in phases.items():
+            self.phases[f"worker:{name}"] = self.phases.get(f"worker:{name}", 0.0) + seconds
+        self.events.extend(events)
+        self.worker_peak_rss_bytes = peak_rss_bytes
+        self.worker_peak_cuda_bytes = peak_cuda_bytes
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the timings and memory peaks as a JSON-serializable dict."""
+        summary = {
+            "action": self.action_name,
+            "wall_seconds": self.wall_seconds,
+            "phases": dict(self.phases),
+            "peak_rss_mb": self.peak_rss_bytes / 1024**2 if self.peak_rss_bytes is not None else None,
+            "peak_cuda_mb": self.peak_cuda_bytes / 1024**2 if self.peak_cuda_bytes is not None else None,
+            "error": self.error,
+        }
+        if self.worker_peak_rss_bytes is not None:
+            summary["worker_peak_rss_mb"] = self.worker_peak_rss_bytes / 1024**2
+        if self.worker_peak_cuda_bytes is not None:
+            summary["worker_peak_cuda_mb"] = self.worker_peak_cuda_bytes / 1024**2
+        return summary
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """Return the action and its phases as Chrome trace events."""
+        summary = self.summary()
+        action_event = {
+            "name": self.name,
+            "cat": "action",
+            "ph": "X",
+            "ts": self._start_us,
+            "dur": int((self.wall_seconds or 0.0) * 1e6),
+            "pid": os.getpid(),
+            "tid": self._tid,
+            "args": {key: value for key, value in summary.items() if key != "phases"},
+        }
+        return [action_event] + self.events
+
+
+@contextmanager
+def profile_action(name: str, action_name: str) -> Iterator[ActionProfile]:
+    """
+    Profile the enclosed block as one action, making the profile active in the current thread.
+
+    Example:
+        >>> with profile_action("generate", "generate") as profile:
+        ...     with profile_phase("run"):
+        ...         run()
+        >>> profile.summary()["phases"]
+        {'run': 12.3}
+    """
+    profile = ActionProfile(name, action_name)
+    token = _current_profile.set(profile)
+    profile.start()
+    try:
+        yield profile
+    except BaseException as e:
+        profile.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        profile.stop()
+        _current_profile.reset(token)
+
+
+def current_profile() -> Optional[ActionProfile]:
+    """Return the profile active in the current thread, if any."""
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as a phase of the active profile; a no-op without one."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    with profile.phase(name):
+        yield
+
+
+def write_chrome_trace(profiles: Iterable[ActionProfile], path: Path) -> None:
+    """Write the profiles to a JSON file in the Chrome trace event format."""
+    events = [event for profile in profiles for event in profile.trace_events()]
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
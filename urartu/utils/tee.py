@@ -0,0 +1,195 @@
+"""
+Capture of stdout / stderr into the log file of a run.
+
+tee_output replaces sys.stdout and sys.stderr with TeeStreams that write to the terminal and
+to one LogFileWriter shared by both, so the log file keeps the order in which things were
+printed. The writer holds what is written in memory and appends it to the log file from a
+background thread every FLUSH_INTERVAL seconds, or right away once MAX_BUFFER_BYTES are
+pending, so print, logging and tqdm calls in tight loops never wait for the disk.
+
+Progress bars that redraw their line with a carriage return (tqdm) are written to the log file
+at most once every PROGRESS_INTERVAL seconds; the last state before the line is finished is
+always written. The terminal gets every update. Everything pending is written when the writer
+is closed: by restore_output, when the output is teed to another file, or at interpreter exit.
+"""
+
+import atexit
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, TextIO
+
+# Seconds between writes of the buffered output to the log file
+FLUSH_INTERVAL = 1.0
+# Pending output that triggers an immediate write, in bytes (characters)
+MAX_BUFFER_BYTES = 1024 * 1024
+# Seconds between carriage-return progress updates kept in the log file
+PROGRESS_INTERVAL = 1.0
+
+
+class LogFileWriter:
+    """
+    Appends text to a log file in batches from a background thread.
+
+    Attributes:
+        path (Path): The log file.
+        flush_interval (float): Seconds between background writes.
+        max_buffer_bytes (int): Pending size at which write() flushes synchronously.
+        progress_interval (float): Seconds between carriage-return updates kept per source.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = FLUSH_INTERVAL, max_buffer_bytes: int = MAX_BUFFER_BYTES,
+                 progress_interval: float = PROGRESS_INTERVAL):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.max_buffer_bytes = max_buffer_bytes
+        self.progress_interval = progress_interval
+        self._file = open(self.path, "a")
+        self._buffer: List[str] = []
+        self._buffered = 0
+        # Latest progress update not written yet and time of the last one written, per source
+        self._pending_progress: Dict[str, str] = {}
+        self._last_progress: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Serializes writes to the file, so a synchronous flush cannot interleave with the flusher
+        self._file_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="urartu-log-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def write(self, text: str, source: str = "") -> None:
+        """
+        Queue text for the log file.
+
+        Text redrawing a line with a carriage return is kept at most once per progress_interval
+        for each source (e.g. stdout / stderr); the latest update is written before the next
+        regular text of the source.
+        """
+        with self._lock:
+            if self._closed.is_set():
+                return
+            if "\r" in text and "\n" not in text:
+                now = time.monotonic()
+                if now - self._last_progress.get(source, 0.0) < self.progress_interval:
+                    self._pending_progress[source] = text
+                    return
+                self._last_progress[source] = now
+                self._pending_progress.pop(source, None)
+            elif source in self._pending_progress:
+                self._append(self._pending_progress.pop(source))
+            self._append(text)
+            full = self._buffered >= self.max_buffer_bytes
+        if full:
+            self.flush()
+
+    def _append(self, text: str) -> None:
+        self._buffer.append(text)
+        self._buffered += len(text)
+
+    def flush(self) -> None:
+        """Append everything pending to the log file."""
+        with self._file_lock:
+            with self._lock:
+                pending, self._buffer, self._buffered = self._buffer, [], 0
+            if not pending or self._file.closed:
+                return
+            try:
+                self._file.write("".join(pending))
+                self._file.flush()
+            except (OSError, ValueError) as e:
+                # Written to the original stderr, as sys.stderr may be teed to this writer
+                sys.__stderr__.write(f"Failed to write to log file {self.path}: {e}\n")
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background thread and write everything pending; safe to call repeatedly."""
+        with self._lock:
+            if self._closed.is_set():
+                return
+            for text in self._pending_progress.values():
+                self._append(text)
+            self._pending_progress.clear()
+            self._closed.set()
+        if self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush()
+        with self._file_lock:
+            self._file.close()
+        atexit.unregister(self.close)
+
+
+class TeeStream:
+    """
+    Stand-in for sys.stdout / sys.stderr writing to the terminal and to a LogFileWriter.
+
+    Attributes:
+        terminal (TextIO): The stream replaced by the tee.
+        log (LogFileWriter): The writer of the log file.
+        name (str): Name of the stream, which keeps its own progress updates in the writer.
+    """
+
+    def __init__(self, terminal: TextIO, log: LogFileWriter, name: str = ""):
+        self.terminal = terminal
+        self.log = log
+        self.name = name
+
+    def write(self, message: str) -> int:
+        self.terminal.write(message)
+        self.log.write(message, source=self.name)
+        return len(message)
+
+    def flush(self) -> None:
+        # Called by tqdm and logging after every write: the log file is left to the flusher thread
+        self.terminal.flush()
+
+    def fileno(self) -> int:
+        return self.terminal.fileno()
+
+    def isatty(self) -> bool:
+        return self.terminal.isatty()
+
+    def close(self) -> None:
+        self.log.close()
+
+    def __getattr__(self, name: str):
+        # encoding, errors, buffer, ... of the terminal stream
+        return getattr(self.terminal, name)
+
+
+def restore_output() -> None:
+    """Write all teed output to its log file and put the terminal streams back."""
+    for name in ("stdout", "stderr"):
+        stream = getattr(sys, name)
+        if isinstance(stream, TeeStream):
+            stream.close()
+            setattr(sys, name, stream.terminal)
+
+
+def tee_output(log_file: Path) -> LogFileWriter:
+    """
+    Send everything written to stdout / stderr, and logging, to log_file as well.
+
+    Output teed to a previous log file (the previous point of a multirun) is written out and
+    no longer goes there.
+
+    Returns:
+        The writer of the log file
+    """
+    restore_output()
+    writer = LogFileWriter(log_file)
+    sys.stdout = TeeStream(sys.stdout, writer, "stdout")
+    sys.stderr = TeeStream(sys.stderr, writer, "stderr")
+
+    # Log records go through the tee as well, so they keep their place among the printed output
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.handlers = [stream_handler]
+    return writer
@@ -0,0 +1,499 @@
+"""
+Experiment tracking for urartu actions.
+
+A run is tracked through a Tracker, selected by the `tracker` config key: AimTracker writes to
+an Aim repository, LocalTracker appends JSON lines to `tracking.jsonl` in the run directory
+without any dependency, for sweeps where starting Aim costs more than the runs themselves.
+With `tracker: auto` (the default) Aim is used if `aim.use_aim` is set and the local tracker
+otherwise. Local runs can be merged into Aim later with `urartu tracking import` (see
+import_into_aim). Trackers have the subset of the interface of aim.Run that urartu uses, so
+they are passed around as `aim_run`.
+
+Every Action has a `tracker`, an AsyncTracker wrapping its run. Calls such as
+`self.tracker.track(...)` or `self.tracker[key] = value` are queued and applied to the run by a
+single process-wide background thread, which takes them from the queue in batches, so writes
+to Aim's repository no longer sit on the critical path of generation or training loops. One
+thread for all runs also means the run is never written to from two threads at once.
+
+The queue is bounded: once TRACKING_QUEUE_SIZE calls are pending, tracking blocks until the
+writer catches up, which bounds the memory held by values waiting to be written. Pending calls
+are applied by flush_async_tracking (called when an action is cleaned up, when a job or a
+pipeline ends and before a run is closed) and at interpreter exit. Calls failing in the
+writer are counted and reported together when the writer is flushed.
+
+Containers handed to the tracker (dicts, lists, sets, OmegaConf configs) are copied when the
+call is queued, so they may be modified afterwards. Other values (e.g. tensors, aim.Text) are
+queued as they are and must not be modified until the writer is flushed.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from omegaconf import OmegaConf
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Tracking calls queued before tracking blocks
+TRACKING_QUEUE_SIZE = 10000
+# Tracking calls the writer takes from the queue at once
+TRACKING_BATCH_SIZE = 256
+
+
+class Tracker(ABC):
+    """
+    Interface of the run an action is tracked in.
+
+    Attributes:
+        hash (str): Identifier of the run.
+    """
+
+    hash: str
+
+    @abstractmethod
+    def track(self, value: Any, name: Optional[str] = None, step: Optional[int] = None,
+              epoch: Optional[int] = None, context: Optional[dict] = None) -> None:
+        """Record a value of the sequence `name`, at the next step unless step is given."""
+
+    @abstractmethod
+    def set(self, key: Any, value: Any, strict: bool = True) -> None:
+        """Set a run-level parameter."""
+
+    @abstractmethod
+    def __getitem__(self, key: Any) -> Any:
+        """Get a run-level parameter."""
+
+    @abstractmethod
+    def add_tag(self, value: str) -> None:
+        """Tag the run."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finish writing the run."""
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.set(key, value, strict=False)
+
+
+class AimTracker(Tracker):
+    """
+    Tracker writing to an Aim run.
+
+    Methods of aim.Run beyond the Tracker interface are available on the tracker as well.
+
+    Attributes:
+        run (aim.Run): The Aim run.
+    """
+
+    def __init__(self, run: Any):
+        self.run = run
+
+    @classmethod
+    def create(cls, repo: str, experiment: Optional[str] = None, log_system_params: bool = True) -> "AimTracker":
+        """Start a new Aim run."""
+        from aim import Run
+
+        return cls(Run(repo=repo, experiment=experiment, log_system_params=log_system_params))
+
+    @classmethod
+    def open(cls, run_hash: str, repo: str) -> "AimTracker":
+        """Reopen an existing Aim run, e.g. in the process of a job."""
+        from aim import Run
+
+        return cls(Run(run_hash, repo=repo))
+
+    @property
+    def hash(self) -> str:
+        return self.run.hash
+
+    def track(self, value: Any, name: Optional[str] = None, step: Optional[int] = None,
+              epoch: Optional[int] = None, context: Optional[dict] = None) -> None:
+        self.run.track(value, name=name, step=step, epoch=epoch, context=context)
+
+    def set(self, key: Any, value: Any, strict: bool = True) -> None:
+        self.run.set(key, value, strict=strict)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.run[key] = value
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.run[key]
+
+    def add_tag(self, value: str) -> None:
+        self.run.add_tag(value)
+
+    def close(self) -> None:
+        self.run.close()
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name == "run":
+            raise AttributeError(name)
+        return getattr(self.run, name)
+
+
+def _json_default(value: Any) -> Any:
+    """Encode values json cannot: configs as containers, Aim objects wrapping text as the text."""
+    if OmegaConf.is_config(value):
+        return OmegaConf.to_container(value, resolve=True)
+    if isinstance(getattr(value, "data", None), str):
+        return value.data
+    return str(value)
+
+
+class LocalTracker(Tracker):
+    """
+    Tracker appending JSON lines to `tracking.jsonl` in the run directory.
+
+    The first line describes the run (hash, experiment, creation time); every later line is one
+    `set`, `track` or `tag` call, with the type of the value kept in "kind" so that
+    import_into_aim can rebuild Aim objects such as Text. Reopening the run directory continues
+    the same run.
+
+    Every record is written with a single write() on a line-buffered file, so it reaches the
+    operating system as soon as it is made and a process that is killed (out of memory, time
+    limit) loses nothing it tracked. A file has one writer at a time: the tracker holds an
+    exclusive lock on it until it is closed, and a process reopening the run (e.g. the job
+    launched by the process that created it) waits until the previous tracker is closed and
+    then continues with its records. Opening a run twice in one process raises a RuntimeError.
+
+    Attributes:
+        path (Path): The JSONL file.
+        hash (str): Identifier of the run.
+    """
+
+    FILENAME = "tracking.jsonl"
+
+    # Files held by the open trackers of this process
+    _open_paths: Set[Path] = set()
+    _open_paths_lock = threading.Lock()
+
+    def __init__(self, run_dir: Path, experiment: Optional[str] = None):
+        self.path = Path(run_dir) / self.FILENAME
+        self._items: Dict[Any, Any] = {}
+        self._steps: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self.hash = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._key = self.path.resolve()
+        with self._open_paths_lock:
+            if self._key in self._open_paths:
+                raise RuntimeError(f"{self.path} is already open in this process; reuse that tracker or close it first")
+            self._open_paths.add(self._key)
+        self._file = open(self.path, "a", buffering=1)
+        self._acquire_file()
+        # Read once the lock is held, so the records of a previous writer are complete
+        if self.path.stat().st_size:
+            self._load()
+        if self.hash is None:
+            self.hash = uuid.uuid4().hex[:24]
+            self._write({"type": "run", "hash": self.hash, "experiment": experiment, "time": time.time()})
+        atexit.register(self.close)
+
+    def _acquire_file(self) -> None:
+        """Lock the file against other writers, waiting for a tracker of another process to close it."""
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info(f"⏳ Waiting for another process to close {self.path}")
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+
+    def _load(self) -> None:
+        """Restore the hash, parameters and step counters of an existing run."""
+        for record in read_local_tracking(self.path):
+            if record["type"] == "run":
+                self.hash = record["hash"]
+            elif record["type"] == "set":
+                self._items[record["key"]] = record["value"]
+            elif record["type"] == "track":
+                sequence = (record["name"], json.dumps(record["context"], sort_keys=True))
+                self._steps[sequence] = max(self._steps.get(sequence, 0), record["step"] + 1)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(record, default=_json_default) + "\n")
+
+    def track(self, value: Any, name: Optional[str] = None, step: Optional[int] = None,
+              epoch: Optional[int] = None, context: Optional[dict] = None) -> None:
+        sequence = (name, json.dumps(context, sort_keys=True, default=str))
+        with self._lock:
+            if step is None:
+                step = self._steps.get(sequence, 0)
+            self._steps[sequence] = max(self._steps.get(sequence, 0), step + 1)
+        self._write({"type": "track", "name": name, "value": value, "kind": type(value).__name__,
+                     "step": step, "epoch": epoch, "context": context, "time": time.time()})
+
+    def set(self, key: Any, value: Any, strict: bool = True) -> None:
+        self._items[key] = value
+        self._write({"type": "set", "key": key, "value": value})
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._items[key]
+
+    def add_tag(self, value: str) -> None:
+        self._write({"type": "tag", "value": value})
+
+    def close(self) -> None:
+        """Close the file, which releases it to the next writer; safe to call repeatedly."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+        with self._open_paths_lock:
+            self._open_paths.discard(self._key)
+        atexit.unregister(self.close)
+
+
+def read_local_tracking(path: Path) -> List[Dict[str, Any]]:
+    """Read the records of a LocalTracker file, skipping a line cut off by a crash."""
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping an incomplete line of {path}")
+    return records
+
+
+def tracker_name(cfg) -> str:
+    """The tracker selected by the config: `tracker` if set, else aim with aim.use_aim and local otherwise."""
+    name = cfg.get("tracker") or "auto"
+    if name == "auto":
+        aim_cfg = cfg.get("aim") or {}
+        name = "aim" if aim_cfg.get("use_aim", False) else "local"
+    if name not in ("aim", "local"):
+        raise ValueError(f"Unknown tracker '{name}'. Available: aim, local, auto")
+    return name
+
+
+def create_tracker(cfg, run_dir: Path, experiment: Optional[str] = None) -> Tracker:
+    """Start the run of an experiment with the tracker selected by the config."""
+    if tracker_name(cfg) == "aim":
+        return AimTracker.create(cfg.aim.repo, experiment=experiment, log_system_params=cfg.aim.log_system_params)
+    return LocalTracker(run_dir, experiment=experiment)
+
+
+def open_tracker(cfg, run_hash: Optional[str]) -> Optional[Tracker]:
+    """Reopen the run of an experiment (in the process of a job), or None if it has none."""
+    if tracker_name(cfg) == "aim":
+        return AimTracker.open(run_hash, cfg.aim.repo) if run_hash is not None else None
+    return LocalTracker(Path(cfg.run_dir))
+
+
+def import_into_aim(run_dir: Path, repo: str) -> Optional[str]:
+    """
+    Replay the LocalTracker file of a run directory into a new Aim run.
+
+    The run directory also gets the `<hash>.yaml` config copy that Aim runs have, so that
+    `urartu clean` keeps it; importing the same directory twice does nothing.
+
+    Returns:
+        The hash of the new Aim run, or None if the run was imported before
+
+    Raises:
+        RuntimeError: If a LocalTracker of another process is still writing the run
+    """
+    from aim import Run, Text
+
+    path = Path(run_dir) / LocalTracker.FILENAME
+    with open(path, "r+") as f:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RuntimeError(f"{path} is still being written by another process")
+        records = read_local_tracking(path)
+        if any(record["type"] == "imported" for record in records):
+            return None
+
+        header = next((record for record in records if record["type"] == "run"), {})
+        run = Run(repo=repo, experiment=header.get("experiment"))
+        for record in records:
+            try:
+                if record["type"] == "set":
+                    run[record["key"]] = record["value"]
+                elif record["type"] == "tag":
+                    run.add_tag(record["value"])
+                elif record["type"] == "track":
+                    value = Text(record["value"]) if record.get("kind") in ("Text", "str") else record["value"]
+                    run.track(value, name=record["name"], step=record["step"], epoch=record["epoch"],
+                              context=record["context"])
+            except Exception as e:
+                logger.warning(f"Could not import a '{record['type']}' record of {path}: {e}")
+        run_hash = run.hash
+        run.close()
+
+        cfg_path = Path(run_dir) / "cfg.yaml"
+        if cfg_path.exists():
+            (Path(run_dir) / f"{run_hash}.yaml").write_text(cfg_path.read_text())
+        f.seek(0, 2)
+        f.write(json.dumps({"type": "imported", "aim_hash": run_hash, "repo": repo, "time": time.time()}) + "\n")
+    return run_hash
+
+
+class TrackingWriter:
+    """
+    Applies queued tracking calls to their runs on a background thread.
+
+    Attributes:
+        batch_size (int): Maximum number of calls taken from the queue at once.
+        failed (int): Number of calls that failed since the writer was created.
+    """
+
+    def __init__(self, max_pending: int = TRACKING_QUEUE_SIZE, batch_size: int = TRACKING_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.failed = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Calls that failed since the last flush, and the first of their errors
+        self._failures_lock = threading.Lock()
+        self._unreported_failures = 0
+        self._first_failure: Optional[str] = None
+
+    def submit(self, run: Any, method: str, args: tuple, kwargs: dict) -> None:
+        """Queue `run.<method>(*args, **kwargs)`, blocking while the queue is full."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name="urartu-tracking-writer", daemon=True)
+                self._thread.start()
+        self._queue.put((run, method, args, kwargs))
+
+    def _work(self) -> None:
+        while True:
+            batch: List[Tuple[Any, str, tuple, dict]] = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for run, method, args, kwargs in batch:
+                try:
+                    getattr(run, method)(*args, **kwargs)
+                except Exception as e:
+                    logger.debug(f"Background tracking call '{method}' failed: {e}")
+                    with self._failures_lock:
+                        self.failed += 1
+                        self._unreported_failures += 1
+                        if self._first_failure is None:
+                            self._first_failure = f"'{method}': {type(e).__name__}: {e}"
+                finally:
+                    self._queue.task_done()
+
+    def pending(self) -> int:
+        """Number of queued calls not applied yet."""
+        return self._queue.unfinished_tasks
+
+    def flush(self) -> int:
+        """
+        Block until every queued call has been applied, and report the calls that failed.
+
+        Returns:
+            The number of calls that failed since the previous flush
+        """
+        self._queue.join()
+        with self._failures_lock:
+            failures, first_failure = self._unreported_failures, self._first_failure
+            self._unreported_failures, self._first_failure = 0, None
+        if failures:
+            logger.warning(f"{failures} background tracking call(s) failed since the last flush, "
+                           f"the first one {first_failure}")
+        return failures
+
+
+_writer: Optional[TrackingWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_tracking_writer() -> TrackingWriter:
+    """Get the process-wide background tracking writer, creating it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = TrackingWriter()
+            # Pending calls must not be lost when the interpreter exits
+            atexit.register(_writer.flush)
+        return _writer
+
+
+def flush_async_tracking() -> int:
+    """
+    Wait for pending background tracking calls, if the background writer was used.
+
+    Returns:
+        The number of calls that failed since the previous flush
+    """
+    if _writer is not None:
+        return _writer.flush()
+    return 0
+
+
+def _snapshot(value: Any) -> Any:
+    """Copy a container queued for the writer, so later changes by the caller do not reach the run."""
+    if isinstance(value, (dict, list, set)) or OmegaConf.is_config(value):
+        return copy.deepcopy(value)
+    return value
+
+
+class AsyncTracker:
+    """
+    Facade over a Tracker (or any object with the same interface) queueing writes to it.
+
+    `track`, item assignment, `set` and `add_tag` are applied by the background writer in the
+    order they were made; containers among their values are copied when they are queued.
+    Anything else (reading items, `hash`, other methods) first waits for the pending calls and
+    then goes to the run directly. Without a run, writes are dropped.
+
+    Attributes:
+        run: The run written to, or None.
+    """
+
+    def __init__(self, run: Any):
+        self.run = run
+
+    def _submit(self, method: str, *args, **kwargs) -> None:
+        if self.run is not None:
+            get_tracking_writer().submit(self.run, method, args, kwargs)
+
+    def track(self, value: Any, name: Optional[str] = None, step: Optional[int] = None,
+              epoch: Optional[int] = None, context: Optional[dict] = None) -> None:
+        """Queue `run.track(...)`; see aim.Run.track for the arguments."""
+        self._submit("track", _snapshot(value), name=name, step=step, epoch=epoch, context=_snapshot(context))
+
+    def set(self, key: Any, value: Any, strict: bool = True) -> None:
+        self._submit("set", key, _snapshot(value), strict=strict)
+
+    def add_tag(self, value: str) -> None:
+        self._submit("add_tag", value)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._submit("__setitem__", key, _snapshot(value))
+
+    def __getitem__(self, key: Any) -> Any:
+        self.flush()
+        return self.run[key]
+
+    def flush(self) -> int:
+        """Wait until every queued call has been applied (to this or any other run); see flush_async_tracking."""
+        return flush_async_tracking()
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or self.run is None:
+            raise AttributeError(name)
+        self.flush()
+        return getattr(self.run, name)